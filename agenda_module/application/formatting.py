@@ -0,0 +1,60 @@
+from datetime import date
+from typing import Sequence
+from ..domain.digest import AgendaDigest
+from ..domain.entities import Event
+from ..domain.event_batch import EventBatch
+from ..domain.name_search import NameMatch
+from ..domain.scheduling import FreeSlot
+
+EVENT_LINE = "- {name} el {date} a las {time} ({duration} min)\n"
+DIGEST_LINE = "  - {time} {name} ({duration} min)\n"
+WEEKDAY_NAMES = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+
+def format_events(events: Sequence[Event]) -> str:
+    """Texto con el que las herramientas y los atajos devuelven un listado de eventos."""
+    if not len(events):
+        return "No hay eventos para mostrar."
+
+    # Un solo join sobre las columnas en lugar de concatenar fila a fila
+    return "Eventos encontrados:\n" + EventBatch.from_events(events).render(EVENT_LINE)
+
+def format_conflicts(conflicts: Sequence[Event]) -> str:
+    return (
+        "⚠️ El horario se cruza con:\n"
+        + EventBatch.from_events(conflicts).render(EVENT_LINE)
+        + "No se agendó el evento: elige otro horario o confirma que quieres superponerlo."
+    )
+
+def format_free_slots(slots: Sequence[FreeSlot], duration: int) -> str:
+    if not slots:
+        return f"No hay huecos libres de {duration} min en ese periodo."
+    lines = "".join(f"- {s.date} de {s.start} a {s.end}\n" for s in slots)
+    return f"Huecos libres de al menos {duration} min:\n" + lines
+
+def format_name_matches(query: str, matches: Sequence[NameMatch]) -> str:
+    if not matches:
+        return f"No hay eventos que coincidan con '{query}'."
+    return "Eventos encontrados:\n" + EventBatch.from_events([m.event for m in matches]).render(EVENT_LINE)
+
+def format_ambiguous_name(query: str, matches: Sequence[NameMatch], limit: int = 10) -> str:
+    if len({m.event.name for m in matches}) == 1:
+        header = f"⚠️ No hay ningún evento llamado '{query}'. Lo más parecido:\n"
+        footer = "No se eliminó nada: confirma el nombre exacto (y la fecha) si quieres eliminarlo."
+    else:
+        header = f"⚠️ Varios eventos coinciden con '{query}':\n"
+        footer = "No se eliminó nada: indica cuál de ellos quieres eliminar."
+    return header + EventBatch.from_events([m.event for m in matches[:limit]]).render(EVENT_LINE) + footer
+
+def format_digest(digest: AgendaDigest) -> str:
+    """Resumen de hoy y los próximos días, agrupado por día, para GetAgendaSummary."""
+    text = f"Resumen de la agenda del {digest.start} al {digest.end}: {digest.total()} evento(s).\n"
+    for day, count in digest.counts().items():
+        label = f"{WEEKDAY_NAMES[date.fromisoformat(day).weekday()]} {day}"
+        if day == digest.start:
+            label = "Hoy, " + label
+        if not count:
+            text += f"- {label}: sin eventos\n"
+        else:
+            events = EventBatch.from_events(digest.events_on(day))
+            text += f"- {label}: {count} evento(s)\n" + events.render(DIGEST_LINE)
+    return text
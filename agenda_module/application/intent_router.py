@@ -0,0 +1,142 @@
+import re
+import logging
+from datetime import date, timedelta
+from typing import Callable, Optional, Sequence, Tuple
+
+from ..domain import spanish_dates
+from ..domain.digest import DIGEST_DAYS
+from ..domain.entities import Event
+from ..domain.text import fold
+from .formatting import format_events
+
+logger = logging.getLogger(__name__)
+
+_LIST_CUES = re.compile(
+    r"^[\s¿¡]*(?:lista(?:r)?|muestra(?:me)?|mostrar|ver|consulta(?:r)?|que\s+tengo|que\s+hay|cuales\s+son)\b"
+)
+_ADD_VERBS = re.compile(r"^[\s¿¡]*(?:agrega(?:r|me)?|anade|agenda(?:r|me)?|crea(?:r|me)?|programa(?:r|me)?)\b")
+_DELETE_VERBS = re.compile(r"^[\s¿¡]*(?:elimina(?:r)?|borra(?:r)?|cancela(?:r)?|quita(?:r)?)\b")
+_ANY_VERB = re.compile(
+    r"\b(?:agrega\w*|anade|agenda(?:r|me)|crea(?:r|me)?|programa(?:r|me)?|elimina\w*|borra\w*"
+    r"|cancela\w*|quita\w*|mueve|mover|cambia\w*|reprograma\w*)\b"
+)
+# Series, cambios y condiciones necesitan el razonamiento del agente
+_AMBIGUOUS = re.compile(
+    r"\b(?:todos|todas|cada|diari\w*|semanal\w*|mensual\w*|recurrente|si|pero|excepto|menos|antes|despues)\b"
+)
+_QUOTED = re.compile(r"[\"'“”‘’«»]([^\"'“”‘’«»]+)[\"'“”‘’«»]")
+# "llamada" es parte del nombre ("llamada con soporte"); solo "evento llamado X" se descarta
+_LEADING_FILLER = re.compile(r"^(?:[\s,:]|\b(?:un|una|el|la|nuevo|nueva|evento(?:\s+llamad[oa])?)\b)+", re.I)
+_TRAILING_FILLER = re.compile(r"(?:[\s,.?!]|\b(?:para|el|la|a|de|del|en|y)\b)+$", re.I)
+_DAYPART = re.compile(r"\b(?:por|en|de)\s+la\s+(?:ma[nñ]ana|tarde|noche)\b", re.I)
+
+class IntentRouter:
+    """Atajo determinista que resuelve comandos simples sin llamar al LLM.
+
+    Reconoce listados, altas y bajas con fecha explícita (incluidas fechas
+    relativas en español como "mañana" o "el próximo lunes") y los ejecuta
+    directamente sobre AgendaService. Ante cualquier ambigüedad devuelve
+    None y el mensaje sigue hacia el agente.
+    """
+
+    def __init__(self, service, today: Callable[[], date] = date.today):
+        self.service = service
+        self.today = today
+
+    def route(self, user_input: str) -> Optional[str]:
+        folded = fold(user_input)
+        if len(_ANY_VERB.findall(folded)) > 1 or _AMBIGUOUS.search(folded):
+            return None
+
+        try:
+            if _DELETE_VERBS.match(folded):
+                return self._delete(user_input, folded)
+            if _ADD_VERBS.match(folded):
+                return self._add(user_input, folded)
+            if _LIST_CUES.match(folded) and not _ANY_VERB.search(folded):
+                return self._list(folded)
+        except Exception as e:
+            logger.warning(f"Atajo descartado por error, se delega al agente: {e}")
+        return None
+
+    def _single_date(self, folded: str) -> Tuple[Optional[date], Optional[Tuple[int, int]], bool]:
+        """(fecha, span, ambigua): ambigua si aparece más de una fecha o un "martes 10"."""
+        dates = spanish_dates.find_dates(folded, self.today())
+        if len(dates) > 1 or spanish_dates.has_weekday_day_number(folded):
+            return None, None, True
+        if not dates:
+            return None, None, False
+        return dates[0][0], dates[0][1], False
+
+    def _events_between(self, start: str, end: str) -> Sequence[Event]:
+        # Hoy y los próximos días salen de la vista materializada, sin consultar el repositorio
+        today = self.today()
+        if today.isoformat() <= start and end < (today + timedelta(days=DIGEST_DAYS)).isoformat():
+            return self.service.agenda_summary(today.isoformat()).upcoming(start, end)
+        return self.service.list_events_between(start, end)
+
+    def _list(self, folded: str) -> Optional[str]:
+        week = spanish_dates.find_week(folded, self.today())
+        value, _, ambiguous = self._single_date(folded)
+        if ambiguous or (week and value):
+            return None
+        if week:
+            return format_events(self._events_between(week[0].isoformat(), week[1].isoformat()))
+        if value:
+            return format_events(self._events_between(value.isoformat(), value.isoformat()))
+        # Solo "lista eventos" / "muestra la agenda" sin más texto equivale a listar todo
+        if re.fullmatch(r"\s*\w+(?:\s+(?:me|la|mi|los|mis|todos|todas|eventos|agenda|citas))*\s*[.?!]?\s*", folded):
+            return format_events(self.service.list_all_events())
+        return None
+
+    def _add(self, user_input: str, folded: str) -> Optional[str]:
+        value, date_span, ambiguous = self._single_date(folded)
+        times = spanish_dates.find_times(folded)
+        if ambiguous or value is None or len(times) != 1 or spanish_dates.has_ambiguous_time(folded):
+            return None
+        time, time_span = times[0]
+
+        quoted = _QUOTED.search(user_input)
+        if quoted:
+            name = quoted.group(1).strip()
+        else:
+            # El nombre es lo que queda al quitar el verbo, la fecha y la hora
+            verb_end = _ADD_VERBS.match(folded).end()
+            chars = list(user_input)
+            for start, end in (date_span, time_span, (0, verb_end)):
+                chars[start:end] = [" "] * (end - start)
+            name = _DAYPART.sub(" ", "".join(chars))
+            name = _TRAILING_FILLER.sub("", _LEADING_FILLER.sub("", name.strip()))
+            name = " ".join(name.split())
+        if not name or spanish_dates.find_dates(fold(name), self.today()):
+            return None
+        return self.service.add_new_event(name, value.isoformat(), time)
+
+    def _delete(self, user_input: str, folded: str) -> Optional[str]:
+        quoted = _QUOTED.search(user_input)
+        if quoted:
+            value, _, ambiguous = self._single_date(folded[: quoted.start()] + folded[quoted.end():])
+            if ambiguous:
+                return None
+            return self._delete_exact(quoted.group(1).strip(), value.isoformat() if value else None)
+
+        value, date_span, ambiguous = self._single_date(folded)
+        if ambiguous:
+            return None
+        chars = list(user_input)
+        verb_end = _DELETE_VERBS.match(folded).end()
+        for start, end in ((date_span or (0, 0)), (0, verb_end)):
+            chars[start:end] = [" "] * (end - start)
+        name = _DAYPART.sub(" ", "".join(chars))
+        name = _TRAILING_FILLER.sub("", _LEADING_FILLER.sub("", name.strip()))
+        if not name.strip():
+            return None
+        return self._delete_exact(name, value.isoformat() if value else None)
+
+    def _delete_exact(self, name: str, day: Optional[str]) -> Optional[str]:
+        # Solo se borra sin el agente si el nombre existe tal cual (salvo tildes y mayúsculas);
+        # una coincidencia aproximada la confirma el agente con el usuario
+        match = self.service.match_event_name(name, day)
+        if match is None:
+            return None
+        return self.service.remove_event(match, day)
@@ -1,41 +1,508 @@
-from typing import List, Any
-from ..domain.entities import Event
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Any, Optional, Sequence, Tuple
+from ..domain.digest import AgendaDigest
+from ..domain.entities import DEFAULT_DURATION_MINUTES, AgentStreamEvent, Event
+from ..domain.event_batch import EventBatch
+from ..domain import name_search, recurrence
+from ..domain.name_search import NameMatch
+from ..domain.text import normalize
+from ..domain.scheduling import MAX_DURATION_MINUTES, FreeSlot, IntervalIndex, from_minutes, to_minutes
 from ..domain.ports.repository import AgendaRepository
 from ..domain.ports.agent_port import AIAgentPort
+from .formatting import format_ambiguous_name, format_conflicts
+from .. import telemetry
+
+DATE_FORMAT_ERROR = "⚠️ El formato de fecha debe ser YYYY-MM-DD."
+
+def _limit_date():
+    return datetime.now().date() + timedelta(days=365)
+
+def _limit_error(limit_date) -> str:
+    return f"⚠️ No puedes agendar eventos a más de un año en el futuro (Límite: {limit_date})."
+
+DURATION_ERROR = f"⚠️ La duración debe estar entre 1 y {MAX_DURATION_MINUTES} minutos."
+TIME_FORMAT_ERROR = "⚠️ El formato de hora debe ser HH:MM."
+
+def _check_slot_query(start_date: str, end_date: Optional[str], duration: int, day_start: str, day_end: str) -> str:
+    """Valida los parámetros de find_free_slots y devuelve la fecha final efectiva."""
+    end_date = end_date or start_date
+    if to_minutes(start_date, day_start) is None or to_minutes(end_date, day_end) is None:
+        raise ValueError(f"{DATE_FORMAT_ERROR} Las horas del horario deben ser HH:MM.")
+    if not 0 < duration <= MAX_DURATION_MINUTES:
+        raise ValueError(DURATION_ERROR)
+    return end_date
+
+def _conflict_window(date: str, time: str, duration: int) -> Optional[Tuple[int, int, str, str]]:
+    """(inicio, fin, primer día, último día) a consultar para detectar solapes con un evento."""
+    start = to_minutes(date, time)
+    if start is None:
+        return None
+    # Un evento del día anterior puede alargarse hasta este (duración máxima: un día)
+    last_day = from_minutes(start + duration)[0]
+    return start, start + duration, _previous_day(date), last_day
+
+def _previous_day(date: str) -> str:
+    return from_minutes(to_minutes(date, "00:00") - MAX_DURATION_MINUTES)[0]
+
+def _exact_name(event: str, matches: List[NameMatch]) -> Optional[str]:
+    """Nombre guardado que coincide con event salvo tildes, mayúsculas y puntuación."""
+    folded = normalize(event)
+    for match in matches:
+        if normalize(match.event.name) == folded:
+            return match.event.name
+    return None
+
+def _resolve_name(event: str, date: Optional[str], matches: List[NameMatch]) -> Tuple[Optional[str], Optional[str]]:
+    """(nombre a eliminar, aviso con candidatos) a partir de la búsqueda aproximada de event.
+
+    Solo se elimina sin preguntar si el nombre coincide tal cual o si, con una
+    fecha concreta, todos los términos de event encajan con un único nombre.
+    Una coincidencia parcial ("cita" en "cita con el dentista" frente a "Cita
+    con Ana") devuelve los candidatos en lugar de borrar.
+    """
+    if not matches:
+        # Sin coincidencias se intenta el nombre tal cual para conservar el mensaje del repositorio
+        return event, None
+    exact = _exact_name(event, matches)
+    if exact:
+        return exact, None
+    strong = [m for m in matches if m.score >= name_search.STRONG_MATCH]
+    best = name_search.unique_best_name(strong) if date else None
+    if best and best == name_search.unique_best_name(matches):
+        return best, None
+    return None, format_ambiguous_name(event, matches)
+
+@dataclass
+class ImportReport:
+    """Resultado de una importación masiva."""
+    imported: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: List[str] = field(default_factory=list)  # muestra de motivos de rechazo
+
+    MAX_ERRORS = 20
+
+    def reject(self, reason: str):
+        self.rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(reason)
+
+    def summary(self) -> str:
+        text = f"Importados: {self.imported} · duplicados omitidos: {self.duplicates} · rechazados: {self.rejected}"
+        return text + "".join(f"\n  {e}" for e in self.errors)
+
+def _event_key(event: Event) -> Tuple[str, str, str]:
+    return event.name, event.date, event.time
 
 class AgendaService:
-    """Servicio de aplicación que orquesta los casos de uso de la agenda."""
-    
-    def __init__(self, repository: AgendaRepository, agent: AIAgentPort = None):
+    """Servicio de aplicación que orquesta los casos de uso de la agenda.
+
+    Cada caso de uso tiene una variante asíncrona (prefijo 'a') que comparte
+    las validaciones y delega la E/S en los métodos asíncronos de los puertos.
+    Los casos de uso se miden como spans y cada pregunta a la IA abre un turno
+    de telemetría; el último queda en last_trace para el panel de depuración.
+    """
+
+    def __init__(self, repository: AgendaRepository, agent: AIAgentPort = None, router=None):
         self.repository = repository
         self.agent = agent
+        # Atajo opcional (IntentRouter) que resuelve comandos simples sin el LLM
+        self.router = router
+        self.last_trace: Optional[telemetry.TurnTrace] = None
+
+    # --- Validaciones compartidas por las variantes síncronas y asíncronas ---
 
-    def add_new_event(self, event: str, date: str, time: str) -> str:
-        from datetime import datetime, timedelta
-        
+    def _check_slot(self, date: str, time: str, duration: int) -> Optional[str]:
         try:
             event_date = datetime.strptime(date, "%Y-%m-%d").date()
-            today = datetime.now().date()
-            limit_date = today + timedelta(days=365)
-            
-            if event_date > limit_date:
-                return f"⚠️ No puedes agendar eventos a más de un año en el futuro (Límite: {limit_date})."
-                
-            new_event = Event(name=event, date=date, time=time)
-            return self.repository.save(new_event)
         except ValueError:
-            return "⚠️ El formato de fecha debe ser YYYY-MM-DD."
+            return DATE_FORMAT_ERROR
+        if to_minutes(date, time) is None:
+            return TIME_FORMAT_ERROR
+        if not 0 < duration <= MAX_DURATION_MINUTES:
+            return DURATION_ERROR
+
+        limit_date = _limit_date()
+        if event_date > limit_date:
+            return _limit_error(limit_date)
+        return None
+
+    def _prepare_event(
+        self, event: str, date: str, time: str, duration: int = DEFAULT_DURATION_MINUTES
+    ) -> Tuple[Optional[Event], Optional[str]]:
+        error = self._check_slot(date, time, duration)
+        if error:
+            return None, error
+        return Event(name=event, date=date, time=time, duration=duration), None
+
+    def _prepare_series(
+        self,
+        event: str,
+        start_date: str,
+        time: str,
+        frequency: str,
+        interval: int,
+        weekdays: Optional[List[str]],
+        until: Optional[str],
+        count: Optional[int],
+        duration: int = DEFAULT_DURATION_MINUTES,
+    ) -> Tuple[List[Event], Optional[str], str]:
+        """Expande la serie y devuelve (eventos, error, nota para la respuesta)."""
+        if not 0 < duration <= MAX_DURATION_MINUTES:
+            return [], DURATION_ERROR, ""
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            until_date = datetime.strptime(until, "%Y-%m-%d").date() if until else None
+        except ValueError:
+            return [], DATE_FORMAT_ERROR, ""
+
+        limit_date = _limit_date()
+        if start > limit_date:
+            return [], _limit_error(limit_date), ""
+
+        try:
+            rule = recurrence.RecurrenceRule(
+                frequency=frequency.upper(),
+                start=start,
+                interval=interval,
+                weekdays=recurrence.parse_weekdays(weekdays),
+                until=min(until_date or limit_date, limit_date),
+                count=count,
+            )
+            dates = recurrence.expand(rule)
+        except ValueError as e:
+            return [], f"⚠️ {e}", ""
+
+        if not dates:
+            return [], "⚠️ La serie no genera ninguna fecha con esos parámetros.", ""
+
+        events = [Event(name=event, date=d.strftime("%Y-%m-%d"), time=time, duration=duration) for d in dates]
+        note = " Fechas: " + ", ".join(e.date for e in events) + "."
+        if self._cut_by_limit(rule, dates, until_date):
+            note += f" ⚠️ Se omitieron las fechas posteriores al límite de un año ({limit_date})."
+        return events, None, note
+
+    @staticmethod
+    def _cut_by_limit(rule: "recurrence.RecurrenceRule", dates: List, until_date) -> bool:
+        """True si el límite de un año dejó fuera fechas de la serie.
+
+        Un until o un count del usuario que la terminan antes no cuentan: se
+        expande la regla sin el límite hasta una fecha más y se comprueba si existe.
+        """
+        if rule.count is not None and len(dates) >= rule.count:
+            return False
+        unbounded = replace(rule, until=until_date, count=len(dates) + 1)
+        return len(recurrence.expand(unbounded)) > len(dates)
+
+    # --- Escrituras que mantienen la vista de próximos días ---
+
+    def _write(self, write, added: Sequence[Event] = (), removed: Optional[Tuple[str, Optional[str]]] = None) -> str:
+        """Ejecuta write() y aplica su efecto a la vista de próximos días del repositorio."""
+        before = self.repository.version()
+        result = write()
+        self.repository.apply_to_digest(before, added, removed)
+        return result
 
-    def list_all_events(self) -> List[Event]:
+    async def _awrite(
+        self, write, added: Sequence[Event] = (), removed: Optional[Tuple[str, Optional[str]]] = None
+    ) -> str:
+        before = await self.repository.aversion()
+        result = await write()
+        await self.repository.aapply_to_digest(before, added, removed)
+        return result
+
+    # --- Casos de uso ---
+
+    @telemetry.timed("service")
+    def check_conflicts(self, date: str, time: str, duration: int = DEFAULT_DURATION_MINUTES) -> Sequence[Event]:
+        """Eventos que se solapan con [date time, +duration); solo lee los días afectados."""
+        window = _conflict_window(date, time, duration)
+        if window is None:
+            return EventBatch.empty()
+        start, end, first_day, last_day = window
+        return IntervalIndex(self.repository.find_between(first_day, last_day)).overlapping(start, end)
+
+    @telemetry.timed("service")
+    def add_new_event(
+        self,
+        event: str,
+        date: str,
+        time: str,
+        duration: int = DEFAULT_DURATION_MINUTES,
+        allow_overlap: bool = False,
+    ) -> str:
+        new_event, error = self._prepare_event(event, date, time, duration)
+        if error:
+            return error
+        if not allow_overlap:
+            conflicts = self.check_conflicts(date, time, duration)
+            if len(conflicts):
+                return format_conflicts(conflicts)
+        return self._write(lambda: self.repository.save(new_event), added=[new_event])
+
+    @telemetry.timed("service")
+    def find_free_slots(
+        self,
+        start_date: str,
+        end_date: Optional[str] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+        day_start: str = "08:00",
+        day_end: str = "18:00",
+    ) -> List[FreeSlot]:
+        """Huecos libres de al menos duration minutos en el horario laboral de cada día del rango."""
+        end_date = _check_slot_query(start_date, end_date, duration, day_start, day_end)
+        events = self.repository.find_between(_previous_day(start_date), end_date)
+        return IntervalIndex(events).free_slots(start_date, end_date, duration, day_start, day_end)
+
+    @telemetry.timed("service")
+    def add_recurring_events(
+        self,
+        event: str,
+        start_date: str,
+        time: str,
+        frequency: str = "WEEKLY",
+        interval: int = 1,
+        weekdays: Optional[List[str]] = None,
+        until: Optional[str] = None,
+        count: Optional[int] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+    ) -> str:
+        """Expande una serie recurrente y la guarda en una sola escritura."""
+        events, error, note = self._prepare_series(
+            event, start_date, time, frequency, interval, weekdays, until, count, duration
+        )
+        if error:
+            return error
+        return self._write(lambda: self.repository.save_many(events), added=events) + note
+
+    @telemetry.timed("service")
+    def list_all_events(self) -> Sequence[Event]:
         return self.repository.find_all()
 
-    def list_events_by_date(self, date: str) -> List[Event]:
+    @telemetry.timed("service")
+    def list_events_by_date(self, date: str) -> Sequence[Event]:
         return self.repository.find_by_date(date)
 
+    @telemetry.timed("service")
+    def list_events_between(self, start: str = None, end: str = None) -> Sequence[Event]:
+        return self.repository.find_between(start, end)
+
+    @telemetry.timed("service")
+    def list_upcoming_events(self, n: int = 10, from_date: str = None) -> Sequence[Event]:
+        return self.repository.find_next(n, from_date)
+
+    @telemetry.timed("service")
+    def agenda_summary(self, today: str = None) -> AgendaDigest:
+        """Hoy y los próximos días desde la vista materializada (sin recorrer la agenda)."""
+        return self.repository.digest(today)
+
+    @telemetry.timed("service")
+    def search_events_by_name(
+        self, query: str, start: str = None, end: str = None, limit: Optional[int] = 10
+    ) -> List[NameMatch]:
+        return self.repository.search_by_name(query, start, end, limit)
+
+    def match_event_name(self, query: str, date: str = None) -> Optional[str]:
+        """Nombre guardado igual a query salvo tildes y mayúsculas (en date si se indica), o None."""
+        return _exact_name(query, self.repository.search_by_name(query, date, date, limit=None))
+
+    @telemetry.timed("service")
     def remove_event(self, event: str, date: str = None) -> str:
-        return self.repository.delete(event, date)
+        """Elimina por nombre exacto o, con fecha, por la única coincidencia de todos los términos."""
+        name, ambiguity = _resolve_name(event, date, self.repository.search_by_name(event, date, date, limit=None))
+        if ambiguity:
+            return ambiguity
+        return self._write(lambda: self.repository.delete(name, date), removed=(name, date))
+
+    @telemetry.timed("service")
+    def import_events(self, chunks: Iterable[List[Event]]) -> ImportReport:
+        """Importa lotes de eventos validándolos como add_new_event y sin duplicar.
+
+        Un evento es duplicado si coincide en nombre, fecha y hora con uno ya
+        guardado o ya importado. Los eventos existentes de cada fecha se leen
+        una sola vez, la primera vez que un lote la trae, y de ahí en adelante
+        solo se guarda el hash de cada clave; cada lote se escribe con una
+        única llamada a save_many. Los solapes no se rechazan: una agenda
+        importada suele traerlos y bloquearía la carga entera.
+        """
+        report = ImportReport()
+        # Las combinaciones de fecha, hora y duración se repiten mucho: se valida cada una una vez
+        checked = {}
+        known_dates = set()
+        keys = set()
+        for chunk in chunks:
+            valid: List[Event] = []
+            for event in chunk:
+                slot = (event.date, event.time, event.duration)
+                if slot not in checked:
+                    checked[slot] = self._check_slot(*slot)
+                error = checked[slot] or (None if event.name else "falta el nombre")
+                if error:
+                    report.reject(f"{event.name or '(sin nombre)'} {event.date} {event.time}: {error}")
+                else:
+                    valid.append(event)
+            if not valid:
+                continue
+
+            new_dates = {e.date for e in valid} - known_dates
+            if new_dates:
+                existing = EventBatch.from_events(self.repository.find_between(min(new_dates), max(new_dates)))
+                keys.update(
+                    hash(key) for key in zip(existing.names, existing.dates, existing.times) if key[1] in new_dates
+                )
+                known_dates |= new_dates
+
+            fresh = []
+            for event in valid:
+                key = hash(_event_key(event))
+                if key in keys:
+                    report.duplicates += 1
+                    continue
+                keys.add(key)
+                fresh.append(event)
+            if not fresh:
+                continue
+
+            result = self._write(lambda: self.repository.save_many(fresh), added=fresh)
+            if result.startswith("Error"):
+                raise IOError(result)
+            report.imported += len(fresh)
+        return report
+
+    def _try_fast_path(self, user_input: str, remember: bool = True) -> Optional[str]:
+        if not self.router:
+            return None
+        answer = self.router.route(user_input)
+        if answer is not None:
+            telemetry.set_path("fast_path")
+        if answer is not None and self.agent and remember:
+            # El agente debe conocer el turno para que la conversación siga coherente
+            self.agent.remember_turn(user_input, answer)
+        return answer
 
     def ask_ai(self, user_input: str) -> str:
-        if not self.agent:
-            return "El motor de IA no está configurado."
-        return self.agent.get_response(user_input)
+        with telemetry.turn("ask_ai") as self.last_trace:
+            answer = self._try_fast_path(user_input)
+            if answer is not None:
+                return answer
+            if not self.agent:
+                return "El motor de IA no está configurado."
+            return self.agent.get_response(user_input)
+
+    def stream_ai(self, user_input: str) -> Iterator[AgentStreamEvent]:
+        with telemetry.turn("stream_ai") as self.last_trace:
+            answer = self._try_fast_path(user_input)
+            if answer is not None:
+                yield AgentStreamEvent(kind="final", content=answer)
+                return
+            if not self.agent:
+                yield AgentStreamEvent(kind="final", content="El motor de IA no está configurado.")
+                return
+            yield from self.agent.stream_response(user_input)
+
+    # --- Variantes asíncronas ---
+
+    @telemetry.timed("service")
+    async def acheck_conflicts(self, date: str, time: str, duration: int = DEFAULT_DURATION_MINUTES) -> Sequence[Event]:
+        window = _conflict_window(date, time, duration)
+        if window is None:
+            return EventBatch.empty()
+        start, end, first_day, last_day = window
+        return IntervalIndex(await self.repository.afind_between(first_day, last_day)).overlapping(start, end)
+
+    @telemetry.timed("service")
+    async def aadd_new_event(
+        self,
+        event: str,
+        date: str,
+        time: str,
+        duration: int = DEFAULT_DURATION_MINUTES,
+        allow_overlap: bool = False,
+    ) -> str:
+        new_event, error = self._prepare_event(event, date, time, duration)
+        if error:
+            return error
+        if not allow_overlap:
+            conflicts = await self.acheck_conflicts(date, time, duration)
+            if len(conflicts):
+                return format_conflicts(conflicts)
+        return await self._awrite(lambda: self.repository.asave(new_event), added=[new_event])
+
+    @telemetry.timed("service")
+    async def afind_free_slots(
+        self,
+        start_date: str,
+        end_date: Optional[str] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+        day_start: str = "08:00",
+        day_end: str = "18:00",
+    ) -> List[FreeSlot]:
+        end_date = _check_slot_query(start_date, end_date, duration, day_start, day_end)
+        events = await self.repository.afind_between(_previous_day(start_date), end_date)
+        return IntervalIndex(events).free_slots(start_date, end_date, duration, day_start, day_end)
+
+    @telemetry.timed("service")
+    async def aadd_recurring_events(
+        self,
+        event: str,
+        start_date: str,
+        time: str,
+        frequency: str = "WEEKLY",
+        interval: int = 1,
+        weekdays: Optional[List[str]] = None,
+        until: Optional[str] = None,
+        count: Optional[int] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+    ) -> str:
+        events, error, note = self._prepare_series(
+            event, start_date, time, frequency, interval, weekdays, until, count, duration
+        )
+        if error:
+            return error
+        return await self._awrite(lambda: self.repository.asave_many(events), added=events) + note
+
+    @telemetry.timed("service")
+    async def alist_all_events(self) -> Sequence[Event]:
+        return await self.repository.afind_all()
+
+    @telemetry.timed("service")
+    async def alist_events_by_date(self, date: str) -> Sequence[Event]:
+        return await self.repository.afind_by_date(date)
+
+    @telemetry.timed("service")
+    async def alist_events_between(self, start: str = None, end: str = None) -> Sequence[Event]:
+        return await self.repository.afind_between(start, end)
+
+    @telemetry.timed("service")
+    async def alist_upcoming_events(self, n: int = 10, from_date: str = None) -> Sequence[Event]:
+        return await self.repository.afind_next(n, from_date)
+
+    @telemetry.timed("service")
+    async def aagenda_summary(self, today: str = None) -> AgendaDigest:
+        return await self.repository.adigest(today)
+
+    @telemetry.timed("service")
+    async def asearch_events_by_name(
+        self, query: str, start: str = None, end: str = None, limit: Optional[int] = 10
+    ) -> List[NameMatch]:
+        return await self.repository.asearch_by_name(query, start, end, limit)
+
+    @telemetry.timed("service")
+    async def aremove_event(self, event: str, date: str = None) -> str:
+        matches = await self.repository.asearch_by_name(event, date, date, None)
+        name, ambiguity = _resolve_name(event, date, matches)
+        if ambiguity:
+            return ambiguity
+        return await self._awrite(lambda: self.repository.adelete(name, date), removed=(name, date))
+
+    async def aask_ai(self, user_input: str) -> str:
+        with telemetry.turn("aask_ai") as self.last_trace:
+            answer = self._try_fast_path(user_input, remember=False)
+            if answer is not None:
+                if self.agent:
+                    await self.agent.aremember_turn(user_input, answer)
+                return answer
+            if not self.agent:
+                return "El motor de IA no está configurado."
+            return await self.agent.aget_response(user_input)
@@ -4,12 +4,37 @@ import os
 # En la rama 'version-audi' podrías cambiar esto a 'agenda_audi.xlsx'
 AGENDA_FILENAME = "agenda_audi.xlsx"
 
+# Journal append-only usado por JournalRepositoryAdapter (alternativa al Excel)
+AGENDA_JOURNAL_FILENAME = "agenda_audi.journal"
+
+# Base de datos usada por SqliteRepositoryAdapter
+AGENDA_DB_FILENAME = "agenda_audi.db"
+
+# Backend de persistencia de la agenda: "excel", "journal" o "sqlite"
+AGENDA_BACKEND = os.getenv("AGENDA_BACKEND", "excel")
+
+# Sharding por inquilino (usuario o área): un archivo del backend por inquilino en AGENDA_SHARDS_DIR.
+# Al activarlo por primera vez, la agenda única se migra al inquilino por defecto.
+AGENDA_SHARDING = os.getenv("AGENDA_SHARDING", "0") == "1"
+AGENDA_SHARDS_DIR = "agenda_shards"
+AGENDA_DEFAULT_TENANT = "general"
+
+# Hilo que reconstruye al empezar cada día la vista de hoy y los próximos 7 días
+# (sin él se reconstruye en la primera consulta del día)
+DIGEST_REFRESH_ENABLED = os.getenv("AGENDA_DIGEST_REFRESH", "1") == "1"
+
 # Ruta al archivo del prompt (relativa a la raíz del módulo)
 SYSTEM_PROMPT_PATH = os.path.join(os.path.dirname(__file__), "prompts", "system_prompt.md")
 
 # Ruta al archivo de logs (absoluta a la raíz del proyecto)
 LOG_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.log")
 
+# Instrumentación: log JSON por turno y endpoint Prometheus (/metrics; 0 = desactivado)
+TELEMETRY_LOG_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "telemetry.jsonl")
+METRICS_PORT = int(os.getenv("AGENDA_METRICS_PORT", "0"))
+# Trazas de LangChain por consola (AgentExecutor verbose)
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "0") == "1"
+
 # Opciones de modelos disponibles
 MODEL_OPTIONS = {
     "gpt-5.2 — Alto rendimiento (texto & razonamiento)": "gpt-5.2",
@@ -19,3 +44,34 @@ MODEL_OPTIONS = {
     "gpt-5-nano — Ultra-económico para respuestas simples": "gpt-5-nano",
     "gpt-3.5-turbo — Modelo estándar compatible": "gpt-3.5-turbo"
 }
+
+# Enrutado por complejidad: los turnos simples (una consulta o un alta) van al modelo
+# rápido; los de varios pasos o ambiguos, y los que fallan la validación de una
+# herramienta con el modelo rápido, van al modelo elegido en la barra lateral.
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING", "1") == "1"
+MODEL_ROUTING_FAST_MODEL = "gpt-5-nano"
+# Del más rápido al más capaz; solo se enruta si el modelo elegido está por encima del rápido
+MODEL_TIERS = ["gpt-5-nano", "gpt-5-mini", "gpt-5", "gpt-5.1", "gpt-5.2"]
+
+# Presupuesto de memoria de chat por modelo (en tokens). Los turnos que no caben
+# en max_history_tokens se resumen con summary_model; las respuestas que superan
+# max_message_tokens se recortan al guardarse en el historial.
+MEMORY_BUDGETS = {
+    "default": {"max_history_tokens": 2000, "max_message_tokens": 400, "summary_model": "gpt-5-nano"},
+    "gpt-5.2": {"max_history_tokens": 4000, "max_message_tokens": 600},
+    "gpt-5.1": {"max_history_tokens": 4000, "max_message_tokens": 600},
+    "gpt-5": {"max_history_tokens": 3000},
+    "gpt-5-nano": {"max_history_tokens": 1200, "max_message_tokens": 300},
+    "gpt-3.5-turbo": {"max_history_tokens": 1500, "summary_model": "gpt-3.5-turbo"},
+}
+
+# Atajo determinista para comandos simples (listar/agregar/eliminar con fecha explícita)
+FAST_PATH_ROUTER_ENABLED = True
+
+# Caché de respuestas para preguntas de solo lectura (se invalida al cambiar la agenda)
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_MAX_ENTRIES = 512
+# Nivel semántico opcional: requiere sentence-transformers y hnswlib
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "0") == "1"
+RESPONSE_CACHE_SIMILARITY = 0.92
+RESPONSE_CACHE_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
@@ -0,0 +1,67 @@
+import bisect
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from .entities import Event
+
+DIGEST_DAYS = 7  # hoy y los 6 días siguientes
+
+class AgendaDigest:
+    """Vista materializada de los próximos DIGEST_DAYS días de la agenda.
+
+    Guarda los eventos de cada día de la ventana ordenados por hora, de modo
+    que "qué tengo hoy", "qué tengo esta semana" y el conteo por día se
+    responden sin consultar el almacenamiento. version es la versión del
+    repositorio con la que coincide; las escrituras locales se aplican con
+    add/remove y el repositorio la reconstruye si la versión deja de cuadrar
+    o cambia el día.
+    """
+
+    def __init__(self, start: str, events: Iterable[Event] = (), version: int = 0, days: int = DIGEST_DAYS):
+        first = date.fromisoformat(start)
+        self.start = start
+        self.version = version
+        self.dates = [(first + timedelta(days=i)).isoformat() for i in range(days)]
+        self.end = self.dates[-1]
+        self._by_day: Dict[str, List[Event]] = {d: [] for d in self.dates}
+        for event in events:
+            if event.date in self._by_day:
+                self._by_day[event.date].append(event)
+        for day in self._by_day.values():
+            day.sort(key=lambda e: e.time)
+
+    def covers(self, day: str) -> bool:
+        return day in self._by_day
+
+    def add(self, events: Iterable[Event]):
+        # Las listas se sustituyen en lugar de modificarse: otro hilo puede estar leyéndolas
+        for event in events:
+            day = self._by_day.get(event.date)
+            if day is not None:
+                position = bisect.bisect_right([e.time for e in day], event.time)
+                self._by_day[event.date] = day[:position] + [event] + day[position:]
+
+    def remove(self, name: str, day: Optional[str] = None):
+        """Misma regla que AgendaRepository.delete: todos los eventos con ese nombre (en ese día si se indica)."""
+        for current in ([day] if day else self.dates):
+            events = self._by_day.get(current)
+            if events:
+                self._by_day[current] = [e for e in events if e.name != name]
+
+    def events_on(self, day: str) -> List[Event]:
+        return list(self._by_day.get(day, ()))
+
+    def today(self) -> List[Event]:
+        return self.events_on(self.start)
+
+    def upcoming(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Event]:
+        """Eventos de la ventana (o de la parte de ella entre start y end) por fecha y hora."""
+        return [
+            e for d in self.dates if (not start or d >= start) and (not end or d <= end) for e in self._by_day[d]
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        return {d: len(self._by_day[d]) for d in self.dates}
+
+    def total(self) -> int:
+        return sum(len(events) for events in self._by_day.values())
@@ -1,9 +1,19 @@
 from dataclasses import dataclass
 from datetime import date, time
 
+# Duración asumida para eventos guardados antes de que existiera el campo
+DEFAULT_DURATION_MINUTES = 60
+
 @dataclass
 class Event:
     """Entidad pura de dominio que representa un evento de agenda."""
     name: str
     date: str  # YYYY-MM-DD
     time: str  # HH:MM
+    duration: int = DEFAULT_DURATION_MINUTES  # minutos
+
+@dataclass
+class AgentStreamEvent:
+    """Fragmento emitido por el agente mientras genera una respuesta."""
+    kind: str  # "token" | "tool_start" | "tool_end" | "escalate" | "final"
+    content: str
@@ -0,0 +1,105 @@
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from .entities import DEFAULT_DURATION_MINUTES, Event
+
+def _as_object_array(values) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+def _as_durations(values: Optional[Iterable], size: int) -> np.ndarray:
+    if values is None:
+        return np.full(size, DEFAULT_DURATION_MINUTES, dtype=np.int64)
+    return np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.int64)
+
+class EventBatch(Sequence):
+    """Colección columnar de eventos (un array de NumPy por campo).
+
+    Los repositorios la devuelven en lugar de una lista de Event para no
+    crear un objeto por fila: los filtros y el formateo trabajan sobre las
+    columnas y solo se materializa un Event al acceder a un elemento.
+    """
+
+    __slots__ = ("names", "dates", "times", "durations")
+
+    def __init__(self, names: np.ndarray, dates: np.ndarray, times: np.ndarray, durations: np.ndarray = None):
+        self.names = names
+        self.dates = dates
+        self.times = times
+        self.durations = _as_durations(durations, len(names))
+
+    @classmethod
+    def empty(cls) -> "EventBatch":
+        return cls(_as_object_array([]), _as_object_array([]), _as_object_array([]))
+
+    @classmethod
+    def from_columns(
+        cls, names: Iterable, dates: Iterable, times: Iterable, durations: Optional[Iterable] = None
+    ) -> "EventBatch":
+        return cls(_as_object_array(names), _as_object_array(dates), _as_object_array(times), durations)
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> "EventBatch":
+        if isinstance(events, EventBatch):
+            return events
+        events = list(events)
+        return cls.from_columns(
+            [e.name for e in events], [e.date for e in events], [e.time for e in events],
+            [e.duration for e in events],
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple]) -> "EventBatch":
+        """Filas (nombre, fecha, hora) o (nombre, fecha, hora, duración)."""
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        columns = list(zip(*rows))
+        return cls.from_columns(*columns[:4])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]):
+        if isinstance(key, (int, np.integer)):
+            return Event(
+                name=self.names[key], date=self.dates[key], time=self.times[key],
+                duration=int(self.durations[key]),
+            )
+        return self.take(key)
+
+    def __iter__(self) -> Iterator[Event]:
+        for name, date, time, duration in zip(self.names, self.dates, self.times, self.durations):
+            yield Event(name=name, date=date, time=time, duration=int(duration))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"EventBatch({list(self)!r})"
+
+    def take(self, indices: np.ndarray) -> "EventBatch":
+        return EventBatch(self.names[indices], self.dates[indices], self.times[indices], self.durations[indices])
+
+    def mask(self, condition: np.ndarray) -> "EventBatch":
+        return self.take(condition)
+
+    def concat(self, other: "EventBatch") -> "EventBatch":
+        return EventBatch(
+            np.concatenate([self.names, other.names]),
+            np.concatenate([self.dates, other.dates]),
+            np.concatenate([self.times, other.times]),
+            np.concatenate([self.durations, other.durations]),
+        )
+
+    def render(self, template: str) -> str:
+        """Formatea todas las filas en una sola pasada; template usa {name}, {date}, {time} y {duration}."""
+        return "".join(
+            template.format(name=n, date=d, time=t, duration=m)
+            for n, d, t, m in zip(self.names, self.dates, self.times, self.durations)
+        )
@@ -0,0 +1,114 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+from .entities import Event
+from .event_batch import EventBatch
+from .text import normalize
+
+# Palabras que no distinguen un evento de otro ("la reunión de comité" ≈ "reunión comité")
+STOPWORDS = frozenset(
+    "a al con de del el en la las lo los mi mis para por su sus un una y".split()
+)
+MIN_TOKEN_SIMILARITY = 0.45
+MIN_SCORE = 0.5
+# Todos los términos de la búsqueda encajan (exactos, como prefijo o con una errata leve)
+STRONG_MATCH = 0.9
+
+@dataclass
+class NameMatch:
+    event: Event
+    score: float  # 0..1, 1 = todos los términos de la búsqueda coinciden exactamente
+
+def tokens(text: str) -> List[str]:
+    words = normalize(text).split()
+    return [w for w in words if w not in STOPWORDS] or words
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """Índice invertido de nombres de evento con similitud por trigramas.
+
+    Cada nombre distinto se normaliza (sin tildes ni palabras vacías) y sus
+    términos se indexan una vez; los términos del vocabulario se indexan a
+    su vez por trigramas. Una búsqueda solo compara contra los términos que
+    comparten algún trigrama con la consulta, así que tolera erratas y
+    variantes ("reunion" / "reuniones") sin recorrer toda la agenda.
+    """
+
+    def __init__(self, events: Iterable[Event] = ()):
+        self._batch = EventBatch.from_events(events)
+        self._rows: Dict[str, List[int]] = defaultdict(list)
+        for position, name in enumerate(self._batch.names):
+            self._rows[name].append(position)
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._by_trigram: Dict[str, Set[str]] = defaultdict(set)
+        self._gram_counts: Dict[str, int] = {}
+        for name in self._rows:
+            for token in tokens(name):
+                if token not in self._postings:
+                    grams = trigrams(token)
+                    self._gram_counts[token] = len(grams)
+                    for gram in grams:
+                        self._by_trigram[gram].add(token)
+                self._postings[token].add(name)
+
+    def __len__(self) -> int:
+        return len(self._batch)
+
+    def _similar_tokens(self, token: str) -> Dict[str, float]:
+        query_grams = trigrams(token)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for candidate in self._by_trigram.get(gram, ()):
+                shared[candidate] += 1
+        similar = {}
+        for candidate, common in shared.items():
+            score = common / (len(query_grams) + self._gram_counts[candidate] - common)
+            if len(token) >= 3 and candidate.startswith(token):
+                # "comit" mientras se escribe "comité"
+                score = max(score, 0.9)
+            if score >= MIN_TOKEN_SIMILARITY:
+                similar[candidate] = score
+        return similar
+
+    def search(
+        self, query: str, start: Optional[str] = None, end: Optional[str] = None, limit: Optional[int] = 10
+    ) -> List[NameMatch]:
+        """Eventos cuyo nombre se parece a query, del más al menos parecido (y por fecha y hora).
+
+        limit=None devuelve todas las coincidencias.
+        """
+        query_tokens = tokens(query)
+        if not query_tokens:
+            return []
+        scores: Dict[str, float] = defaultdict(float)
+        for token in query_tokens:
+            best: Dict[str, float] = {}
+            for candidate, similarity in self._similar_tokens(token).items():
+                for name in self._postings[candidate]:
+                    best[name] = max(best.get(name, 0.0), similarity)
+            for name, similarity in best.items():
+                scores[name] += similarity / len(query_tokens)
+
+        matches = []
+        for name, score in scores.items():
+            if score < MIN_SCORE:
+                continue
+            for position in self._rows[name]:
+                date = self._batch.dates[position]
+                if (start and date < start) or (end and date > end):
+                    continue
+                matches.append(NameMatch(self._batch[position], round(score, 3)))
+        matches.sort(key=lambda m: (-m.score, m.event.date, m.event.time))
+        return matches if limit is None else matches[: max(limit, 0)]
+
+def unique_best_name(matches: List[NameMatch], margin: float = 0.15) -> Optional[str]:
+    """Nombre del mejor resultado si ningún otro nombre distinto le compite (a menos de margin)."""
+    if not matches:
+        return None
+    best = matches[0]
+    rivals = [m for m in matches if m.event.name != best.event.name and m.score > best.score - margin]
+    return None if rivals else best.event.name
@@ -1,5 +1,7 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Iterator
+from ..entities import AgentStreamEvent
 
 class AIAgentPort(ABC):
     """Puerto de salida para el motor de Inteligencia Artificial."""
@@ -7,3 +9,22 @@ class AIAgentPort(ABC):
     @abstractmethod
     def get_response(self, user_input: str, chat_history: Any) -> str:
         pass
+
+    async def aget_response(self, user_input: str, chat_history: Any = None) -> str:
+        """Variante asíncrona; por defecto ejecuta get_response en un hilo."""
+        return await asyncio.to_thread(self.get_response, user_input, chat_history)
+
+    def remember_turn(self, user_input: str, output: str):
+        """Registra un turno resuelto fuera del agente (caché, atajos) en su memoria."""
+        pass
+
+    async def aremember_turn(self, user_input: str, output: str):
+        """Variante asíncrona; por defecto ejecuta remember_turn en un hilo."""
+        await asyncio.to_thread(self.remember_turn, user_input, output)
+
+    def stream_response(self, user_input: str) -> Iterator[AgentStreamEvent]:
+        """Emite tokens y pasos de herramientas; el último evento es siempre 'final'.
+
+        Por defecto no hay streaming real: se emite la respuesta completa.
+        """
+        yield AgentStreamEvent(kind="final", content=self.get_response(user_input, None))
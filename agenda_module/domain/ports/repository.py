@@ -1,22 +1,186 @@
+import asyncio
+import contextvars
+import functools
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
 from ..entities import Event
+from ..digest import DIGEST_DAYS, AgendaDigest
+from ..name_search import NameIndex, NameMatch
 
 class AgendaRepository(ABC):
-    """Puerto de salida para la persistencia de la agenda."""
+    """Puerto de salida para la persistencia de la agenda.
+
+    Las variantes asíncronas (prefijo 'a') ejecutan la operación síncrona en
+    un pool de hilos acotado y compartido, para que la E/S de archivos no
+    bloquee el event loop. Un adaptador con E/S nativamente asíncrona puede
+    sobrescribirlas.
+    """
+
+    IO_WORKERS = 4
+    _io_executor: Optional[ThreadPoolExecutor] = None
+    _digest_lock = threading.Lock()
+
+    @classmethod
+    def _get_io_executor(cls) -> ThreadPoolExecutor:
+        if AgendaRepository._io_executor is None:
+            AgendaRepository._io_executor = ThreadPoolExecutor(
+                max_workers=cls.IO_WORKERS, thread_name_prefix="agenda-io"
+            )
+        return AgendaRepository._io_executor
+
+    def version(self) -> int:
+        """Contador que aumenta cada vez que cambia la agenda (save/save_many/delete).
+
+        Lo usan las cachés de capas superiores para saber cuándo invalidar.
+        """
+        return getattr(self, "_version", 0)
+
+    def _bump_version(self):
+        self._version = getattr(self, "_version", 0) + 1
+
+    def search_by_name(
+        self, query: str, start: Optional[str] = None, end: Optional[str] = None, limit: Optional[int] = 10
+    ) -> List[NameMatch]:
+        """Búsqueda aproximada por nombre (sin tildes, tolerante a erratas) entre start y end.
+
+        El NameIndex se construye una vez por versión de la agenda, así que
+        las búsquedas siguientes no vuelven a leer el almacenamiento.
+        """
+        version = self.version()
+        cached = getattr(self, "_name_index", None)
+        if cached is None or cached[0] != version:
+            cached = (version, NameIndex(self.find_all()))
+            self._name_index = cached
+        return cached[1].search(query, start, end, limit)
+
+    def digest(self, today: Optional[str] = None) -> AgendaDigest:
+        """Vista materializada de los próximos días (ver AgendaDigest).
+
+        Se reconstruye con una sola consulta de la ventana cuando cambió la
+        versión (escrituras de otros procesos o fuera del servicio) o el día;
+        las escrituras del servicio la actualizan con apply_to_digest.
+        """
+        today = today or date.today().isoformat()
+        version = self.version()
+        cached = getattr(self, "_digest", None)
+        if cached is not None and cached.version == version and cached.start == today:
+            return cached
+        end = (date.fromisoformat(today) + timedelta(days=DIGEST_DAYS - 1)).isoformat()
+        cached = AgendaDigest(today, self.find_between(today, end), version)
+        with self._digest_lock:
+            # Si hubo una escritura durante la consulta no se guarda: podría aplicarse dos veces
+            if self.version() == version:
+                self._digest = cached
+        return cached
+
+    def apply_to_digest(
+        self, version_before: int, added: Iterable[Event] = (), removed: Optional[Tuple[str, Optional[str]]] = None
+    ):
+        """Aplica a la vista una escritura hecha desde version_before sin releer la agenda.
+
+        added son los eventos guardados y removed el (nombre, fecha) pasado a
+        delete. Si la vista no estaba al día en version_before (otra escritura
+        se adelantó) se descarta y la siguiente lectura la reconstruye.
+        """
+        version = self.version()
+        if version == version_before:
+            return
+        with self._digest_lock:
+            cached = getattr(self, "_digest", None)
+            if cached is None:
+                return
+            if cached.version != version_before:
+                self._digest = None
+                return
+            cached.add(added)
+            if removed:
+                cached.remove(*removed)
+            cached.version = version
+
+    async def _run_io(self, func, *args):
+        loop = asyncio.get_running_loop()
+        # run_in_executor no propaga contextvars: se copian para no perder el turno de telemetría
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._get_io_executor(), functools.partial(context.run, func, *args))
     
     @abstractmethod
     def save(self, event: Event) -> str:
         pass
 
     @abstractmethod
-    def find_all(self) -> List[Event]:
+    def save_many(self, events: List[Event]) -> str:
+        """Guarda un lote de eventos en una sola escritura."""
+        pass
+
+    @abstractmethod
+    def find_all(self) -> Sequence[Event]:
+        pass
+
+    @abstractmethod
+    def find_by_date(self, date: str) -> Sequence[Event]:
         pass
 
     @abstractmethod
-    def find_by_date(self, date: str) -> List[Event]:
+    def find_between(self, start: Optional[str] = None, end: Optional[str] = None) -> Sequence[Event]:
+        """Eventos entre dos fechas YYYY-MM-DD (inclusivas), ordenados por fecha y hora."""
+        pass
+
+    @abstractmethod
+    def find_next(self, n: int, from_date: Optional[str] = None) -> Sequence[Event]:
+        """Los próximos n eventos a partir de from_date o, si no se indica, de ahora."""
         pass
 
     @abstractmethod
     def delete(self, event: str, date: Optional[str] = None) -> str:
         pass
+
+    @abstractmethod
+    def delete_events(self, events: List[Event]) -> str:
+        """Borra exactamente esas filas: una por cada evento igual (nombre, fecha, hora y duración).
+
+        A diferencia de delete(), no toca otros eventos con el mismo nombre y fecha.
+        """
+        pass
+
+    async def asave(self, event: Event) -> str:
+        return await self._run_io(self.save, event)
+
+    async def asave_many(self, events: List[Event]) -> str:
+        return await self._run_io(self.save_many, events)
+
+    async def afind_all(self) -> Sequence[Event]:
+        return await self._run_io(self.find_all)
+
+    async def afind_by_date(self, date: str) -> Sequence[Event]:
+        return await self._run_io(self.find_by_date, date)
+
+    async def afind_between(self, start: Optional[str] = None, end: Optional[str] = None) -> Sequence[Event]:
+        return await self._run_io(self.find_between, start, end)
+
+    async def afind_next(self, n: int, from_date: Optional[str] = None) -> Sequence[Event]:
+        return await self._run_io(self.find_next, n, from_date)
+
+    async def asearch_by_name(
+        self, query: str, start: Optional[str] = None, end: Optional[str] = None, limit: Optional[int] = 10
+    ) -> List[NameMatch]:
+        return await self._run_io(self.search_by_name, query, start, end, limit)
+
+    async def aversion(self) -> int:
+        return await self._run_io(self.version)
+
+    async def adigest(self, today: Optional[str] = None) -> AgendaDigest:
+        return await self._run_io(self.digest, today)
+
+    async def aapply_to_digest(
+        self, version_before: int, added: Iterable[Event] = (), removed: Optional[Tuple[str, Optional[str]]] = None
+    ):
+        await self._run_io(self.apply_to_digest, version_before, added, removed)
+
+    async def adelete(self, event: str, date: Optional[str] = None) -> str:
+        return await self._run_io(self.delete, event, date)
+
+    async def adelete_events(self, events: List[Event]) -> str:
+        return await self._run_io(self.delete_events, events)
@@ -0,0 +1,82 @@
+import calendar
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List, Optional
+
+WEEKDAY_CODES = {
+    "LU": 0, "MA": 1, "MI": 2, "JU": 3, "VI": 4, "SA": 5, "DO": 6,
+    "MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SU": 6,
+}
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+
+@dataclass
+class RecurrenceRule:
+    """Regla de recurrencia inspirada en RRULE (RFC 5545), reducida a lo que usa la agenda."""
+    frequency: str  # DAILY | WEEKLY | MONTHLY
+    start: date
+    interval: int = 1
+    weekdays: List[int] = field(default_factory=list)  # 0 = lunes ... 6 = domingo
+    until: Optional[date] = None
+    count: Optional[int] = None
+
+def parse_weekdays(codes: Optional[List[str]]) -> List[int]:
+    """Convierte códigos como 'LU' o 'MO' en números de día (0 = lunes)."""
+    days = []
+    for code in codes or []:
+        key = code.strip().upper()[:2]
+        if key not in WEEKDAY_CODES:
+            raise ValueError(f"Día de la semana no reconocido: {code}")
+        days.append(WEEKDAY_CODES[key])
+    return sorted(set(days))
+
+def expand(rule: RecurrenceRule) -> List[date]:
+    """Genera las fechas de la serie, acotadas por until y/o count."""
+    if rule.frequency not in FREQUENCIES:
+        raise ValueError(f"Frecuencia no soportada: {rule.frequency}")
+    if rule.interval < 1:
+        raise ValueError("El intervalo debe ser mayor o igual a 1.")
+    if rule.count is not None and rule.count < 1:
+        raise ValueError("El número de repeticiones (count) debe ser mayor o igual a 1.")
+    if rule.until is None and rule.count is None:
+        raise ValueError("La serie necesita una fecha final (until) o un número de repeticiones (count).")
+
+    dates: List[date] = []
+
+    def accept(d: date) -> bool:
+        if rule.until is not None and d > rule.until:
+            return False
+        dates.append(d)
+        return rule.count is None or len(dates) < rule.count
+
+    if rule.frequency == "DAILY":
+        d = rule.start
+        while accept(d):
+            d += timedelta(days=rule.interval)
+
+    elif rule.frequency == "WEEKLY":
+        weekdays = rule.weekdays or [rule.start.weekday()]
+        week = rule.start - timedelta(days=rule.start.weekday())
+        while True:
+            for wd in weekdays:
+                d = week + timedelta(days=wd)
+                if d < rule.start:
+                    continue
+                if not accept(d):
+                    return dates
+            week += timedelta(weeks=rule.interval)
+
+    elif rule.frequency == "MONTHLY":
+        year, month, months = rule.start.year, rule.start.month, 0
+        while True:
+            # Igual que RRULE: los meses sin ese día (p. ej. 31) se omiten
+            if rule.start.day <= calendar.monthrange(year, month)[1]:
+                if not accept(date(year, month, rule.start.day)):
+                    return dates
+            elif rule.until is not None and date(year, month, 1) > rule.until:
+                return dates
+            months += rule.interval
+            year = rule.start.year + (rule.start.month - 1 + months) // 12
+            month = (rule.start.month - 1 + months) % 12 + 1
+
+    return dates
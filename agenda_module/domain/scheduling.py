@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .entities import Event
+from .event_batch import EventBatch
+
+MINUTES_PER_DAY = 24 * 60
+# Ningún evento se considera más largo que esto al buscar solapes desde días anteriores
+MAX_DURATION_MINUTES = MINUTES_PER_DAY
+
+def to_minutes(day: str, time: str) -> Optional[int]:
+    """Minuto absoluto (desde 0001-01-01) de una fecha YYYY-MM-DD y una hora HH:MM; None si no es válida."""
+    try:
+        moment = datetime.strptime(f"{day} {time}", "%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return None
+    return moment.toordinal() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def from_minutes(minutes: int) -> Tuple[str, str]:
+    day, minute = divmod(minutes, MINUTES_PER_DAY)
+    return date.fromordinal(day).isoformat(), f"{minute // 60:02d}:{minute % 60:02d}"
+
+@dataclass
+class FreeSlot:
+    date: str
+    start: str
+    end: str
+
+class IntervalIndex:
+    """Índice de intervalos [inicio, fin) ordenados por inicio.
+
+    Guarda además el máximo acumulado de los finales, que es no decreciente:
+    los eventos que solapan con [a, b) son los que empiezan antes de b y
+    están después del primer índice cuyo máximo acumulado supera a. Ambos
+    extremos salen de una búsqueda binaria, así que una consulta cuesta
+    O(log n + k). Los eventos con fecha u hora no interpretables se omiten.
+    """
+
+    def __init__(self, events: Iterable[Event] = ()):
+        batch = EventBatch.from_events(events)
+        parsed = [to_minutes(d, t) for d, t in zip(batch.dates, batch.times)]
+        valid = np.array([m is not None for m in parsed], dtype=bool)
+        batch = batch.mask(valid)
+        starts = np.array([m for m in parsed if m is not None], dtype=np.int64)
+        order = np.argsort(starts, kind="stable")
+        self._events = batch.take(order)
+        self._starts = starts[order]
+        self._ends = self._starts + np.maximum(self._events.durations, 0)
+        self._max_end = np.maximum.accumulate(self._ends) if len(self._ends) else self._ends
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _window(self, start: int, end: int) -> np.ndarray:
+        lo = int(np.searchsorted(self._max_end, start, side="right"))
+        hi = int(np.searchsorted(self._starts, end, side="left"))
+        if hi <= lo:
+            return np.arange(0)
+        return np.arange(lo, hi)[self._ends[lo:hi] > start]
+
+    def overlapping(self, start: int, end: int) -> EventBatch:
+        """Eventos que se solapan con [start, end) (minutos absolutos)."""
+        return self._events.take(self._window(start, end))
+
+    def busy(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Intervalos ocupados dentro de [start, end), fusionados y ordenados."""
+        merged: List[Tuple[int, int]] = []
+        idx = self._window(start, end)
+        for s, e in zip(self._starts[idx], self._ends[idx]):
+            s, e = max(int(s), start), min(int(e), end)
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        return merged
+
+    def free_slots(
+        self,
+        start_date: str,
+        end_date: str,
+        duration: int,
+        day_start: str = "08:00",
+        day_end: str = "18:00",
+        limit: int = 20,
+    ) -> List[FreeSlot]:
+        """Huecos de al menos `duration` minutos dentro del horario [day_start, day_end) de cada día."""
+        first = datetime.strptime(start_date, "%Y-%m-%d").date()
+        last = datetime.strptime(end_date, "%Y-%m-%d").date()
+        slots: List[FreeSlot] = []
+        day = first
+        while day <= last and len(slots) < limit:
+            iso = day.isoformat()
+            window_start, window_end = to_minutes(iso, day_start), to_minutes(iso, day_end)
+            cursor = window_start
+            for busy_start, busy_end in self.busy(window_start, window_end) + [(window_end, window_end)]:
+                if busy_start - cursor >= duration:
+                    slots.append(FreeSlot(iso, from_minutes(cursor)[1], from_minutes(busy_start)[1]))
+                    if len(slots) >= limit:
+                        break
+                cursor = max(cursor, busy_end)
+            day += timedelta(days=1)
+        return slots
@@ -0,0 +1,148 @@
+import re
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+
+WEEKDAYS = {
+    "lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3, "viernes": 4, "sabado": 5, "domingo": 6,
+}
+
+MONTHS = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+
+Span = Tuple[int, int]
+
+_WEEKDAY_RE = "|".join(WEEKDAYS)
+_MONTH_RE = "|".join(MONTHS)
+
+_ISO = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_SLASH = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+_DAY_OF_MONTH = re.compile(rf"\b(?:el\s+)?(\d{{1,2}})\s+de\s+({_MONTH_RE})(?:\s+(?:de|del)\s+(\d{{4}}))?\b")
+_PASADO_MANANA = re.compile(r"\bpasado\s+manana\b")
+# "mañana" como franja del día ("por la mañana") no es una fecha
+_MANANA = re.compile(r"(?<!la\s)\bmanana\b")
+_HOY = re.compile(r"\bhoy\b")
+_WEEKDAY = re.compile(
+    rf"\b(?:el\s+)?(?:(?:proximo|siguiente)\s+)?({_WEEKDAY_RE})(?:\s+(?:que\s+viene|proximo))?\b"
+)
+
+# "el martes 10": el número puede ser el día del mes, que no tiene por qué caer en ese martes
+_WEEKDAY_DAY_NUMBER = re.compile(rf"\b(?:{_WEEKDAY_RE})\s+(?:de\s+)?\d{{1,2}}\b(?!\s*(?::|am\b|pm\b|h\b))")
+
+# Referencias a turnos anteriores ("ese día", "el otro"): el texto no se entiende sin la conversación
+_CONTEXT_REFERENCES = re.compile(
+    r"\b(?:ese|esa|eso|esos|esas|aquel\w*|el\s+anterior|la\s+anterior|lo\s+mismo|el\s+mismo|la\s+misma|otra\s+vez"
+    r"|el\s+otro|la\s+otra|los\s+otros|las\s+otras)\b"
+)
+
+_THIS_WEEK = re.compile(r"\besta\s+semana\b")
+_NEXT_WEEK = re.compile(r"\b(?:la\s+)?(?:proxima\s+semana|semana\s+que\s+viene|siguiente\s+semana)\b")
+
+_TIME_PATTERNS = [
+    re.compile(
+        r"\ba\s+las?\s+(\d{1,2})(?::(\d{2}))?"
+        r"\s*(am|pm|a\.\s?m\.|p\.\s?m\.|(?:de|por|en)\s+la\s+(?:manana|tarde|noche))?"
+    ),
+    re.compile(r"\b(\d{1,2}):(\d{2})\s*(am|pm)?\b"),
+    re.compile(r"\b(\d{1,2})\s*(am|pm)\b"),
+]
+
+def references_context(folded: str) -> bool:
+    """True si el texto (ya normalizado con fold()) alude a algo dicho en turnos anteriores."""
+    return bool(_CONTEXT_REFERENCES.search(folded))
+
+def _next_weekday(today: date, weekday: int) -> date:
+    days = (weekday - today.weekday()) % 7
+    return today + timedelta(days=days or 7)
+
+def find_dates(folded: str, today: date) -> List[Tuple[date, Span]]:
+    """Todas las fechas (absolutas o relativas) que aparecen en un texto ya normalizado con fold()."""
+    found: List[Tuple[date, Span]] = []
+    taken: List[Span] = []
+
+    def add(value: Optional[date], span: Span):
+        if value is None or any(s < span[1] and span[0] < e for s, e in taken):
+            return
+        taken.append(span)
+        found.append((value, span))
+
+    for m in _ISO.finditer(folded):
+        add(_safe_date(int(m.group(1)), int(m.group(2)), int(m.group(3))), m.span())
+    for m in _SLASH.finditer(folded):
+        add(_safe_date(int(m.group(3)), int(m.group(2)), int(m.group(1))), m.span())
+    for m in _DAY_OF_MONTH.finditer(folded):
+        day, month = int(m.group(1)), MONTHS[m.group(2)]
+        year = int(m.group(3)) if m.group(3) else today.year
+        value = _safe_date(year, month, day)
+        # Sin año explícito, una fecha ya pasada se entiende como la del año siguiente
+        if value and not m.group(3) and value < today:
+            value = _safe_date(year + 1, month, day)
+        add(value, m.span())
+    for m in _PASADO_MANANA.finditer(folded):
+        add(today + timedelta(days=2), m.span())
+    for m in _MANANA.finditer(folded):
+        add(today + timedelta(days=1), m.span())
+    for m in _HOY.finditer(folded):
+        add(today, m.span())
+    for m in _WEEKDAY.finditer(folded):
+        add(_next_weekday(today, WEEKDAYS[m.group(1)]), m.span())
+
+    return sorted(found, key=lambda item: item[1])
+
+def find_week(folded: str, today: date) -> Optional[Tuple[date, date, Span]]:
+    """Resuelve 'esta semana' / 'la próxima semana' a (lunes, domingo)."""
+    monday = today - timedelta(days=today.weekday())
+    m = _NEXT_WEEK.search(folded)
+    if m:
+        monday += timedelta(weeks=1)
+        return monday, monday + timedelta(days=6), m.span()
+    m = _THIS_WEEK.search(folded)
+    if m:
+        return monday, monday + timedelta(days=6), m.span()
+    return None
+
+def _scan_times(folded: str) -> List[Tuple[str, Span, bool]]:
+    """(HH:MM, span, ambigua) de cada hora; ambigua si es de 1 a 11, sin minutos, am/pm ni franja del día."""
+    found: List[Tuple[str, Span, bool]] = []
+    taken: List[Span] = []
+    for pattern in _TIME_PATTERNS:
+        for m in pattern.finditer(folded):
+            span = m.span()
+            if any(s < span[1] and span[0] < e for s, e in taken):
+                continue
+            groups = m.groups()
+            hour = int(groups[0])
+            minute = int(groups[1]) if len(groups) > 2 and groups[1] else 0
+            suffix = (groups[-1] or "").replace(".", "").replace(" ", "")
+            if (suffix == "pm" or suffix.endswith(("tarde", "noche"))) and hour < 12:
+                hour += 12
+            elif (suffix == "am" or suffix.endswith("manana")) and hour == 12:
+                hour = 0
+            if hour > 23 or minute > 59:
+                continue
+            # "a las 4" puede ser 04:00 o 16:00; "a las 04", "10:00" o "16:00" no lo son
+            bare = not suffix and not (len(groups) > 2 and groups[1]) and not groups[0].startswith("0")
+            ambiguous = bare and 1 <= hour <= 11
+            taken.append(span)
+            found.append((f"{hour:02d}:{minute:02d}", span, ambiguous))
+    return sorted(found, key=lambda item: item[1])
+
+def find_times(folded: str) -> List[Tuple[str, Span]]:
+    """Horas explícitas ('a las 10', '15:30', '3 pm') convertidas a HH:MM."""
+    return [(value, span) for value, span, _ in _scan_times(folded)]
+
+def has_ambiguous_time(folded: str) -> bool:
+    """True si alguna hora es 'a las 1' a 'a las 11' sin am/pm ni franja ('a las 4' frente a 'a las 4 de la tarde')."""
+    return any(ambiguous for _, _, ambiguous in _scan_times(folded))
+
+def has_weekday_day_number(folded: str) -> bool:
+    """True si un día de la semana va seguido de un número de día ('el martes 10')."""
+    return _WEEKDAY_DAY_NUMBER.search(folded) is not None
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
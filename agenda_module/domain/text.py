@@ -0,0 +1,20 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def _fold_char(c: str) -> str:
+    return (unicodedata.normalize("NFKD", c)[:1] or c).lower()[:1] or c
+
+def fold(text: str) -> str:
+    """Minúsculas y sin tildes, carácter a carácter.
+
+    Es la única regla de la agenda para comparar textos sin tildes ni
+    mayúsculas. Conserva la longitud, así que las posiciones encontradas en
+    el texto plegado valen también para el original.
+    """
+    return "".join(_fold_char(c) for c in str(text))
+
+def normalize(text: str) -> str:
+    """fold() dejando solo letras y dígitos separados por un espacio (nombres, claves de caché)."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", fold(text)).split())
@@ -1,49 +1,127 @@
 from langchain.agents import create_openai_tools_agent, AgentExecutor
 from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+import contextvars
 import datetime
+import functools
 import logging
-from typing import Any
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from ...domain.entities import AgentStreamEvent
 from ...domain.ports.agent_port import AIAgentPort
-from ...config import AGENDA_FILENAME, SYSTEM_PROMPT_PATH
+from .chat_memory import BudgetedChatMemory, budget_for
+from .model_router import ModelRouter, RouteDecision, ToolOutcomeHandler
+from .telemetry_callback import TelemetryCallbackHandler
+from ... import telemetry
+from ...config import AGENDA_FILENAME, AGENT_VERBOSE, MODEL_ROUTING_ENABLED, SYSTEM_PROMPT_PATH
 
 logger = logging.getLogger(__name__)
 
+def temperature_for(model_name: str) -> float:
+    # Los modelos de razonamiento (gpt-5, o1) solo aceptan temperatura 1
+    if model_name.startswith("gpt-5") or model_name.startswith("o1"):
+        return 1.0
+    return 0.0
+
+@functools.lru_cache(maxsize=1)
+def load_system_prompt_template() -> str:
+    """Lee la plantilla del prompt una sola vez por proceso."""
+    with open(SYSTEM_PROMPT_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+class _QueueStreamHandler(BaseCallbackHandler):
+    """Publica en una cola los tokens del LLM y los pasos de herramientas."""
+
+    def __init__(self, events: "queue.Queue"):
+        self.events = events
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        # Las llamadas que solo eligen herramienta emiten tokens vacíos
+        if token:
+            self.events.put(AgentStreamEvent(kind="token", content=token))
+
+    def on_tool_start(self, serialized: dict, input_str: str, **kwargs: Any) -> None:
+        self.events.put(AgentStreamEvent(kind="tool_start", content=(serialized or {}).get("name", "")))
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.events.put(AgentStreamEvent(kind="tool_end", content=str(output)))
+
 class LangChainAgentAdapter(AIAgentPort):
-    """Adaptador de infraestructura para el agente de LangChain."""
+    """Adaptador de infraestructura para el agente de LangChain.
+
+    Con el enrutado activo, cada turno va al modelo que indica ModelRouter
+    (un executor por modelo, con las mismas herramientas y memoria). Si un
+    turno simple falla en el modelo rápido (error o argumentos rechazados
+    por una herramienta) y no llegó a escribir nada, se repite con el
+    modelo elegido. La memoria se actualiza una sola vez, con la respuesta
+    que se entrega.
+    """
     
-    def __init__(self, openai_api_key: str, tools: list, model_name: str = "gpt-3.5-turbo"):
+    def __init__(
+        self,
+        openai_api_key: str,
+        tools: list,
+        model_name: str = "gpt-3.5-turbo",
+        memory: BudgetedChatMemory = None,
+        llm: Any = None,
+        routing: bool = MODEL_ROUTING_ENABLED,
+    ):
         self.openai_api_key = openai_api_key
         self.tools = tools
         self.model_name = model_name
-        self.executor = self._initialize_executor()
-
-    def _initialize_executor(self) -> AgentExecutor:
-        # Lógica de temperatura ya implementada previamente
-        if self.model_name.startswith("gpt-5") or self.model_name.startswith("o1"):
-            temp = 1.0
-        else:
-            temp = 0.0
-            
-        llm = ChatOpenAI(
-            model_name=self.model_name, 
-            openai_api_key=self.openai_api_key, 
-            temperature=temp
-        )
-        
-        memory = ConversationBufferMemory(
+        # Modelo de chat alternativo (p. ej. el modelo falso de benchmarks/); por defecto ChatOpenAI
+        self.llm = llm
+        # La memoria puede venir de fuera (AgentSessionCache) para sobrevivir a los reruns
+        self.memory = memory if memory is not None else self.create_memory(model_name, openai_api_key)
+        # Con un modelo inyectado no hay niveles entre los que elegir
+        self.router = ModelRouter(model_name) if routing and llm is None else None
+        self._executors: Dict[str, AgentExecutor] = {}
+        self._telemetry_handlers: Dict[str, TelemetryCallbackHandler] = {}
+        self.telemetry_handler = self._telemetry_for(model_name)
+        self.executor = self._executor_for(model_name)
+
+    @staticmethod
+    def create_memory(model_name: str, openai_api_key: str) -> BudgetedChatMemory:
+        summary_model = budget_for(model_name)["summary_model"]
+        memory = BudgetedChatMemory(
             memory_key="chat_history", 
-            return_messages=True
+            return_messages=True,
+            summary_llm=ChatOpenAI(
+                model_name=summary_model,
+                openai_api_key=openai_api_key,
+                temperature=temperature_for(summary_model),
+            ),
+        )
+        memory.apply_budget(model_name)
+        return memory
+
+    def _telemetry_for(self, model_name: str) -> TelemetryCallbackHandler:
+        if model_name not in self._telemetry_handlers:
+            self._telemetry_handlers[model_name] = TelemetryCallbackHandler(model_name)
+        return self._telemetry_handlers[model_name]
+
+    def _executor_for(self, model_name: str) -> AgentExecutor:
+        # Los executors de cada nivel se crean la primera vez que se usan
+        if model_name not in self._executors:
+            self._executors[model_name] = self._initialize_executor(model_name)
+        return self._executors[model_name]
+
+    def _initialize_executor(self, model_name: str) -> AgentExecutor:
+        llm = self.llm or ChatOpenAI(
+            model_name=model_name, 
+            openai_api_key=self.openai_api_key, 
+            temperature=temperature_for(model_name),
+            streaming=True
         )
         
         today = datetime.date.today().strftime("%Y-%m-%d")
         
         try:
-            with open(SYSTEM_PROMPT_PATH, "r", encoding="utf-8") as f:
-                system_prompt_raw = f.read()
-            system_prompt = system_prompt_raw.format(today=today, AGENDA_FILENAME=AGENDA_FILENAME)
+            system_prompt = load_system_prompt_template().format(today=today, AGENDA_FILENAME=AGENDA_FILENAME)
         except Exception as e:
             logger.error(f"Error cargando prompt: {e}")
             system_prompt = f"Eres un asistente de agenda. Hoy es {today}. Gestionas {AGENDA_FILENAME}."
@@ -57,15 +135,144 @@ class LangChainAgentAdapter(AIAgentPort):
 
         agent = create_openai_tools_agent(llm, self.tools, prompt)
         
+        # Sin memory=: el historial se pasa en cada llamada y se guarda una vez por turno,
+        # aunque el turno se repita con otro modelo
         return AgentExecutor(
             agent=agent,
             tools=self.tools,
-            memory=memory,
-            verbose=True,
+            verbose=AGENT_VERBOSE,
             handle_parsing_errors=True
         )
 
+    # --- Enrutado y cascada ---
+
+    def _route(self, user_input: str) -> RouteDecision:
+        decision = self.router.route(user_input) if self.router else RouteDecision(self.model_name, "selected")
+        telemetry.record_model_route(decision.model, decision.reason)
+        return decision
+
+    def _inputs(self, model_name: str, user_input: str) -> dict:
+        # El presupuesto de memoria es el del modelo que ejecuta este turno (rápido, elegido o escalado)
+        self.memory.apply_budget(model_name)
+        return {"input": user_input, **self.memory.load_memory_variables({})}
+
+    async def _ainputs(self, model_name: str, user_input: str) -> dict:
+        await self.memory.aapply_budget(model_name)
+        return {"input": user_input, **self.memory.load_memory_variables({})}
+
+    def _config(self, model_name: str, outcome: ToolOutcomeHandler, callbacks: List[Any]) -> dict:
+        return {"callbacks": [outcome, self._telemetry_for(model_name), *callbacks]}
+
+    @staticmethod
+    def _record_tier(model_name: str, started: float, outcome: ToolOutcomeHandler):
+        telemetry.record_span(
+            "model", model_name, (time.perf_counter() - started) * 1000,
+            failed=outcome.failed or outcome.error is not None,
+        )
+
+    def _run(self, model_name: str, user_input: str, callbacks: List[Any]) -> Tuple[Optional[str], ToolOutcomeHandler]:
+        outcome = ToolOutcomeHandler()
+        started = time.perf_counter()
+        output = None
+        try:
+            output = self._executor_for(model_name).invoke(
+                self._inputs(model_name, user_input), config=self._config(model_name, outcome, callbacks)
+            )["output"]
+        except Exception as e:
+            outcome.error = e
+        finally:
+            self._record_tier(model_name, started, outcome)
+        return output, outcome
+
+    async def _arun(self, model_name: str, user_input: str) -> Tuple[Optional[str], ToolOutcomeHandler]:
+        outcome = ToolOutcomeHandler()
+        started = time.perf_counter()
+        output = None
+        try:
+            output = (await self._executor_for(model_name).ainvoke(
+                await self._ainputs(model_name, user_input), config=self._config(model_name, outcome, [])
+            ))["output"]
+        except Exception as e:
+            outcome.error = e
+        finally:
+            self._record_tier(model_name, started, outcome)
+        return output, outcome
+
+    def _escalates(self, decision: RouteDecision, outcome: ToolOutcomeHandler) -> bool:
+        if not (decision.can_escalate and outcome.should_escalate()):
+            return False
+        logger.info(f"Escalando de {decision.model} a {self.model_name}: {outcome.error or 'validación fallida'}")
+        telemetry.record_model_route(self.model_name, "escalated", escalated=True)
+        return True
+
+    def _finish(self, user_input: str, output: Optional[str], outcome: ToolOutcomeHandler) -> str:
+        if outcome.error is not None:
+            raise outcome.error
+        self.remember_turn(user_input, output)
+        return output
+
+    async def _afinish(self, user_input: str, output: Optional[str], outcome: ToolOutcomeHandler) -> str:
+        if outcome.error is not None:
+            raise outcome.error
+        await self.aremember_turn(user_input, output)
+        return output
+
+    def _respond(
+        self, user_input: str, callbacks: List[Any] = (), on_escalate: Callable[[str], None] = None
+    ) -> str:
+        decision = self._route(user_input)
+        output, outcome = self._run(decision.model, user_input, list(callbacks))
+        if self._escalates(decision, outcome):
+            if on_escalate:
+                on_escalate(self.model_name)
+            output, outcome = self._run(self.model_name, user_input, list(callbacks))
+        return self._finish(user_input, output, outcome)
+
+    # --- Puerto ---
+
     def get_response(self, user_input: str, chat_history: Any = None) -> str:
-        # El historial se maneja dentro de la memoria del executor
-        response_dict = self.executor.invoke({"input": user_input})
-        return response_dict["output"]
+        # El historial se maneja dentro de la memoria del adaptador
+        return self._respond(user_input)
+
+    def remember_turn(self, user_input: str, output: str):
+        self.memory.save_context({"input": user_input}, {"output": output})
+
+    async def aremember_turn(self, user_input: str, output: str):
+        # Si hay que resumir, la llamada al LLM no bloquea el event loop
+        await self.memory.asave_context({"input": user_input}, {"output": output})
+
+    async def aget_response(self, user_input: str, chat_history: Any = None) -> str:
+        decision = self._route(user_input)
+        output, outcome = await self._arun(decision.model, user_input)
+        if self._escalates(decision, outcome):
+            output, outcome = await self._arun(self.model_name, user_input)
+        return await self._afinish(user_input, output, outcome)
+
+    def stream_response(self, user_input: str) -> Iterator[AgentStreamEvent]:
+        # El executor corre en otro hilo y el callback alimenta la cola que consumimos aquí
+        events: "queue.Queue" = queue.Queue()
+        handler = _QueueStreamHandler(events)
+        result: dict = {}
+
+        def run():
+            try:
+                result["output"] = self._respond(
+                    user_input, [handler],
+                    # La UI descarta el texto parcial del modelo rápido al escalar
+                    on_escalate=lambda model: events.put(AgentStreamEvent(kind="escalate", content=model)),
+                )
+            except Exception as e:
+                result["error"] = e
+            finally:
+                events.put(None)
+
+        # Se copia el contexto para que los spans del hilo lleguen al turno actual
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True)
+        worker.start()
+        while (item := events.get()) is not None:
+            yield item
+        worker.join()
+
+        if "error" in result:
+            raise result["error"]
+        yield AgentStreamEvent(kind="final", content=result["output"])
@@ -0,0 +1,219 @@
+import datetime
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from ... import telemetry
+from ...domain.entities import AgentStreamEvent
+from ...domain.ports.agent_port import AIAgentPort
+from ...domain.spanish_dates import references_context
+from ...domain.text import normalize
+from ...config import (
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_SEMANTIC,
+    RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_EMBEDDING_MODEL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Solo se cachean preguntas de consulta: deben tener una señal de lectura y ningún verbo de escritura
+_READ_CUES = re.compile(
+    r"\b(que|cual|cuales|cuando|tengo|hay|muestra\w*|mostrar|lista\w*|ver|consulta\w*|agenda|eventos?|pendientes?)\b"
+)
+_WRITE_VERBS = re.compile(
+    r"\b(agenda(r|me|le|lo)?|agreg\w*|anad\w*|crea(r|me|le|lo)?|programa(r|me|le|lo)?|elimin\w*|borr\w*"
+    r"|cancel\w*|quit\w*|mueve\w*|mover|cambi\w*|reprogram\w*|actualiz\w*|modific\w*"
+    r"|anota(r|me)?|registra(r|me)?|pon(er|me|le|lo)?)\b"
+)
+
+def depends_on_context(normalized: str) -> bool:
+    """Preguntas cuya respuesta depende de la conversación ("¿qué tengo ese día?", "¿y el otro?").
+
+    La caché es compartida por todas las sesiones del inquilino, así que estas
+    preguntas no se pueden servir desde ella.
+    """
+    return normalized.startswith("y ") or references_context(normalized)
+
+def is_read_only_question(normalized: str) -> bool:
+    # "agenda" aparece como sustantivo en consultas; la regex de escritura solo captura el verbo
+    if len(normalized.split()) < 2 or depends_on_context(normalized):
+        return False
+    without_noun = re.sub(r"\b(la|mi|tu) agenda\b", " ", normalized)
+    return bool(_READ_CUES.search(normalized)) and not _WRITE_VERBS.search(without_noun)
+
+class _EmbeddingTier:
+    """Segundo nivel opcional: busca preguntas parecidas con embeddings + HNSW."""
+
+    def __init__(self, capacity: int, threshold: float):
+        from sentence_transformers import SentenceTransformer
+        import hnswlib
+
+        self._hnswlib = hnswlib
+        self.model = SentenceTransformer(RESPONSE_CACHE_EMBEDDING_MODEL)
+        self.capacity = capacity
+        self.threshold = threshold
+        self.clear()
+
+    def clear(self):
+        dim = self.model.get_sentence_embedding_dimension()
+        self.index = self._hnswlib.Index(space="cosine", dim=dim)
+        self.index.init_index(max_elements=self.capacity)
+        self.keys: List[Tuple] = []
+
+    def lookup(self, scope: Tuple, text: str) -> Optional[Tuple]:
+        if not self.keys:
+            return None
+        vector = self.model.encode([text], normalize_embeddings=True)
+        labels, distances = self.index.knn_query(vector, k=min(5, len(self.keys)))
+        for label, distance in zip(labels[0], distances[0]):
+            key = self.keys[label]
+            if key[:-1] == scope and 1.0 - distance >= self.threshold:
+                return key
+        return None
+
+    def add(self, key: Tuple, text: str):
+        if len(self.keys) >= self.capacity:
+            self.clear()
+        vector = self.model.encode([text], normalize_embeddings=True)
+        self.index.add_items(vector, [len(self.keys)])
+        self.keys.append(key)
+
+class ResponseCache:
+    """Caché de respuestas del agente para preguntas de solo lectura.
+
+    La clave es (fecha de hoy, modelo, pregunta normalizada): la fecha hace
+    que "mañana" se resuelva siempre contra el día correcto. Al no incluir la
+    sesión, solo admite preguntas que se entienden sin la conversación previa
+    (ver depends_on_context). Cada entrada
+    guarda la versión de la agenda con la que se generó; si el repositorio
+    cambió desde entonces, la caché entera se descarta.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        semantic: bool = RESPONSE_CACHE_SEMANTIC,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+    ):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._semantic: Optional[_EmbeddingTier] = None
+        if semantic:
+            try:
+                self._semantic = _EmbeddingTier(max_entries, similarity)
+            except Exception as e:
+                logger.warning(f"Caché semántica deshabilitada: {e}")
+
+    def _sync_version(self, version: int):
+        if version != self._version:
+            self._entries.clear()
+            if self._semantic:
+                self._semantic.clear()
+            self._version = version
+
+    @staticmethod
+    def _scope(model_id: str) -> Tuple:
+        return datetime.date.today().isoformat(), model_id
+
+    def get(self, model_id: str, normalized: str, version: int) -> Optional[str]:
+        with self._lock:
+            self._sync_version(version)
+            scope = self._scope(model_id)
+            key = scope + (normalized,)
+            if key not in self._entries and self._semantic:
+                key = self._semantic.lookup(scope, normalized) or key
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, model_id: str, normalized: str, version: int, answer: str):
+        with self._lock:
+            self._sync_version(version)
+            key = self._scope(model_id) + (normalized,)
+            if key not in self._entries and self._semantic:
+                self._semantic.add(key, normalized)
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class CachedAgentAdapter(AIAgentPort):
+    """Decorador de AIAgentPort que responde desde ResponseCache cuando puede.
+
+    Un acierto no llama al modelo; el turno se registra igualmente en la
+    memoria del agente para que la conversación siga coherente.
+    """
+
+    def __init__(
+        self,
+        agent: AIAgentPort,
+        cache: ResponseCache,
+        model_id: str,
+        version_provider: Callable[[], int],
+    ):
+        self.agent = agent
+        self.cache = cache
+        self.model_id = model_id
+        self.version_provider = version_provider
+
+    def _lookup(self, user_input: str, remember: bool = True) -> Tuple[Optional[str], Optional[str], int]:
+        normalized = normalize(user_input)
+        version = self.version_provider()
+        if not is_read_only_question(normalized):
+            return None, None, version
+        answer = self.cache.get(self.model_id, normalized, version)
+        telemetry.record_cache(answer is not None)
+        if answer is not None:
+            logger.info(f"Respuesta servida desde caché: '{normalized}'")
+            if remember:
+                self.agent.remember_turn(user_input, answer)
+        return answer, normalized, version
+
+    def _store(self, normalized: Optional[str], version_before: int, answer: str):
+        # Si la agenda cambió durante el turno, la respuesta no es de solo lectura
+        if normalized and self.version_provider() == version_before:
+            self.cache.put(self.model_id, normalized, version_before, answer)
+
+    def remember_turn(self, user_input: str, output: str):
+        self.agent.remember_turn(user_input, output)
+
+    async def aremember_turn(self, user_input: str, output: str):
+        await self.agent.aremember_turn(user_input, output)
+
+    def get_response(self, user_input: str, chat_history: Any = None) -> str:
+        answer, normalized, version = self._lookup(user_input)
+        if answer is not None:
+            return answer
+        answer = self.agent.get_response(user_input, chat_history)
+        self._store(normalized, version, answer)
+        return answer
+
+    async def aget_response(self, user_input: str, chat_history: Any = None) -> str:
+        answer, normalized, version = self._lookup(user_input, remember=False)
+        if answer is not None:
+            await self.agent.aremember_turn(user_input, answer)
+            return answer
+        answer = await self.agent.aget_response(user_input, chat_history)
+        self._store(normalized, version, answer)
+        return answer
+
+    def stream_response(self, user_input: str) -> Iterator[AgentStreamEvent]:
+        answer, normalized, version = self._lookup(user_input)
+        if answer is not None:
+            yield AgentStreamEvent(kind="final", content=answer)
+            return
+        for item in self.agent.stream_response(user_input):
+            if item.kind == "final":
+                self._store(normalized, version, item.content)
+            yield item
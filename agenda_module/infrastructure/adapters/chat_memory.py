@@ -0,0 +1,208 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+
+from ...config import MEMORY_BUDGETS
+
+logger = logging.getLogger(__name__)
+
+_ENCODING = None
+
+def count_tokens(text: str) -> int:
+    """Cuenta tokens con tiktoken si está disponible; si no, aproxima 4 caracteres por token."""
+    global _ENCODING
+    if _ENCODING is None:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _ENCODING = False
+    if _ENCODING:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+def elide(text: str, max_tokens: int) -> str:
+    """Recorta un mensaje largo (p. ej. un listado completo) conservando el inicio y el final."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    if len(lines) < 3:
+        keep = max_tokens * 4
+        return text[:keep] + " […texto omitido para ahorrar contexto…]"
+    head: List[str] = []
+    tail: List[str] = []
+    budget = max_tokens // 2
+    for line in lines:
+        if count_tokens("\n".join(head + [line])) > budget:
+            break
+        head.append(line)
+    for line in reversed(lines[len(head):]):
+        if count_tokens("\n".join([line] + tail)) > budget:
+            break
+        tail.insert(0, line)
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head + [f"[… {omitted} líneas omitidas para ahorrar contexto …]"] + tail)
+
+def budget_for(model_name: str) -> Dict[str, Any]:
+    return {**MEMORY_BUDGETS["default"], **MEMORY_BUDGETS.get(model_name, {})}
+
+class BudgetedChatMemory(ConversationBufferMemory):
+    """Memoria de chat acotada por tokens con resumen acumulado de lo antiguo.
+
+    Conserva literalmente los turnos recientes mientras quepan en
+    max_history_tokens; los que salen de la ventana se condensan en un
+    resumen (con summary_llm o, si no hay, de forma extractiva). Las
+    respuestas muy largas se recortan antes de guardarse. Tras cada turno,
+    last_report indica cuántos tokens se ahorraron frente al historial completo.
+
+    El presupuesto es el del modelo que atiende el turno (apply_budget se
+    llama antes de cada ejecución) y los tokens de cada mensaje se cuentan
+    una sola vez, al guardarlo. aapply_budget y asave_context resumen con
+    summary_llm.ainvoke para no bloquear el event loop.
+    """
+
+    summary_llm: Optional[Any] = None
+    max_history_tokens: int = 2000
+    max_message_tokens: int = 400
+    summary: str = ""
+    unpruned_tokens: int = 0
+    last_report: Dict[str, int] = {}
+    message_tokens: List[int] = []
+    summary_tokens: int = 0
+
+    def _set_limits(self, model_name: str):
+        budget = budget_for(model_name)
+        self.max_history_tokens = budget["max_history_tokens"]
+        self.max_message_tokens = budget["max_message_tokens"]
+
+    def apply_budget(self, model_name: str):
+        """Ajusta los límites al modelo y recorta el historial si ya no cabe."""
+        self._set_limits(model_name)
+        self._prune()
+
+    async def aapply_budget(self, model_name: str):
+        self._set_limits(model_name)
+        await self._aprune()
+
+    @staticmethod
+    def _tokens_of(message: BaseMessage) -> int:
+        return count_tokens(get_buffer_string([message]))
+
+    def _sync_counts(self):
+        # Si el historial se modificó por fuera (p. ej. chat_memory.clear()), se recuenta
+        if len(self.message_tokens) != len(self.chat_memory.messages):
+            self.message_tokens = [self._tokens_of(m) for m in self.chat_memory.messages]
+
+    def _set_summary(self, summary: str):
+        self.summary = summary
+        self.summary_tokens = self._tokens_of(self._summary_message()) if summary else 0
+
+    def _summary_message(self) -> SystemMessage:
+        return SystemMessage(content=f"Resumen de la conversación anterior: {self.summary}")
+
+    def _history_messages(self) -> List[BaseMessage]:
+        messages = list(self.chat_memory.messages)
+        if self.summary:
+            messages.insert(0, self._summary_message())
+        return messages
+
+    def history_tokens(self) -> int:
+        self._sync_counts()
+        return self.summary_tokens + sum(self.message_tokens)
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages = self._history_messages()
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: get_buffer_string(messages)}
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        self._add_turn(inputs, outputs)
+        self._prune()
+        self._report()
+
+    async def asave_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        self._add_turn(inputs, outputs)
+        await self._aprune()
+        self._report()
+
+    def _add_turn(self, inputs: Dict[str, Any], outputs: Dict[str, str]):
+        input_str, output_str = self._get_input_output(inputs, outputs)
+        self.unpruned_tokens += count_tokens(input_str) + count_tokens(output_str)
+        self._sync_counts()
+        self.chat_memory.add_user_message(input_str)
+        self.chat_memory.add_ai_message(elide(output_str, self.max_message_tokens))
+        self.message_tokens.extend(self._tokens_of(m) for m in self.chat_memory.messages[-2:])
+
+    def _report(self):
+        history = self.history_tokens()
+        self.last_report = {
+            "history_tokens": history,
+            "unpruned_tokens": self.unpruned_tokens,
+            "tokens_saved": max(self.unpruned_tokens - history, 0),
+        }
+        logger.info(
+            f"Memoria: {history} tokens en historial, {self.last_report['tokens_saved']} ahorrados"
+        )
+
+    def _prune(self):
+        pruned = self._take_overflow()
+        if pruned:
+            self._set_summary(self._summarize(pruned))
+
+    async def _aprune(self):
+        pruned = self._take_overflow()
+        if pruned:
+            self._set_summary(await self._asummarize(pruned))
+
+    def _take_overflow(self) -> List[BaseMessage]:
+        """Saca del historial los turnos más antiguos que no caben en el presupuesto."""
+        messages = self.chat_memory.messages
+        total = self.history_tokens()
+        pruned: List[BaseMessage] = []
+        # Se descartan turnos completos (usuario + asistente) y siempre queda el último
+        while total > self.max_history_tokens and len(messages) > 2:
+            total -= sum(self.message_tokens[:2])
+            pruned.extend(messages[:2])
+            del messages[:2]
+            del self.message_tokens[:2]
+        return pruned
+
+    def _summary_prompt(self, pruned: List[BaseMessage]) -> str:
+        return (
+            "Actualiza el resumen de una conversación con un asistente de agenda. "
+            "Conserva fechas, horas, nombres de eventos y decisiones pendientes. "
+            "Máximo 120 palabras, en español.\n\n"
+            f"Resumen actual: {self.summary or '(vacío)'}\n\nNuevos mensajes:\n{get_buffer_string(pruned)}"
+        )
+
+    def _summarize(self, pruned: List[BaseMessage]) -> str:
+        if self.summary_llm is not None:
+            try:
+                return str(self.summary_llm.invoke(self._summary_prompt(pruned)).content).strip()
+            except Exception as e:
+                logger.warning(f"No se pudo resumir el historial con el LLM: {e}")
+        return self._extractive_summary(pruned)
+
+    async def _asummarize(self, pruned: List[BaseMessage]) -> str:
+        if self.summary_llm is not None:
+            try:
+                return str((await self.summary_llm.ainvoke(self._summary_prompt(pruned))).content).strip()
+            except Exception as e:
+                logger.warning(f"No se pudo resumir el historial con el LLM: {e}")
+        return self._extractive_summary(pruned)
+
+    def _extractive_summary(self, pruned: List[BaseMessage]) -> str:
+        # Resumen extractivo: primeras líneas de cada petición del usuario
+        requests = [m.content.splitlines()[0] for m in pruned if m.type == "human" and m.content]
+        summary = "; ".join(filter(None, [self.summary] + requests))
+        return elide(summary, self.max_message_tokens)
+
+    def clear(self) -> None:
+        super().clear()
+        self._set_summary("")
+        self.unpruned_tokens = 0
+        self.last_report = {}
+        self.message_tokens = []
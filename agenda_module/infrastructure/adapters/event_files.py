@@ -0,0 +1,306 @@
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+from datetime import date, datetime, time, timezone
+from typing import Any, Iterable, Iterator, List, Optional
+
+from ...domain.entities import DEFAULT_DURATION_MINUTES, Event
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["Evento", "Fecha", "Hora", "Duración"]
+CHUNK_SIZE = 5000
+
+# --- Normalización de celdas ---
+
+def _as_date(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value or "").strip()
+    # "2026-10-19 00:00:00" tal como lo guarda pandas en texto
+    return text[:10] if re.match(r"^\d{4}-\d{2}-\d{2}", text) else text
+
+def _as_time(value: Any) -> str:
+    if isinstance(value, (datetime, time)):
+        return value.strftime("%H:%M")
+    text = str(value or "").strip()
+    match = re.match(r"^(\d{1,2}):(\d{2})", text)
+    return f"{int(match.group(1)):02d}:{match.group(2)}" if match else text
+
+def _as_duration(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_DURATION_MINUTES
+
+def _row_event(name: Any, day: Any, hour: Any, duration: Any = None) -> Event:
+    return Event(
+        name=str(name or "").strip(), date=_as_date(day), time=_as_time(hour), duration=_as_duration(duration)
+    )
+
+def _chunks(events: Iterable[Event], chunk_size: int) -> Iterator[List[Event]]:
+    chunk: List[Event] = []
+    for event in events:
+        chunk.append(event)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# --- Lectura por lotes ---
+
+def _column_positions(header: Iterable[Any]) -> List[Optional[int]]:
+    names = [str(h or "").strip().lower() for h in header]
+    positions = []
+    for column in COLUMNS:
+        key = column.lower()
+        positions.append(names.index(key) if key in names else None)
+    if positions[0] is None or positions[1] is None or positions[2] is None:
+        raise ValueError(f"El archivo debe tener las columnas {', '.join(COLUMNS[:3])}")
+    return positions
+
+def _rows_to_events(rows: Iterator[tuple]) -> Iterator[Event]:
+    positions = _column_positions(next(rows, ()))
+    for row in rows:
+        values = [row[p] if p is not None and p < len(row) else None for p in positions]
+        if not any(v not in (None, "") for v in values[:3]):
+            continue
+        yield _row_event(*values)
+
+def read_xlsx(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Event]]:
+    """Lee un .xlsx fila a fila (openpyxl en modo solo lectura) y lo entrega en lotes."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        yield from _chunks(_rows_to_events(rows), chunk_size)
+    finally:
+        workbook.close()
+
+def read_csv(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Event]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from _chunks(_rows_to_events(iter(csv.reader(f))), chunk_size)
+
+def _unfolded_lines(f) -> Iterator[str]:
+    # RFC 5545: una línea que empieza por espacio o tabulador continúa la anterior
+    pending = None
+    for raw in f:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+def _ics_datetime(value: str) -> Optional[datetime]:
+    value = value.strip()
+    try:
+        if len(value) == 8:
+            return datetime.strptime(value, "%Y%m%d")
+        if value.endswith("Z"):
+            # UTC → hora local, que es la que usa la agenda
+            utc = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+            return utc.astimezone().replace(tzinfo=None)
+        return datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+
+def _ics_duration(value: str) -> Optional[int]:
+    match = re.fullmatch(r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:\d+S)?)?", value.strip())
+    if not match:
+        return None
+    weeks, days, hours, minutes = (int(g or 0) for g in match.groups())
+    return ((weeks * 7 + days) * 24 + hours) * 60 + minutes
+
+def _ics_text(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+def _ics_events(f) -> Iterator[Event]:
+    current = None
+    for line in _unfolded_lines(f):
+        if line == "BEGIN:VEVENT":
+            current = {}
+            continue
+        if current is None:
+            continue
+        if line == "END:VEVENT":
+            start = current.get("start")
+            if start is not None:
+                duration = current.get("duration")
+                if duration is None and current.get("end") is not None:
+                    duration = int((current["end"] - start).total_seconds() // 60)
+                yield Event(
+                    name=current.get("summary", ""),
+                    date=start.strftime("%Y-%m-%d"),
+                    time=start.strftime("%H:%M"),
+                    duration=duration or DEFAULT_DURATION_MINUTES,
+                )
+            current = None
+            continue
+        key, _, value = line.partition(":")
+        prop = key.split(";")[0].upper()
+        if prop == "SUMMARY":
+            current["summary"] = _ics_text(value)
+        elif prop == "DTSTART":
+            current["start"] = _ics_datetime(value)
+        elif prop == "DTEND":
+            current["end"] = _ics_datetime(value)
+        elif prop == "DURATION":
+            current["duration"] = _ics_duration(value)
+
+def read_ics(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Event]]:
+    """Lee los VEVENT de un iCalendar línea a línea (sin cargar el archivo entero)."""
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _chunks(_ics_events(f), chunk_size)
+
+READERS = {".xlsx": read_xlsx, ".csv": read_csv, ".ics": read_ics}
+
+def read_events(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Event]]:
+    """Lotes de eventos de un .xlsx, .csv o .ics según la extensión."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Formato no soportado: {extension} (usa .xlsx, .csv o .ics)")
+    return READERS[extension](path, chunk_size)
+
+# --- Escritura incremental ---
+
+def csv_lines(events: Iterable[Event]) -> Iterator[str]:
+    """Líneas CSV (con cabecera) generadas una a una."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield _drain(buffer)
+    for event in events:
+        writer.writerow([event.name, event.date, event.time, int(event.duration)])
+        yield _drain(buffer)
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+def _ics_escape(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _ics_fold(line: str) -> str:
+    # Líneas de máximo 75 octetos; las continuaciones empiezan con un espacio
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, current = [], b""
+    for char in line:
+        piece = char.encode("utf-8")
+        if len(current) + len(piece) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += piece
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+def ics_lines(
+    events: Iterable[Event],
+    calendar_name: str = "Agenda Audifarma",
+    skipped: Optional[List[Event]] = None,
+) -> Iterator[str]:
+    """Un VCALENDAR generado evento a evento, importable en Outlook, Google Calendar, etc.
+
+    Las filas con fecha u hora no interpretables (p. ej. de agendas antiguas)
+    se omiten con un aviso en el log y, si se indica, se añaden a skipped.
+    """
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Audifarma//Agenda IA//ES\r\n"
+    yield _ics_fold(f"X-WR-CALNAME:{_ics_escape(calendar_name)}")
+    seen = {}
+    for event in events:
+        try:
+            start = datetime.strptime(f"{event.date} {event.time}", "%Y-%m-%d %H:%M")
+        except ValueError:
+            logger.warning(f"Evento omitido en el .ics (fecha u hora no válidas): {event}")
+            if skipped is not None:
+                skipped.append(event)
+            continue
+        key = f"{event.name}|{event.date}|{event.time}"
+        seen[key] = seen.get(key, 0) + 1
+        uid = hashlib.sha1(f"{key}|{seen[key]}".encode("utf-8")).hexdigest()
+        yield (
+            "BEGIN:VEVENT\r\n"
+            f"UID:{uid}@agenda-audifarma\r\n"
+            f"DTSTAMP:{stamp}\r\n"
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}\r\n"
+            f"DURATION:PT{int(event.duration)}M\r\n"
+            + _ics_fold(f"SUMMARY:{_ics_escape(event.name)}")
+            + "END:VEVENT\r\n"
+        )
+    yield "END:VCALENDAR\r\n"
+
+def write_xlsx(path: str, events: Iterable[Event]) -> int:
+    """Escribe un .xlsx en modo write_only (fila a fila, sin retener la hoja en memoria)."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(COLUMNS)
+    count = 0
+    for event in events:
+        sheet.append([event.name, event.date, event.time, int(event.duration)])
+        count += 1
+    workbook.save(path)
+    return count
+
+def _write_text(path: str, lines: Iterable[str]):
+    # Los generadores ya escriben los finales de línea de cada formato
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for line in lines:
+            f.write(line)
+
+def write_events(path: str, events: Iterable[Event]) -> int:
+    """Exporta a .xlsx, .csv o .ics según la extensión. Devuelve cuántos eventos se escribieron.
+
+    Se escribe en un archivo temporal que reemplaza al destino al terminar:
+    un error a mitad no deja un archivo truncado.
+    """
+    root, extension = os.path.splitext(path)
+    extension = extension.lower()
+    if extension not in (".xlsx", ".csv", ".ics"):
+        raise ValueError(f"Formato no soportado: {extension} (usa .xlsx, .csv o .ics)")
+    tmp_path = f"{root}.tmp{extension}"
+    skipped: List[Event] = []
+    try:
+        if extension == ".xlsx":
+            count = write_xlsx(tmp_path, events)
+        else:
+            counted = _Counter(events)
+            if extension == ".csv":
+                _write_text(tmp_path, csv_lines(counted))
+            else:
+                _write_text(tmp_path, ics_lines(counted, skipped=skipped))
+            count = counted.count - len(skipped)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if skipped:
+        logger.warning(f"Exportación a {path}: {len(skipped)} evento(s) omitidos por fecha u hora")
+    return count
+
+class _Counter:
+    def __init__(self, events: Iterable[Event]):
+        self.events = events
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Event]:
+        for event in self.events:
+            self.count += 1
+            yield event
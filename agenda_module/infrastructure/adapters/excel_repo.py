@@ -1,18 +1,55 @@
 import pandas as pd
 import os
+import shutil
 import logging
-from typing import List, Optional
-from ...domain.entities import Event
+import threading
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Sequence, Tuple
+from ...domain.entities import DEFAULT_DURATION_MINUTES, Event
+from ...domain.event_batch import EventBatch
 from ...domain.ports.repository import AgendaRepository
+from ..indexes.date_index import DateIndex
+from ..file_lock import FileLock, read_version, write_version
 from ...config import AGENDA_FILENAME
+from ...telemetry import REPOSITORY_METHODS, instrumented
 
 logger = logging.getLogger(__name__)
 
+# Una mutación recibe la agenda actual y devuelve (agenda nueva, mensaje, hubo_cambios)
+Mutation = Callable[[pd.DataFrame], Tuple[pd.DataFrame, str, bool]]
+
+class _PendingWrite:
+    __slots__ = ("mutation", "result", "error", "done")
+
+    def __init__(self, mutation: Mutation):
+        self.mutation = mutation
+        self.result: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+
+@instrumented("repository", REPOSITORY_METHODS)
 class ExcelRepositoryAdapter(AgendaRepository):
-    """Adaptador de infraestructura que implementa persistencia en Excel."""
-    
-    COLUMNS = ["Evento", "Fecha", "Hora"]
-    
+    """Adaptador de infraestructura que implementa persistencia en Excel.
+
+    Mantiene en memoria una copia indexada por fecha de la agenda y escribe los cambios
+    directamente en disco (write-through). La copia se invalida cuando cambian
+    el mtime o el tamaño del archivo, de modo que las ediciones hechas fuera
+    de la aplicación se siguen leyendo.
+
+    Para varias sesiones o réplicas sobre el mismo archivo, las escrituras se
+    hacen bajo un bloqueo de archivo ('<archivo>.lock') y aumentan una
+    versión persistida ('<archivo>.version'). Antes de escribir se compara
+    esa versión con la de la copia en memoria (compare-and-swap): si otro
+    proceso escribió, se recarga y las mutaciones pendientes se aplican
+    sobre su versión en lugar de pisarla. Las escrituras concurrentes del
+    mismo proceso se agrupan en una sola adquisición del bloqueo.
+    """
+
+    COLUMNS = ["Evento", "Fecha", "Hora", "Duración"]
+    LOCK_TIMEOUT = 10.0
+    WRITE_RETRIES = 3
+
     def __init__(self, file_path: str = None):
         if file_path is None:
             # Base path relative to the project root
@@ -20,71 +57,279 @@ class ExcelRepositoryAdapter(AgendaRepository):
             self.file_path = os.path.join(base_dir, AGENDA_FILENAME)
         else:
             self.file_path = file_path
+        self._lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[_PendingWrite] = []
+        self._df: Optional[pd.DataFrame] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._disk_version = -1
+        self._events = EventBatch.empty()
+        self._index = DateIndex()
         self._ensure_file_exists()
 
     def _ensure_file_exists(self):
-        if not os.path.exists(self.file_path):
-            df = pd.DataFrame(columns=self.COLUMNS)
-            df.to_excel(self.file_path, index=False)
-            logger.info(f"Creado nuevo archivo de agenda en {self.file_path}")
+        if os.path.exists(self.file_path):
+            return
+        with FileLock(self.file_path, timeout=self.LOCK_TIMEOUT):
+            # Otro proceso pudo crearlo mientras se esperaba el bloqueo
+            if not os.path.exists(self.file_path):
+                df = pd.DataFrame(columns=self.COLUMNS)
+                df.to_excel(self.file_path, index=False)
+                logger.info(f"Creado nuevo archivo de agenda en {self.file_path}")
+
+    # --- Caché en memoria ---
+
+    def _file_signature(self) -> Tuple[int, int]:
+        stat = os.stat(self.file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _normalize_dates(column: pd.Series) -> pd.Series:
+        # Normalizar fechas a YYYY-MM-DD; los valores no interpretables se dejan como texto
+        parsed = pd.to_datetime(column, errors="coerce", format="mixed")
+        return parsed.dt.strftime("%Y-%m-%d").fillna(column.astype(str))
+
+    @staticmethod
+    def _normalize_times(column: pd.Series) -> pd.Series:
+        # Excel puede devolver datetime.time ("16:00:00"); se homogeniza a HH:MM
+        as_text = column.astype(str)
+        parsed = pd.to_datetime(as_text, errors="coerce", format="mixed")
+        return parsed.dt.strftime("%H:%M").fillna(as_text)
+
+    @staticmethod
+    def _normalize_durations(column: pd.Series) -> pd.Series:
+        # Minutos enteros; vacío o no numérico equivale a la duración por defecto
+        return pd.to_numeric(column, errors="coerce").fillna(DEFAULT_DURATION_MINUTES).astype(int)
+
+    def _set_cache(self, df: pd.DataFrame, signature: Tuple[int, int]):
+        self._bump_version()
+        self._df = df
+        self._signature = signature
+        # Conversión columnar: sin iterrows ni un objeto por fila
+        self._events = EventBatch(
+            df["Evento"].to_numpy(dtype=object),
+            df["Fecha"].astype(str).to_numpy(dtype=object),
+            df["Hora"].astype(str).to_numpy(dtype=object),
+            df["Duración"].to_numpy(dtype="int64"),
+        )
+        self._index = DateIndex(self._events)
+
+    def _is_stale(self) -> bool:
+        return (
+            self._df is None
+            or self._file_signature() != self._signature
+            or read_version(self.file_path) != self._disk_version
+        )
+
+    def _read_file(self):
+        df = pd.read_excel(self.file_path)
+        if "Duración" not in df.columns:
+            # Archivos anteriores a la columna de duración
+            df["Duración"] = DEFAULT_DURATION_MINUTES
+        if not df.empty:
+            df["Fecha"] = self._normalize_dates(df["Fecha"])
+            df["Hora"] = self._normalize_times(df["Hora"])
+        df["Duración"] = self._normalize_durations(df["Duración"])
+        self._disk_version = read_version(self.file_path)
+        self._set_cache(df, self._file_signature())
+
+    def _load(self, locked: bool = False) -> pd.DataFrame:
+        """Devuelve la agenda en memoria, recargándola solo si el archivo cambió.
+
+        locked indica que el llamador ya tiene el bloqueo exclusivo del archivo.
+        """
+        with self._lock:
+            if self._is_stale():
+                if locked:
+                    self._read_file()
+                else:
+                    # Bloqueo compartido: no se lee un archivo a medio escribir
+                    with FileLock(self.file_path, timeout=self.LOCK_TIMEOUT, shared=True):
+                        self._read_file()
+            return self._df
+
+    def _write(self, df: pd.DataFrame):
+        """Escribe la agenda en disco y actualiza la copia en memoria (con el bloqueo exclusivo tomado)."""
+        with self._lock:
+            df = df.reset_index(drop=True)
+            root, ext = os.path.splitext(self.file_path)
+            tmp_path = f"{root}.tmp{ext}"
+            df.to_excel(tmp_path, index=False)
+            try:
+                os.replace(tmp_path, self.file_path)
+            except OSError:
+                # p. ej. un volumen de Docker montado como archivo no admite replace
+                shutil.copyfile(tmp_path, self.file_path)
+                os.remove(tmp_path)
+            self._disk_version = max(read_version(self.file_path), self._disk_version) + 1
+            write_version(self.file_path, self._disk_version)
+            self._set_cache(df, self._file_signature())
+
+    # --- Escrituras agrupadas ---
+
+    def _submit(self, mutation: Mutation) -> str:
+        """Encola una mutación y espera a que se confirme.
+
+        El primer hilo que obtiene el lock confirma todas las pendientes con
+        una sola lectura, un solo bloqueo de archivo y una sola escritura.
+        """
+        item = _PendingWrite(mutation)
+        with self._pending_lock:
+            self._pending.append(item)
+        with self._lock:
+            if not item.done:
+                self._flush()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _flush(self):
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        try:
+            for attempt in range(self.WRITE_RETRIES):
+                try:
+                    with FileLock(self.file_path, timeout=self.LOCK_TIMEOUT):
+                        self._apply_batch(batch)
+                    break
+                except OSError as e:
+                    # Archivo abierto en Excel, bloqueo ocupado...: se reintenta sobre datos frescos
+                    if attempt == self.WRITE_RETRIES - 1:
+                        raise
+                    logger.warning(f"Reintentando escritura de la agenda ({attempt + 1}): {e}")
+                    time.sleep(0.1 * (attempt + 1))
+        except Exception as e:
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done = True
+
+    def _apply_batch(self, batch: List[_PendingWrite]):
+        # Compare-and-swap: si la versión en disco no es la de la copia en memoria, se recarga
+        df = self._load(locked=True)
+        changed = False
+        for item in batch:
+            item.error = None
+            try:
+                df, item.result, item_changed = item.mutation(df)
+                changed = changed or item_changed
+            except Exception as e:
+                item.error = e
+        if len(batch) > 1:
+            logger.info(f"Escritura agrupada: {len(batch)} mutaciones en un solo bloqueo")
+        if changed:
+            self._write(df)
+
+    def version(self) -> int:
+        # Revalida contra el archivo para detectar ediciones hechas fuera de la app
+        with self._lock:
+            self._load()
+            return super().version()
+
+    # --- Operaciones del puerto ---
 
     def save(self, event: Event) -> str:
+        def mutation(df: pd.DataFrame):
+            new_row = {"Evento": event.name, "Fecha": event.date, "Hora": event.time, "Duración": event.duration}
+            df = pd.concat([df, pd.DataFrame([new_row], columns=self.COLUMNS)], ignore_index=True)
+            return df, f"¡Listo! He agendado: '{event.name}' para el {event.date} a las {event.time}.", True
+
         try:
-            df = pd.read_excel(self.file_path)
-            new_row = {"Evento": event.name, "Fecha": event.date, "Hora": event.time}
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            df.to_excel(self.file_path, index=False)
-            return f"¡Listo! He agendado: '{event.name}' para el {event.date} a las {event.time}."
+            return self._submit(mutation)
         except Exception as e:
             logger.error(f"Error al guardar evento: {str(e)}")
             return f"Error al guardar en Excel: {str(e)}"
 
-    def find_all(self) -> List[Event]:
+    def save_many(self, events: List[Event]) -> str:
+        def mutation(df: pd.DataFrame):
+            new_rows = [
+                {"Evento": e.name, "Fecha": e.date, "Hora": e.time, "Duración": e.duration} for e in events
+            ]
+            df = pd.concat([df, pd.DataFrame(new_rows, columns=self.COLUMNS)], ignore_index=True)
+            return df, f"¡Listo! He agendado {len(events)} evento(s).", True
+
+        try:
+            return self._submit(mutation)
+        except Exception as e:
+            logger.error(f"Error al guardar eventos: {str(e)}")
+            return f"Error al guardar en Excel: {str(e)}"
+
+    def find_all(self) -> Sequence[Event]:
         try:
-            df = pd.read_excel(self.file_path)
-            events = []
-            for _, row in df.iterrows():
-                events.append(Event(name=row["Evento"], date=str(row["Fecha"]), time=str(row["Hora"])))
-            return events
+            with self._lock:
+                self._load()
+                return self._events
         except Exception as e:
             logger.error(f"Error al leer agenda: {str(e)}")
             return []
 
-    def find_by_date(self, date: str) -> List[Event]:
+    def find_by_date(self, date: str) -> Sequence[Event]:
         try:
-            df = pd.read_excel(self.file_path)
-            if df.empty:
-                return []
-            
-            # Normalizar fechas para comparación
-            df["Fecha"] = pd.to_datetime(df["Fecha"]).dt.strftime("%Y-%m-%d")
-            filtered_df = df[df["Fecha"] == date]
-            
-            events = []
-            for _, row in filtered_df.iterrows():
-                events.append(Event(name=row["Evento"], date=str(row["Fecha"]), time=str(row["Hora"])))
-            return events
+            with self._lock:
+                self._load()
+                return self._index.on_date(date)
         except Exception as e:
             logger.error(f"Error al filtrar por fecha: {str(e)}")
             return []
 
-    def delete(self, event: str, date: Optional[str] = None) -> str:
+    def find_between(self, start: Optional[str] = None, end: Optional[str] = None) -> Sequence[Event]:
+        try:
+            with self._lock:
+                self._load()
+                return self._index.between(start, end)
+        except Exception as e:
+            logger.error(f"Error al filtrar por rango: {str(e)}")
+            return []
+
+    def find_next(self, n: int, from_date: Optional[str] = None) -> Sequence[Event]:
         try:
-            df = pd.read_excel(self.file_path)
+            with self._lock:
+                self._load()
+                return self._index.next(n, from_date)
+        except Exception as e:
+            logger.error(f"Error al buscar próximos eventos: {str(e)}")
+            return []
+
+    def delete(self, event: str, date: Optional[str] = None) -> str:
+        def mutation(df: pd.DataFrame):
             if df.empty:
-                return "La agenda está vacía."
-            
+                return df, "La agenda está vacía.", False
+
             initial_count = len(df)
             if date:
-                df = df[~((df["Evento"] == event) & (df["Fecha"].astype(str) == date))]
+                df = df[~((df["Evento"] == event) & (df["Fecha"] == date))]
             else:
                 df = df[df["Evento"] != event]
-            
+
             if len(df) == initial_count:
-                return f"No se encontró el evento '{event}'"
-            
-            df.to_excel(self.file_path, index=False)
-            return f"Evento(s) '{event}' eliminado(s) con éxito."
+                return df, f"No se encontró el evento '{event}'", False
+            return df, f"Evento(s) '{event}' eliminado(s) con éxito.", True
+
+        try:
+            return self._submit(mutation)
         except Exception as e:
             logger.error(f"Error al eliminar: {str(e)}")
             return f"Error al eliminar en Excel: {str(e)}"
+
+    def delete_events(self, events: List[Event]) -> str:
+        def mutation(df: pd.DataFrame):
+            pending = Counter((e.name, e.date, e.time, e.duration) for e in events)
+            keep = []
+            for row in df[self.COLUMNS].itertuples(index=False):
+                key = (row[0], row[1], row[2], int(row[3]))
+                if pending[key] > 0:
+                    pending[key] -= 1
+                    keep.append(False)
+                else:
+                    keep.append(True)
+            deleted = keep.count(False)
+            if not deleted:
+                return df, "No se encontró ninguno de los eventos indicados.", False
+            return df[keep], f"{deleted} evento(s) eliminado(s) con éxito.", True
+
+        try:
+            return self._submit(mutation)
+        except Exception as e:
+            logger.error(f"Error al eliminar eventos: {str(e)}")
+            return f"Error al eliminar en Excel: {str(e)}"
@@ -0,0 +1,319 @@
+import json
+import os
+import logging
+import threading
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+from ...domain.entities import Event
+from ...domain.ports.repository import AgendaRepository
+from ..indexes.date_index import DateIndex
+from ..file_lock import FileLock
+from ...config import AGENDA_JOURNAL_FILENAME
+from ...telemetry import REPOSITORY_METHODS, instrumented
+
+logger = logging.getLogger(__name__)
+
+def _event_record(event: Event) -> dict:
+    # Equivale a dataclasses.asdict sin su copia recursiva, que domina el coste de compactar
+    return {"name": event.name, "date": event.date, "time": event.time, "duration": event.duration}
+
+def _event_key(record: dict) -> tuple:
+    return record["name"], record["date"], record["time"], record.get("duration")
+
+@instrumented("repository", REPOSITORY_METHODS)
+class JournalRepositoryAdapter(AgendaRepository):
+    """Adaptador de infraestructura que persiste la agenda como un journal append-only.
+
+    Cada alta o baja se agrega como una línea JSON al final del journal, así
+    que escribir cuesta O(1). Las lecturas reproducen el journal en memoria y
+    solo leen la cola nueva en llamadas posteriores. La compactación vuelca el
+    estado a un snapshot y reinicia el journal; un número de generación evita
+    aplicar dos veces registros ya compactados si el proceso cae a mitad, y
+    la siguiente escritura termina esa compactación antes de agregar nada.
+    Las escrituras y la compactación se serializan entre procesos con un
+    bloqueo de archivo ('<journal>.lock').
+    """
+
+    COMPACT_EVERY = 1000
+    LOCK_TIMEOUT = 10.0
+
+    def __init__(self, file_path: str = None, compact_every: int = None):
+        if file_path is None:
+            # Base path relative to the project root
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            self.file_path = os.path.join(base_dir, AGENDA_JOURNAL_FILENAME)
+        else:
+            self.file_path = file_path
+        self.snapshot_path = self.file_path + ".snapshot.json"
+        self.compact_every = compact_every or self.COMPACT_EVERY
+        self._lock = threading.RLock()
+        self._events: List[Event] = []
+        self._index: Optional[DateIndex] = None
+        self._unindexed: List[Event] = []
+        self._generation = 0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self._pending_records = 0
+        self._stale_journal = False
+        self._ensure_file_exists()
+
+    def _ensure_file_exists(self):
+        if not os.path.exists(self.file_path):
+            self._write_atomic(self.file_path, json.dumps({"generation": 0}) + "\n")
+            logger.info(f"Creado nuevo journal de agenda en {self.file_path}")
+
+    # --- Persistencia de bajo nivel ---
+
+    @staticmethod
+    def _write_atomic(path: str, content: str):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _append(self, records: List[dict]):
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with open(self.file_path, "rb") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Cerrar una línea truncada por una caída anterior para no corromper la nueva
+                    payload = "\n" + payload
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _signature_now(self) -> Tuple[int, int]:
+        # Cambia cuando otro proceso compacta (journal reemplazado o snapshot nuevo)
+        snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns if os.path.exists(self.snapshot_path) else 0
+        return os.stat(self.file_path).st_ino, snapshot_mtime
+
+    # --- Reproducción del journal ---
+
+    def _apply(self, record: dict):
+        self._bump_version()
+        op = record.get("op")
+        if op == "add":
+            event = Event(**record["event"])
+            self._events.append(event)
+            # Las altas se acumulan y se intercalan en el índice en la siguiente lectura
+            if self._index is not None:
+                self._unindexed.append(event)
+        elif op == "delete":
+            name, date = record["event"], record.get("date")
+            self._events = [
+                e for e in self._events
+                if not (e.name == name and (not date or e.date == date))
+            ]
+            self._index, self._unindexed = None, []
+        elif op == "remove":
+            # Filas concretas (una por registro), no todas las de ese nombre y fecha
+            pending = Counter(_event_key(e) for e in record["events"])
+            kept = []
+            for e in self._events:
+                key = _event_key(_event_record(e))
+                if pending[key] > 0:
+                    pending[key] -= 1
+                else:
+                    kept.append(e)
+            self._events = kept
+            self._index, self._unindexed = None, []
+
+    def _reload(self):
+        self._bump_version()
+        self._events, self._index, self._unindexed, self._generation = [], None, [], 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._generation = snapshot.get("generation", 0)
+            self._events = [Event(**e) for e in snapshot.get("events", [])]
+        self._signature = self._signature_now()
+        self._offset = 0
+        self._pending_records = 0
+        self._stale_journal = False
+        self._read_tail()
+
+    def _read_tail(self):
+        with open(self.file_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Una línea sin salto final es una escritura en curso (o truncada por una caída)
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Registro corrupto ignorado en {self.file_path}")
+                continue
+            if "generation" in record:
+                # Journal de una generación ya volcada al snapshot (compactación interrumpida):
+                # se ignora y no se escribe en él hasta reiniciarlo (_finish_compaction)
+                if record["generation"] < self._generation:
+                    self._stale_journal = True
+                    self._offset += len(data)
+                    return
+                continue
+            self._apply(record)
+            self._pending_records += 1
+        self._offset += len(complete)
+
+    def _refresh(self):
+        with self._lock:
+            if self._signature != self._signature_now() or os.path.getsize(self.file_path) < self._offset:
+                self._reload()
+            else:
+                self._read_tail()
+
+    def _current_index(self) -> DateIndex:
+        if self._index is None:
+            self._index = DateIndex(self._events)
+        elif self._unindexed:
+            self._index = self._index.with_events(self._unindexed)
+        self._unindexed = []
+        return self._index
+
+    def _finish_compaction(self):
+        """Reinicia el journal que quedó de una compactación cortada tras escribir el snapshot.
+
+        Todo lo que contenía ya está en el snapshot. Debe llamarse con el FileLock tomado.
+        """
+        self._write_atomic(self.file_path, json.dumps({"generation": self._generation}) + "\n")
+        logger.warning(f"Completada una compactación interrumpida (generación {self._generation})")
+        self._reload()
+
+    def _commit(self, records: List[dict]):
+        with self._lock, FileLock(self.file_path, timeout=self.LOCK_TIMEOUT):
+            self._refresh()
+            if self._stale_journal:
+                # Lo que se agregara a ese journal se descartaría en la siguiente recarga
+                self._finish_compaction()
+            self._append(records)
+            self._read_tail()
+            if self._pending_records >= self.compact_every:
+                self._compact_locked()
+
+    def version(self) -> int:
+        with self._lock:
+            self._refresh()
+            return super().version()
+
+    # --- Compactación y exportación ---
+
+    def compact(self, export_path: Optional[str] = None) -> int:
+        """Vuelca el estado a un snapshot y reinicia el journal. Devuelve el total de eventos."""
+        with self._lock:
+            with FileLock(self.file_path, timeout=self.LOCK_TIMEOUT):
+                total = self._compact_locked()
+            if export_path:
+                self.export_excel(export_path)
+            return total
+
+    def _compact_locked(self) -> int:
+        self._refresh()
+        generation = self._generation + 1
+        snapshot = {"generation": generation, "events": [_event_record(e) for e in self._events]}
+        self._write_atomic(self.snapshot_path, json.dumps(snapshot, ensure_ascii=False))
+        self._write_atomic(self.file_path, json.dumps({"generation": generation}) + "\n")
+        self._reload()
+        logger.info(f"Journal compactado: {len(self._events)} eventos (generación {generation})")
+        return len(self._events)
+
+    def export_excel(self, export_path: str):
+        """Exporta la agenda a .xlsx para quienes todavía la abren en Excel."""
+        import pandas as pd
+
+        with self._lock:
+            self._refresh()
+            rows = [
+                {"Evento": e.name, "Fecha": e.date, "Hora": e.time, "Duración": e.duration}
+                for e in self._events
+            ]
+        pd.DataFrame(rows, columns=["Evento", "Fecha", "Hora", "Duración"]).to_excel(export_path, index=False)
+
+    # --- Operaciones del puerto ---
+
+    def save(self, event: Event) -> str:
+        try:
+            self._commit([{"op": "add", "event": _event_record(event)}])
+            return f"¡Listo! He agendado: '{event.name}' para el {event.date} a las {event.time}."
+        except Exception as e:
+            logger.error(f"Error al guardar evento: {str(e)}")
+            return f"Error al guardar en el journal: {str(e)}"
+
+    def save_many(self, events: List[Event]) -> str:
+        try:
+            self._commit([{"op": "add", "event": _event_record(e)} for e in events])
+            return f"¡Listo! He agendado {len(events)} evento(s)."
+        except Exception as e:
+            logger.error(f"Error al guardar eventos: {str(e)}")
+            return f"Error al guardar en el journal: {str(e)}"
+
+    def find_all(self) -> Sequence[Event]:
+        try:
+            with self._lock:
+                self._refresh()
+                return list(self._events)
+        except Exception as e:
+            logger.error(f"Error al leer agenda: {str(e)}")
+            return []
+
+    def find_by_date(self, date: str) -> Sequence[Event]:
+        try:
+            with self._lock:
+                self._refresh()
+                return self._current_index().on_date(date)
+        except Exception as e:
+            logger.error(f"Error al filtrar por fecha: {str(e)}")
+            return []
+
+    def find_between(self, start: Optional[str] = None, end: Optional[str] = None) -> Sequence[Event]:
+        try:
+            with self._lock:
+                self._refresh()
+                return self._current_index().between(start, end)
+        except Exception as e:
+            logger.error(f"Error al filtrar por rango: {str(e)}")
+            return []
+
+    def find_next(self, n: int, from_date: Optional[str] = None) -> Sequence[Event]:
+        try:
+            with self._lock:
+                self._refresh()
+                return self._current_index().next(n, from_date)
+        except Exception as e:
+            logger.error(f"Error al buscar próximos eventos: {str(e)}")
+            return []
+
+    def delete(self, event: str, date: Optional[str] = None) -> str:
+        try:
+            with self._lock:
+                self._refresh()
+                if not self._events:
+                    return "La agenda está vacía."
+                if not any(e.name == event and (not date or e.date == date) for e in self._events):
+                    return f"No se encontró el evento '{event}'"
+                self._commit([{"op": "delete", "event": event, "date": date}])
+            return f"Evento(s) '{event}' eliminado(s) con éxito."
+        except Exception as e:
+            logger.error(f"Error al eliminar: {str(e)}")
+            return f"Error al eliminar en el journal: {str(e)}"
+
+    def delete_events(self, events: List[Event]) -> str:
+        try:
+            records = [_event_record(e) for e in events]
+            with self._lock:
+                self._refresh()
+                present = Counter(_event_key(_event_record(e)) for e in self._events)
+                deleted = sum(min(n, present[key]) for key, n in Counter(map(_event_key, records)).items())
+                if not deleted:
+                    return "No se encontró ninguno de los eventos indicados."
+                self._commit([{"op": "remove", "events": records}])
+            return f"{deleted} evento(s) eliminado(s) con éxito."
+        except Exception as e:
+            logger.error(f"Error al eliminar eventos: {str(e)}")
+            return f"Error al eliminar en el journal: {str(e)}"
@@ -0,0 +1,106 @@
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from ...domain import spanish_dates
+from ...domain.text import fold
+from ...config import MODEL_ROUTING_FAST_MODEL, MODEL_TIERS
+
+_ACTION_VERBS = re.compile(
+    r"\b(?:agrega\w*|anade|agenda(?:r|me)|crea(?:r|me)?|programa(?:r|me)?|elimina\w*|borra\w*"
+    r"|cancela\w*|quita\w*|mueve|mover|cambia\w*|reprograma\w*)\b"
+)
+# Varios pasos encadenados o condiciones sobre el resultado de otro paso
+_MULTI_STEP = re.compile(
+    r"\b(?:y\s+(?:luego|despues|tambien|ademas)|luego|despues\s+de|primero|si\s+no|en\s+caso|excepto|menos"
+    r"|todos|todas|cada|recurrente)\b"
+)
+# Fechas que piden aritmética de calendario más allá de hoy/mañana/día de la semana
+_HARD_DATES = re.compile(
+    r"\b(?:semestre|trimestre|quincena|hace|dentro\s+de|ultim[oa]s?|penultim[oa]|primer[oa]?\s+\w+\s+de"
+    r"|fin\s+de\s+mes|entre)\b"
+)
+MAX_SIMPLE_WORDS = 25
+
+# Mensajes de AgendaService que indican argumentos mal formados por el modelo
+_VALIDATION_FAILURES = ("⚠️ El formato", "⚠️ La duración")
+_WRITE_TOOLS = ("AddAgendaEvent", "AddRecurringEvents", "DeleteAgendaEvent")
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str  # "simple", "multi_step", "context", "date_reasoning", "long" o "selected"
+    can_escalate: bool = False
+
+def classify(user_input: str) -> str:
+    """'simple' para una única consulta o alta directa; si no, el motivo de la complejidad."""
+    folded = fold(user_input)
+    if len(folded.split()) > MAX_SIMPLE_WORDS:
+        return "long"
+    if len(_ACTION_VERBS.findall(folded)) > 1 or _MULTI_STEP.search(folded):
+        return "multi_step"
+    # Referencias a turnos anteriores, que el modelo pequeño resuelve peor
+    if spanish_dates.references_context(folded):
+        return "context"
+    if _HARD_DATES.search(folded):
+        return "date_reasoning"
+    return "simple"
+
+class ModelRouter:
+    """Elige el modelo de cada turno según su complejidad.
+
+    Los turnos simples van al modelo rápido (MODEL_ROUTING_FAST_MODEL) y el
+    resto al modelo elegido por el usuario, que actúa como techo. Solo se
+    enruta si el elegido está por encima del rápido en MODEL_TIERS; con
+    cualquier otro modelo todos los turnos van al elegido.
+    """
+
+    def __init__(self, selected_model: str, fast_model: str = MODEL_ROUTING_FAST_MODEL, tiers: List[str] = None):
+        tiers = MODEL_TIERS if tiers is None else tiers
+        self.selected_model = selected_model
+        self.fast_model = fast_model
+        self.enabled = (
+            selected_model in tiers and fast_model in tiers
+            and tiers.index(fast_model) < tiers.index(selected_model)
+        )
+
+    def route(self, user_input: str) -> RouteDecision:
+        if not self.enabled:
+            return RouteDecision(self.selected_model, "selected")
+        reason = classify(user_input)
+        if reason == "simple":
+            return RouteDecision(self.fast_model, reason, can_escalate=True)
+        return RouteDecision(self.selected_model, reason)
+
+class ToolOutcomeHandler(BaseCallbackHandler):
+    """Observa las herramientas de una ejecución para decidir si hay que escalar.
+
+    failed: alguna herramienta rechazó sus argumentos (error o validación del
+    servicio). wrote: una herramienta de escritura terminó bien; en ese caso
+    no se repite el turno para no duplicar altas o bajas.
+    """
+
+    def __init__(self):
+        self.failed = False
+        self.wrote = False
+        self.error: Optional[BaseException] = None
+        self._tools: dict = {}
+
+    def on_tool_start(self, serialized: dict, input_str: str, *, run_id: Any, **kwargs: Any) -> None:
+        self._tools[run_id] = (serialized or {}).get("name", "")
+
+    def on_tool_end(self, output: Any, *, run_id: Any, **kwargs: Any) -> None:
+        name = self._tools.pop(run_id, "")
+        if str(output).startswith(_VALIDATION_FAILURES):
+            self.failed = True
+        elif name in _WRITE_TOOLS:
+            self.wrote = True
+
+    def on_tool_error(self, error: BaseException, *, run_id: Any, **kwargs: Any) -> None:
+        self._tools.pop(run_id, None)
+        self.failed = True
+
+    def should_escalate(self) -> bool:
+        return (self.failed or self.error is not None) and not self.wrote
@@ -0,0 +1,256 @@
+import os
+import re
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+from ...domain.entities import Event
+from ...domain.event_batch import EventBatch
+from ...domain.ports.repository import AgendaRepository
+from ...domain.text import fold
+from ..indexes.date_index import DateIndex
+from ..indexes.shard_index import ShardDateIndex, Signature
+from ...config import AGENDA_DEFAULT_TENANT
+from ...telemetry import REPOSITORY_METHODS, instrumented
+
+logger = logging.getLogger(__name__)
+
+# Archivos auxiliares que también cambian cuando se escribe un shard (WAL de SQLite, snapshot del journal)
+_SIDE_FILES = ("-wal", ".snapshot.json")
+
+def tenant_key(raw: str) -> str:
+    """Clave de inquilino apta para nombre de archivo: sin tildes, minúsculas y guiones."""
+    return re.sub(r"[^a-z0-9]+", "-", fold((raw or "").strip())).strip("-") or AGENDA_DEFAULT_TENANT
+
+@instrumented("repository", REPOSITORY_METHODS)
+class ShardedRepositoryAdapter(AgendaRepository):
+    """Reparte la agenda en un archivo por inquilino (usuario o área).
+
+    Cada shard es un AgendaRepository independiente creado con
+    backend_factory(ruta), así que sirve con cualquier backend. for_tenant()
+    devuelve el repositorio de un inquilino: leer y escribir ahí solo toca
+    su archivo. Las operaciones del propio adaptador son la vista de toda
+    la empresa; las consultas por fecha usan un ShardDateIndex persistido
+    ('_index.json') para abrir solo los shards con eventos en esas fechas,
+    y las altas sin inquilino van a default_tenant.
+    """
+
+    INDEX_FILENAME = "_index.json"
+
+    def __init__(
+        self,
+        shards_dir: str,
+        backend_factory: Callable[[str], AgendaRepository],
+        extension: str,
+        default_tenant: str = AGENDA_DEFAULT_TENANT,
+    ):
+        self.shards_dir = shards_dir
+        self.file_path = shards_dir
+        self.backend_factory = backend_factory
+        self.extension = extension
+        self.default_tenant = tenant_key(default_tenant)
+        self._lock = threading.RLock()
+        self._shards: Dict[str, AgendaRepository] = {}
+        os.makedirs(shards_dir, exist_ok=True)
+        self._index = ShardDateIndex(os.path.join(shards_dir, self.INDEX_FILENAME))
+
+    # --- Shards ---
+
+    def _shard_path(self, tenant: str) -> str:
+        return os.path.join(self.shards_dir, tenant + self.extension)
+
+    def tenants(self) -> List[str]:
+        """Inquilinos con archivo propio en shards_dir."""
+        return sorted(
+            name[: -len(self.extension)]
+            for name in os.listdir(self.shards_dir)
+            if name.endswith(self.extension) and ".tmp" not in name
+        )
+
+    def for_tenant(self, tenant: str) -> AgendaRepository:
+        """Repositorio del inquilino; el shard se crea la primera vez que se usa."""
+        key = tenant_key(tenant)
+        with self._lock:
+            if key not in self._shards:
+                self._shards[key] = self.backend_factory(self._shard_path(key))
+            return self._shards[key]
+
+    def _signature(self, tenant: str) -> Signature:
+        path = self._shard_path(tenant)
+        parts = []
+        for candidate in (path,) + tuple(path + suffix for suffix in _SIDE_FILES):
+            if os.path.exists(candidate):
+                stat = os.stat(candidate)
+                parts.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(parts)
+
+    def _refresh_index(self):
+        """Reindexa los shards que cambiaron en disco (una llamada a stat por archivo)."""
+        with self._lock:
+            tenants = self.tenants()
+            changed = False
+            for tenant in set(self._index.tenants()) - set(tenants):
+                self._index.remove(tenant)
+                changed = True
+            for tenant in tenants:
+                signature = self._signature(tenant)
+                if self._index.is_current(tenant, signature):
+                    continue
+                dates = EventBatch.from_events(self.for_tenant(tenant).find_all()).dates
+                # La lectura pudo reescribir el archivo (p. ej. al crearlo): firma posterior
+                self._index.update(tenant, self._signature(tenant), set(dates))
+                changed = True
+            if changed:
+                self._bump_version()
+                try:
+                    self._index.save()
+                except OSError as e:
+                    logger.warning(f"No se pudo guardar el índice de shards: {e}")
+
+    def _merge(self, tenants: List[str], read: Callable[[AgendaRepository], Sequence[Event]]) -> DateIndex:
+        batch = EventBatch.empty()
+        for tenant in tenants:
+            batch = batch.concat(EventBatch.from_events(read(self.for_tenant(tenant))))
+        return DateIndex(batch)
+
+    def version(self) -> int:
+        self._refresh_index()
+        return super().version()
+
+    # --- Migración y rebalanceo ---
+
+    def migrate_from(self, source: AgendaRepository, tenant_of: Callable[[Event], str] = None) -> Dict[str, int]:
+        """Copia los eventos de un repositorio único a los shards. Devuelve cuántos recibió cada inquilino."""
+        groups: Dict[str, List[Event]] = defaultdict(list)
+        for event in source.find_all():
+            groups[tenant_key(tenant_of(event)) if tenant_of else self.default_tenant].append(event)
+        for tenant, events in groups.items():
+            self.for_tenant(tenant).save_many(events)
+        logger.info(f"Migrados {sum(map(len, groups.values()))} eventos a {len(groups)} shard(s)")
+        return {tenant: len(events) for tenant, events in groups.items()}
+
+    def rebalance(self, tenant_of: Callable[[Event], str]) -> int:
+        """Mueve cada evento al shard que indica tenant_of. Devuelve cuántos se movieron.
+
+        Los eventos se copian a su destino y solo después se borran del origen
+        con delete_events, que quita exactamente esas filas. Los que se quedan
+        no se tocan en ningún momento: una caída a mitad puede dejar duplicado
+        un evento en movimiento, pero no perder ninguno. Si la copia a un
+        destino falla, sus eventos siguen en el origen.
+        """
+        moved = 0
+        with self._lock:
+            for tenant in self.tenants():
+                shard = self.for_tenant(tenant)
+                targets: Dict[str, List[Event]] = defaultdict(list)
+                for event in shard.find_all():
+                    target = tenant_key(tenant_of(event))
+                    if target != tenant:
+                        targets[target].append(event)
+                copied: List[Event] = []
+                for target, target_events in targets.items():
+                    result = self.for_tenant(target).save_many(target_events)
+                    if result.startswith("Error"):
+                        logger.error(f"Rebalanceo: no se copiaron {len(target_events)} evento(s) a '{target}': {result}")
+                        continue
+                    copied.extend(target_events)
+                if copied:
+                    shard.delete_events(copied)
+                    moved += len(copied)
+        logger.info(f"Rebalanceo de shards: {moved} evento(s) movidos")
+        return moved
+
+    # --- Operaciones del puerto (vista de toda la empresa) ---
+
+    def save(self, event: Event) -> str:
+        return self.for_tenant(self.default_tenant).save(event)
+
+    def save_many(self, events: List[Event]) -> str:
+        return self.for_tenant(self.default_tenant).save_many(events)
+
+    def find_all(self) -> Sequence[Event]:
+        try:
+            batch = EventBatch.empty()
+            for tenant in self.tenants():
+                batch = batch.concat(EventBatch.from_events(self.for_tenant(tenant).find_all()))
+            return batch
+        except Exception as e:
+            logger.error(f"Error al leer agenda: {str(e)}")
+            return []
+
+    def find_by_date(self, date: str) -> Sequence[Event]:
+        try:
+            self._refresh_index()
+            return self._merge(self._index.tenants_on(date), lambda r: r.find_by_date(date)).on_date(date)
+        except Exception as e:
+            logger.error(f"Error al filtrar por fecha: {str(e)}")
+            return []
+
+    def find_between(self, start: Optional[str] = None, end: Optional[str] = None) -> Sequence[Event]:
+        try:
+            self._refresh_index()
+            tenants = self._index.tenants_between(start, end)
+            return self._merge(tenants, lambda r: r.find_between(start, end)).between(start, end)
+        except Exception as e:
+            logger.error(f"Error al filtrar por rango: {str(e)}")
+            return []
+
+    def find_next(self, n: int, from_date: Optional[str] = None) -> Sequence[Event]:
+        try:
+            self._refresh_index()
+            # Cada shard aporta sus n primeros; los n globales están entre ellos
+            tenants = self._index.tenants_between(from_date or datetime.now().strftime("%Y-%m-%d"), None)
+            return self._merge(tenants, lambda r: r.find_next(n, from_date)).next(n, from_date)
+        except Exception as e:
+            logger.error(f"Error al buscar próximos eventos: {str(e)}")
+            return []
+
+    def delete(self, event: str, date: Optional[str] = None) -> str:
+        try:
+            self._refresh_index()
+            tenants = self._index.tenants_on(date) if date else self.tenants()
+            deleted = []
+            message = f"No se encontró el evento '{event}'"
+            for tenant in tenants:
+                shard = self.for_tenant(tenant)
+                before = shard.version()
+                message = shard.delete(event, date)
+                if shard.version() != before:
+                    deleted.append(tenant)
+            if not deleted:
+                return message
+            return f"Evento(s) '{event}' eliminado(s) con éxito en: {', '.join(deleted)}."
+        except Exception as e:
+            logger.error(f"Error al eliminar: {str(e)}")
+            return f"Error al eliminar en los shards: {str(e)}"
+
+    def delete_events(self, events: List[Event]) -> str:
+        """Cada evento se borra del primer shard que lo contiene."""
+        try:
+            pending = Counter((e.name, e.date, e.time, e.duration) for e in events)
+            if not pending:
+                return "No se encontró ninguno de los eventos indicados."
+            deleted = 0
+            start, end = min(k[1] for k in pending), max(k[1] for k in pending)
+            self._refresh_index()
+            for tenant in self._index.tenants_between(start, end):
+                shard = self.for_tenant(tenant)
+                found = []
+                for event in shard.find_between(start, end):
+                    key = (event.name, event.date, event.time, event.duration)
+                    if pending[key] > 0:
+                        pending[key] -= 1
+                        found.append(event)
+                if found:
+                    shard.delete_events(found)
+                    deleted += len(found)
+                pending = +pending
+                if not pending:
+                    break
+            if not deleted:
+                return "No se encontró ninguno de los eventos indicados."
+            return f"{deleted} evento(s) eliminado(s) con éxito."
+        except Exception as e:
+            logger.error(f"Error al eliminar eventos: {str(e)}")
+            return f"Error al eliminar en los shards: {str(e)}"
@@ -0,0 +1,234 @@
+import os
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+from ...domain.entities import DEFAULT_DURATION_MINUTES, Event
+from ...domain.event_batch import EventBatch
+from ...domain.ports.repository import AgendaRepository
+from ...config import AGENDA_DB_FILENAME
+from ...telemetry import REPOSITORY_METHODS, instrumented
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    evento TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    hora TEXT NOT NULL,
+    duracion INTEGER NOT NULL DEFAULT 60  -- minutos (DEFAULT_DURATION_MINUTES)
+);
+CREATE INDEX IF NOT EXISTS idx_eventos_fecha_hora ON eventos (fecha, hora);
+CREATE INDEX IF NOT EXISTS idx_eventos_evento ON eventos (evento);
+
+-- Versión de la agenda: la mantienen triggers, así que también refleja escrituras de otros procesos
+CREATE TABLE IF NOT EXISTS agenda_meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL);
+INSERT OR IGNORE INTO agenda_meta (id, version) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS trg_eventos_insert AFTER INSERT ON eventos
+BEGIN UPDATE agenda_meta SET version = version + 1 WHERE id = 1; END;
+CREATE TRIGGER IF NOT EXISTS trg_eventos_delete AFTER DELETE ON eventos
+BEGIN UPDATE agenda_meta SET version = version + 1 WHERE id = 1; END;
+CREATE TRIGGER IF NOT EXISTS trg_eventos_update AFTER UPDATE ON eventos
+BEGIN UPDATE agenda_meta SET version = version + 1 WHERE id = 1; END;
+"""
+
+class SqliteConnectionPool:
+    """Pool de conexiones SQLite compartido por todas las instancias del proceso.
+
+    Vive a nivel de módulo, así que sobrevive a los reruns de Streamlit y
+    evita abrir (y configurar) una conexión nueva por cada operación.
+    """
+
+    def __init__(self, db_path: str, size: int = 5):
+        self.db_path = db_path
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+        # WAL permite lecturas concurrentes mientras una sesión escribe
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+_POOLS: Dict[str, SqliteConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(db_path: str) -> SqliteConnectionPool:
+    db_path = os.path.abspath(db_path)
+    with _POOLS_LOCK:
+        if db_path not in _POOLS:
+            _POOLS[db_path] = SqliteConnectionPool(db_path)
+        return _POOLS[db_path]
+
+@instrumented("repository", REPOSITORY_METHODS)
+class SqliteRepositoryAdapter(AgendaRepository):
+    """Adaptador de infraestructura que implementa persistencia en SQLite."""
+
+    def __init__(self, file_path: str = None):
+        if file_path is None:
+            # Base path relative to the project root
+            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            self.file_path = os.path.join(base_dir, AGENDA_DB_FILENAME)
+        else:
+            self.file_path = file_path
+        self._pool = get_pool(self.file_path)
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        with self._pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(eventos)")}
+            if "duracion" not in columns:
+                # Bases creadas antes de la duración de eventos
+                conn.execute(
+                    f"ALTER TABLE eventos ADD COLUMN duracion INTEGER NOT NULL DEFAULT {DEFAULT_DURATION_MINUTES}"
+                )
+
+    def _query(self, sql: str, params: tuple = ()) -> EventBatch:
+        with self._pool.connection() as conn:
+            return EventBatch.from_rows(conn.execute(sql, params).fetchall())
+
+    def version(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT version FROM agenda_meta WHERE id = 1").fetchone()[0]
+
+    def import_from_excel(self, xlsx_path: str) -> int:
+        """Importa una sola vez los eventos de un .xlsx existente. Devuelve cuántos se importaron."""
+        from .excel_repo import ExcelRepositoryAdapter
+
+        if not os.path.exists(xlsx_path):
+            return 0
+        with self._pool.connection() as conn:
+            if conn.execute("SELECT COUNT(*) FROM eventos").fetchone()[0]:
+                logger.info("La base SQLite ya tiene eventos; se omite la importación desde Excel")
+                return 0
+            events = ExcelRepositoryAdapter(xlsx_path).find_all()
+            conn.executemany(
+                "INSERT INTO eventos (evento, fecha, hora, duracion) VALUES (?, ?, ?, ?)",
+                [(e.name, e.date, e.time, e.duration) for e in events],
+            )
+        logger.info(f"Importados {len(events)} eventos desde {xlsx_path}")
+        return len(events)
+
+    def save(self, event: Event) -> str:
+        try:
+            with self._pool.connection() as conn:
+                conn.execute(
+                    "INSERT INTO eventos (evento, fecha, hora, duracion) VALUES (?, ?, ?, ?)",
+                    (event.name, event.date, event.time, event.duration),
+                )
+            return f"¡Listo! He agendado: '{event.name}' para el {event.date} a las {event.time}."
+        except Exception as e:
+            logger.error(f"Error al guardar evento: {str(e)}")
+            return f"Error al guardar en SQLite: {str(e)}"
+
+    def save_many(self, events: List[Event]) -> str:
+        try:
+            with self._pool.connection() as conn:
+                conn.executemany(
+                    "INSERT INTO eventos (evento, fecha, hora, duracion) VALUES (?, ?, ?, ?)",
+                    [(e.name, e.date, e.time, e.duration) for e in events],
+                )
+            return f"¡Listo! He agendado {len(events)} evento(s)."
+        except Exception as e:
+            logger.error(f"Error al guardar eventos: {str(e)}")
+            return f"Error al guardar en SQLite: {str(e)}"
+
+    def find_all(self) -> Sequence[Event]:
+        try:
+            return self._query("SELECT evento, fecha, hora, duracion FROM eventos ORDER BY id")
+        except Exception as e:
+            logger.error(f"Error al leer agenda: {str(e)}")
+            return []
+
+    def find_by_date(self, date: str) -> Sequence[Event]:
+        try:
+            return self._query(
+                "SELECT evento, fecha, hora, duracion FROM eventos WHERE fecha = ? ORDER BY hora", (date,)
+            )
+        except Exception as e:
+            logger.error(f"Error al filtrar por fecha: {str(e)}")
+            return []
+
+    def find_between(self, start: Optional[str] = None, end: Optional[str] = None) -> Sequence[Event]:
+        try:
+            return self._query(
+                "SELECT evento, fecha, hora, duracion FROM eventos "
+                "WHERE (? IS NULL OR fecha >= ?) AND (? IS NULL OR fecha <= ?) "
+                "ORDER BY fecha, hora",
+                (start, start, end, end),
+            )
+        except Exception as e:
+            logger.error(f"Error al filtrar por rango: {str(e)}")
+            return []
+
+    def find_next(self, n: int, from_date: Optional[str] = None) -> Sequence[Event]:
+        if from_date:
+            date, time = from_date, ""
+        else:
+            now = datetime.now()
+            date, time = now.strftime("%Y-%m-%d"), now.strftime("%H:%M")
+        try:
+            return self._query(
+                "SELECT evento, fecha, hora, duracion FROM eventos "
+                "WHERE fecha > ? OR (fecha = ? AND hora >= ?) "
+                "ORDER BY fecha, hora LIMIT ?",
+                (date, date, time, max(n, 0)),
+            )
+        except Exception as e:
+            logger.error(f"Error al buscar próximos eventos: {str(e)}")
+            return []
+
+    def delete(self, event: str, date: Optional[str] = None) -> str:
+        try:
+            with self._pool.connection() as conn:
+                if not conn.execute("SELECT 1 FROM eventos LIMIT 1").fetchone():
+                    return "La agenda está vacía."
+                if date:
+                    cursor = conn.execute(
+                        "DELETE FROM eventos WHERE evento = ? AND fecha = ?", (event, date)
+                    )
+                else:
+                    cursor = conn.execute("DELETE FROM eventos WHERE evento = ?", (event,))
+            if cursor.rowcount == 0:
+                return f"No se encontró el evento '{event}'"
+            return f"Evento(s) '{event}' eliminado(s) con éxito."
+        except Exception as e:
+            logger.error(f"Error al eliminar: {str(e)}")
+            return f"Error al eliminar en SQLite: {str(e)}"
+
+    def delete_events(self, events: List[Event]) -> str:
+        try:
+            deleted = 0
+            with self._pool.connection() as conn:
+                for e in events:
+                    deleted += conn.execute(
+                        "DELETE FROM eventos WHERE id = (SELECT id FROM eventos "
+                        "WHERE evento = ? AND fecha = ? AND hora = ? AND duracion = ? LIMIT 1)",
+                        (e.name, e.date, e.time, e.duration),
+                    ).rowcount
+            if not deleted:
+                return "No se encontró ninguno de los eventos indicados."
+            return f"{deleted} evento(s) eliminado(s) con éxito."
+        except Exception as e:
+            logger.error(f"Error al eliminar eventos: {str(e)}")
+            return f"Error al eliminar en SQLite: {str(e)}"
@@ -0,0 +1,95 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, get_buffer_string
+from langchain_core.outputs import LLMResult
+
+from ... import telemetry
+from .chat_memory import count_tokens
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """Registra cada llamada al LLM y cada herramienta como span del turno actual.
+
+    Los tokens se toman del token_usage de OpenAI; en modo streaming la API
+    no lo devuelve y se estiman con tiktoken (el turno queda marcado como
+    estimado).
+    """
+
+    def __init__(self, model_name: str = ""):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._starts: Dict[UUID, tuple] = {}
+
+    def _start(self, run_id: UUID, name: str, prompt_tokens: int = 0):
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), name, prompt_tokens)
+
+    def _finish(self, run_id: UUID) -> Optional[tuple]:
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+        if started is None:
+            return None
+        start, name, prompt_tokens = started
+        return (time.perf_counter() - start) * 1000, name, prompt_tokens
+
+    # --- LLM ---
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        prompt_tokens = sum(count_tokens(get_buffer_string(m)) for m in messages)
+        self._start(run_id, self.model_name or "llm", prompt_tokens)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, self.model_name or "llm", sum(count_tokens(p) for p in prompts))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished is None:
+            return
+        duration_ms, name, estimated_prompt = finished
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+        else:
+            prompt_tokens = estimated_prompt
+            completion_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    tool_calls = (getattr(message, "additional_kwargs", None) or {}).get("tool_calls") or []
+                    completion_tokens += count_tokens(generation.text) if generation.text else 0
+                    completion_tokens += sum(
+                        count_tokens(str(call.get("function", {}).get("arguments", ""))) for call in tool_calls
+                    )
+
+        telemetry.record_tokens(prompt_tokens, completion_tokens, self.model_name, estimated=not usage)
+        telemetry.record_span(
+            "llm", name, duration_ms,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            telemetry.record_span("llm", finished[1], finished[0], error=str(error))
+
+    # --- Herramientas ---
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            telemetry.record_span("tool", finished[1], finished[0])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        finished = self._finish(run_id)
+        if finished:
+            telemetry.record_span("tool", finished[1], finished[0], error=str(error))
@@ -0,0 +1,66 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from ..domain.ports.repository import AgendaRepository
+
+logger = logging.getLogger(__name__)
+
+def digest_targets(repository: AgendaRepository) -> List[AgendaRepository]:
+    """El repositorio y, si está particionado, el de cada inquilino (cada uno tiene su vista)."""
+    if hasattr(repository, "for_tenant"):
+        return [repository] + [repository.for_tenant(t) for t in repository.tenants()]
+    return [repository]
+
+class DigestRefresher:
+    """Hilo de fondo que reconstruye la vista de próximos días al cambiar de día.
+
+    Sin él la vista se reconstruye igualmente en la primera lectura del día;
+    con él esa primera lectura (la bienvenida o un "¿qué tengo hoy?") no
+    paga la consulta. repositories se evalúa en cada pasada para incluir los
+    inquilinos creados después de arrancar.
+    """
+
+    def __init__(
+        self,
+        repositories: Callable[[], List[AgendaRepository]],
+        now: Callable[[], datetime] = datetime.now,
+        delay_after_midnight: float = 5.0,
+    ):
+        self.repositories = repositories
+        self.now = now
+        self.delay_after_midnight = delay_after_midnight
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def seconds_until_next_day(self) -> float:
+        now = self.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds() + self.delay_after_midnight
+
+    def refresh_all(self) -> int:
+        """Reconstruye la vista de cada repositorio para hoy. Devuelve cuántas se refrescaron."""
+        today = self.now().date().isoformat()
+        refreshed = 0
+        for repository in self.repositories():
+            try:
+                repository.digest(today)
+                refreshed += 1
+            except Exception as e:
+                logger.error(f"No se pudo refrescar el resumen de la agenda: {e}")
+        logger.info(f"Resumen de la agenda refrescado para {today} ({refreshed} agenda(s))")
+        return refreshed
+
+    def _run(self):
+        while not self._stop.wait(self.seconds_until_next_day()):
+            self.refresh_all()
+
+    def start(self) -> "DigestRefresher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="agenda-digest", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,85 @@
+import os
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLockTimeout(TimeoutError):
+    pass
+
+class FileLock:
+    """Bloqueo consultivo entre procesos sobre un archivo '<ruta>.lock'.
+
+    Usa flock en POSIX y msvcrt.locking en Windows. shared=True permite
+    varios lectores a la vez (en Windows el bloqueo es siempre exclusivo).
+    La adquisición se reintenta con espera creciente hasta timeout segundos.
+    El bloqueo no es reentrante: cada proceso debe protegerlo además con su
+    propio lock de hilos.
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0, shared: bool = False):
+        self.lock_path = path + ".lock"
+        self.timeout = timeout
+        self.shared = shared
+        self._fd: Optional[int] = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl is not None:
+                mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                fcntl.flock(self._fd, mode | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = time.monotonic() + self.timeout
+        delay = 0.005
+        while not self._try_lock():
+            if time.monotonic() >= deadline:
+                os.close(self._fd)
+                self._fd = None
+                raise FileLockTimeout(f"No se pudo bloquear {self.lock_path} en {self.timeout}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+def read_version(path: str) -> int:
+    """Versión persistida de la agenda ('<ruta>.version'); 0 si aún no existe."""
+    try:
+        with open(path + ".version", "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def write_version(path: str, version: int):
+    """Guarda la versión de forma atómica. Debe llamarse con el FileLock exclusivo tomado."""
+    tmp_path = path + ".version.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(version))
+    os.replace(tmp_path, path + ".version")
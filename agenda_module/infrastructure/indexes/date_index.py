@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+from ...domain.entities import Event
+from ...domain.event_batch import EventBatch
+
+class DateIndex:
+    """Índice ordenado por (fecha, hora) para consultas por día y por rango.
+
+    Las fechas se guardan como texto YYYY-MM-DD, cuyo orden lexicográfico
+    coincide con el cronológico. El orden se calcula una vez con lexsort y
+    las búsquedas usan searchsorted, así que cuestan O(log n + k) y
+    devuelven un EventBatch sin recorrer filas en Python.
+    """
+
+    def __init__(self, events: Iterable[Event] = ()):
+        self._batch = EventBatch.from_events(events)
+        dates = self._batch.dates.astype(str)
+        times = self._batch.times.astype(str)
+        order = np.lexsort((times, dates))
+        self._sorted = self._batch.take(order)
+        self._dates = dates[order]
+        self._keys = np.char.add(np.char.add(self._dates, " "), times[order])
+
+    def with_events(self, events: Iterable[Event]) -> "DateIndex":
+        """Nuevo índice con events añadidos.
+
+        Solo se ordenan los eventos nuevos, que se intercalan con searchsorted:
+        O(n + k log k) en lugar de volver a ordenar todo. Ante la misma fecha y
+        hora quedan detrás de los existentes, igual que al reconstruir.
+        """
+        added = DateIndex(events)
+        if not len(added):
+            return self
+        n, k = len(self), len(added)
+        slots = np.searchsorted(self._keys, added._keys, side="right") + np.arange(k)
+        is_new = np.zeros(n + k, dtype=bool)
+        is_new[slots] = True
+        order = np.empty(n + k, dtype=np.int64)
+        order[~is_new] = np.arange(n)
+        order[is_new] = n + np.arange(k)
+        merged = DateIndex.__new__(DateIndex)
+        merged._sorted = self._sorted.concat(added._sorted).take(order)
+        merged._batch = merged._sorted
+        merged._dates = np.concatenate([self._dates, added._dates])[order]
+        merged._keys = np.concatenate([self._keys, added._keys])[order]
+        return merged
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def on_date(self, date: str) -> EventBatch:
+        return self.between(date, date)
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> EventBatch:
+        """Eventos con fecha en [start, end], ambos extremos opcionales e inclusivos."""
+        lo = int(np.searchsorted(self._dates, start, side="left")) if start else 0
+        hi = int(np.searchsorted(self._dates, end, side="right")) if end else len(self._dates)
+        return self._sorted[lo:hi]
+
+    def next(self, n: int, from_date: Optional[str] = None) -> EventBatch:
+        """Los próximos n eventos desde from_date (o desde este momento si no se indica)."""
+        if from_date:
+            key = f"{from_date} "
+        else:
+            key = datetime.now().strftime("%Y-%m-%d %H:%M")
+        lo = int(np.searchsorted(self._keys, key, side="left"))
+        return self._sorted[lo:lo + max(n, 0)]
@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Firma de un shard en disco: (mtime_ns, tamaño) de cada archivo que lo compone
+Signature = Tuple[Tuple[int, int], ...]
+
+class ShardDateIndex:
+    """Índice ligero fecha → inquilinos con eventos ese día.
+
+    Solo guarda, por shard, el conjunto de fechas con eventos y la firma de
+    sus archivos cuando se indexó; se persiste en JSON para que un proceso
+    nuevo pueda responder "todo lo del día X" abriendo únicamente los shards
+    que tienen algo ese día. Un shard cuya firma cambió se considera obsoleto
+    y el llamador debe volver a indexarlo con update().
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._dates: Dict[str, Set[str]] = {}
+        self._signatures: Dict[str, Signature] = {}
+        self._by_date: Dict[str, Set[str]] = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Índice de shards ilegible, se reconstruirá: {e}")
+            return
+        for tenant, entry in data.get("shards", {}).items():
+            signature = tuple(tuple(part) for part in entry.get("signature", ()))
+            self._set(tenant, signature, entry.get("dates", ()))
+
+    def save(self):
+        """Persiste el índice si cambió desde la última escritura."""
+        if not self.path or not self._dirty:
+            return
+        data = {
+            "shards": {
+                tenant: {"signature": self._signatures[tenant], "dates": sorted(dates)}
+                for tenant, dates in self._dates.items()
+            }
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _set(self, tenant: str, signature: Signature, dates: Iterable[str]):
+        for date in self._dates.get(tenant, ()):
+            self._by_date.get(date, set()).discard(tenant)
+        self._dates[tenant] = set(dates)
+        self._signatures[tenant] = signature
+        for date in self._dates[tenant]:
+            self._by_date.setdefault(date, set()).add(tenant)
+
+    def is_current(self, tenant: str, signature: Signature) -> bool:
+        return self._signatures.get(tenant) == signature
+
+    def update(self, tenant: str, signature: Signature, dates: Iterable[str]):
+        self._set(tenant, signature, dates)
+        self._dirty = True
+
+    def remove(self, tenant: str):
+        self._set(tenant, (), ())
+        del self._dates[tenant], self._signatures[tenant]
+        self._dirty = True
+
+    def tenants(self) -> List[str]:
+        return sorted(self._dates)
+
+    def tenants_on(self, date: str) -> List[str]:
+        return sorted(self._by_date.get(date, ()))
+
+    def tenants_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Inquilinos con al menos un evento en [start, end] (extremos opcionales e inclusivos)."""
+        return sorted(
+            tenant for tenant, dates in self._dates.items()
+            if any((not start or d >= start) and (not end or d <= end) for d in dates)
+        )
@@ -0,0 +1,65 @@
+import importlib
+import os
+from ..domain.ports.repository import AgendaRepository
+from ..config import (
+    AGENDA_BACKEND,
+    AGENDA_DB_FILENAME,
+    AGENDA_FILENAME,
+    AGENDA_SHARDING,
+    AGENDA_SHARDS_DIR,
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Backend -> (módulo del adaptador, clase, extensión de cada shard). Se importa al usarlo
+_BACKENDS = {
+    "excel": (".adapters.excel_repo", "ExcelRepositoryAdapter", ".xlsx"),
+    "journal": (".adapters.journal_repo", "JournalRepositoryAdapter", ".journal"),
+    "sqlite": (".adapters.sqlite_repo", "SqliteRepositoryAdapter", ".db"),
+}
+
+def _backend_spec(backend: str):
+    if backend not in _BACKENDS:
+        raise ValueError(f"Backend de agenda desconocido: {backend}")
+    return _BACKENDS[backend]
+
+def _open_backend(backend: str, file_path: str = None) -> AgendaRepository:
+    """Adaptador del backend sobre file_path (o sobre su archivo por defecto)."""
+    module, class_name, _ = _backend_spec(backend)
+    adapter = getattr(importlib.import_module(module, __package__), class_name)
+    return adapter(file_path)
+
+def _create_single(backend: str) -> AgendaRepository:
+    if backend != "sqlite":
+        return _open_backend(backend)
+    db_path = os.path.join(BASE_DIR, AGENDA_DB_FILENAME)
+    is_new = not os.path.exists(db_path)
+    repository = _open_backend(backend, db_path)
+    if is_new:
+        # Migración única desde el Excel histórico al crear la base
+        repository.import_from_excel(os.path.join(BASE_DIR, AGENDA_FILENAME))
+    return repository
+
+def _create_sharded(backend: str) -> AgendaRepository:
+    from .adapters.sharded_repo import ShardedRepositoryAdapter
+
+    extension = _backend_spec(backend)[2]
+    shards_dir = os.path.join(BASE_DIR, AGENDA_SHARDS_DIR)
+    is_new = not os.path.isdir(shards_dir)
+    repository = ShardedRepositoryAdapter(shards_dir, lambda path: _open_backend(backend, path), extension)
+    if is_new:
+        # Migración única: la agenda compartida pasa entera al inquilino por defecto
+        repository.migrate_from(_create_single(backend))
+    return repository
+
+def create_repository(backend: str = None, sharded: bool = None) -> AgendaRepository:
+    """Construye el adaptador de persistencia configurado en AGENDA_BACKEND.
+
+    Con sharding (AGENDA_SHARDING) devuelve un ShardedRepositoryAdapter con
+    un archivo de ese backend por inquilino; usa for_tenant() para obtener
+    el repositorio de un usuario o área.
+    """
+    backend = (backend or AGENDA_BACKEND).lower()
+    if AGENDA_SHARDING if sharded is None else sharded:
+        return _create_sharded(backend)
+    return _create_single(backend)
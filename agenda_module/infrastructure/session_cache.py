@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    last_used: float
+    day: date
+
+class AgentSessionCache:
+    """Caché de proceso para los agentes de cada sesión de chat.
+
+    Se conserva entre reruns de Streamlit (ver st.cache_resource en la UI).
+    Cada entrada se identifica por (sesión, modelo, hash de la API key) y la
+    memoria de conversación se guarda por sesión, de modo que cambiar de
+    modelo no borra el historial; memory_factory recibe (modelo, api_key).
+    Las sesiones inactivas más de idle_ttl segundos se eliminan.
+
+    Los agentes y memorias se construyen fuera del lock de la caché, con un
+    lock por clave: una construcción lenta solo hace esperar a quien pide
+    esa misma clave, no a las demás sesiones.
+    """
+
+    def __init__(
+        self,
+        memory_factory: Callable[..., Any],
+        idle_ttl: float = 30 * 60,
+        max_sessions: int = 200,
+    ):
+        self.memory_factory = memory_factory
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, str], _CacheEntry] = {}
+        self._memories: Dict[str, Any] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._build_locks: Dict[Tuple, threading.Lock] = {}
+
+    @staticmethod
+    def _key(session_id: str, model_id: str, api_key: str) -> Tuple[str, str, str]:
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return session_id, model_id, key_hash
+
+    def _build_lock(self, key: Tuple) -> threading.Lock:
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def memory_for(self, session_id: str, *factory_args: Any) -> Any:
+        with self._lock:
+            self._last_seen[session_id] = time.monotonic()
+            memory = self._memories.get(session_id)
+        if memory is not None:
+            return memory
+        with self._build_lock(("memory", session_id)):
+            with self._lock:
+                memory = self._memories.get(session_id)
+            if memory is None:
+                memory = self.memory_factory(*factory_args)
+                with self._lock:
+                    memory = self._memories.setdefault(session_id, memory)
+                    self._last_seen[session_id] = time.monotonic()
+            return memory
+
+    def get_or_create(
+        self,
+        session_id: str,
+        model_id: str,
+        api_key: str,
+        factory: Callable[[Any], Any],
+    ) -> Any:
+        """Devuelve el objeto cacheado o lo construye con factory(memoria_de_la_sesión)."""
+        self.evict_idle()
+        key = self._key(session_id, model_id, api_key)
+        memory = self.memory_for(session_id, model_id, api_key)
+        today = date.today()
+        entry = self._current(key, today)
+        if entry is None:
+            with self._build_lock(key):
+                # Otro hilo pudo construirlo mientras se esperaba el lock de la clave
+                entry = self._current(key, today)
+                if entry is None:
+                    entry = _CacheEntry(value=factory(memory), last_used=time.monotonic(), day=today)
+                    with self._lock:
+                        self._entries[key] = entry
+        return entry.value
+
+    def _current(self, key: Tuple[str, str, str], today: date) -> Optional[_CacheEntry]:
+        # El prompt del agente incluye la fecha de hoy: una entrada de otro día no vale
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.day != today:
+                return None
+            entry.last_used = time.monotonic()
+            return entry
+
+    def peek(self, session_id: str, model_id: str, api_key: str) -> Optional[Any]:
+        """Devuelve el objeto cacheado sin construirlo si no existe."""
+        with self._lock:
+            entry = self._entries.get(self._key(session_id, model_id, api_key))
+            return entry.value if entry is not None and entry.day == date.today() else None
+
+    def clear_session(self, session_id: str):
+        """Olvida la memoria y los agentes de una sesión (botón 'Limpiar historial')."""
+        with self._lock:
+            self._drop_session(session_id)
+
+    def _drop_session(self, session_id: str):
+        self._memories.pop(session_id, None)
+        self._last_seen.pop(session_id, None)
+        for key in [k for k in self._entries if k[0] == session_id]:
+            del self._entries[key]
+        for key in [k for k in self._build_locks if k[0] == session_id or k == ("memory", session_id)]:
+            del self._build_locks[key]
+
+    def evict_idle(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for session_id, seen in list(self._last_seen.items()):
+                if now - seen > self.idle_ttl:
+                    self._drop_session(session_id)
+            # Si aún hay demasiadas sesiones, se descartan las menos recientes
+            excess = len(self._last_seen) - self.max_sessions
+            if excess > 0:
+                for session_id, _ in sorted(self._last_seen.items(), key=lambda kv: kv[1])[:excess]:
+                    self._drop_session(session_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
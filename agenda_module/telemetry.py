@@ -0,0 +1,276 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+json_logger = logging.getLogger("agenda.telemetry")
+
+# --- Trazas por turno ---
+
+@dataclass
+class Span:
+    kind: str
+    name: str
+    start_ms: float
+    duration_ms: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class TurnTrace:
+    """Todo lo que ocurrió durante un turno de chat: spans, tokens y caché."""
+
+    turn_id: str
+    operation: str
+    started_at: float
+    duration_ms: float = 0.0
+    path: str = "agent"
+    spans: List[Span] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    cache_hit: Optional[bool] = None
+    model: Optional[str] = None
+    route_reason: Optional[str] = None
+    escalated: bool = False
+    error: Optional[str] = None
+
+    def __post_init__(self):
+        self._perf_start = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._perf_start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+_current_turn: contextvars.ContextVar[Optional[TurnTrace]] = contextvars.ContextVar(
+    "agenda_current_turn", default=None
+)
+
+def current_turn() -> Optional[TurnTrace]:
+    return _current_turn.get()
+
+@contextmanager
+def turn(operation: str) -> Iterator[TurnTrace]:
+    """Abre un turno; los spans registrados dentro (también en otros hilos con
+    el contexto copiado) se acumulan en él. Al cerrar se emite un log JSON."""
+    trace = TurnTrace(turn_id=uuid.uuid4().hex[:12], operation=operation, started_at=time.time())
+    token = _current_turn.set(trace)
+    try:
+        yield trace
+    except Exception as e:
+        trace.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        try:
+            _current_turn.reset(token)
+        except ValueError:
+            # Un generador (stream_ai) cerrado desde otro contexto: no hay nada que restaurar
+            pass
+        trace.duration_ms = round(trace.elapsed_ms(), 3)
+        METRICS.inc("agenda_turns_total", {"path": trace.path, "error": str(trace.error is not None).lower()})
+        METRICS.observe("agenda_turn_duration_seconds", {"path": trace.path}, trace.duration_ms / 1000)
+        json_logger.info(json.dumps({"event": "turn", **trace.to_dict()}, ensure_ascii=False, default=str))
+
+def record_span(kind: str, name: str, duration_ms: float, start_ms: Optional[float] = None, **attributes: Any):
+    METRICS.observe("agenda_span_duration_seconds", {"kind": kind, "name": name}, duration_ms / 1000)
+    trace = _current_turn.get()
+    if trace is not None:
+        if start_ms is None:
+            start_ms = trace.elapsed_ms() - duration_ms
+        trace.spans.append(Span(kind, name, round(start_ms, 3), round(duration_ms, 3), attributes))
+
+def record_tokens(prompt_tokens: int, completion_tokens: int, model: str = "", estimated: bool = False):
+    METRICS.inc("agenda_llm_tokens_total", {"type": "prompt", "model": model}, prompt_tokens)
+    METRICS.inc("agenda_llm_tokens_total", {"type": "completion", "model": model}, completion_tokens)
+    trace = _current_turn.get()
+    if trace is not None:
+        trace.prompt_tokens += prompt_tokens
+        trace.completion_tokens += completion_tokens
+        trace.tokens_estimated = trace.tokens_estimated or estimated
+
+def record_cache(hit: bool):
+    METRICS.inc("agenda_response_cache_requests_total", {"result": "hit" if hit else "miss"})
+    trace = _current_turn.get()
+    if trace is not None:
+        trace.cache_hit = hit
+        if hit:
+            trace.path = "cache"
+
+def record_model_route(model: str, reason: str, escalated: bool = False):
+    """Modelo al que se envió el turno y por qué ('simple', 'multi_step', ... o 'escalated')."""
+    METRICS.inc("agenda_model_routes_total", {"model": model, "reason": reason})
+    trace = _current_turn.get()
+    if trace is not None:
+        trace.model = model
+        trace.escalated = trace.escalated or escalated
+        if not escalated:
+            trace.route_reason = reason
+
+def set_path(path: str):
+    """Cómo se resolvió el turno: 'agent', 'fast_path' o 'cache'."""
+    trace = _current_turn.get()
+    if trace is not None:
+        trace.path = path
+
+# --- Decoradores de tiempo ---
+
+def timed(kind: str, name: Optional[str] = None):
+    """Mide la función (síncrona o async) y la registra como span de tipo kind."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record_span(kind, span_name, (time.perf_counter() - start) * 1000)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_span(kind, span_name, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+    return decorator
+
+REPOSITORY_METHODS = ("save", "save_many", "find_all", "find_by_date", "find_between", "find_next", "delete", "delete_events")
+
+def instrumented(kind: str, methods: Iterable[str]):
+    """Decorador de clase: aplica timed(kind, 'Clase.método') a los métodos indicados que define la clase."""
+
+    def decorator(cls):
+        for method_name in methods:
+            if method_name in cls.__dict__:
+                method = cls.__dict__[method_name]
+                setattr(cls, method_name, timed(kind, f"{cls.__name__}.{method_name}")(method))
+        return cls
+
+    return decorator
+
+# --- Métricas en formato Prometheus ---
+
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_Labels = Tuple[Tuple[str, str], ...]
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class MetricsRegistry:
+    """Contadores e histogramas en memoria del proceso, exportables como texto Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+        self._histograms: Dict[str, Dict[_Labels, List[float]]] = {}
+
+    @staticmethod
+    def _labels(labels: Optional[Dict[str, str]]) -> _Labels:
+        return tuple(sorted((labels or {}).items()))
+
+    def inc(self, metric: str, labels: Optional[Dict[str, str]] = None, value: float = 1):
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(metric, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, metric: str, labels: Optional[Dict[str, str]], value: float):
+        key = self._labels(labels)
+        with self._lock:
+            # Por serie: un contador por bucket, más la suma y el total al final
+            series = self._histograms.setdefault(metric, {})
+            counts = series.setdefault(key, [0.0] * (len(_BUCKETS) + 2))
+            for i, bound in enumerate(_BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    @staticmethod
+    def _format_labels(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for metric, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {metric} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{metric}{self._format_labels(labels)} {value:g}")
+            for metric, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, counts in sorted(series.items()):
+                    for bound, count in zip(_BUCKETS, counts):
+                        lines.append(f"{metric}_bucket{self._format_labels(labels, (('le', f'{bound:g}'),))} {count:g}")
+                    lines.append(f"{metric}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {counts[-1]:g}")
+                    lines.append(f"{metric}_sum{self._format_labels(labels)} {counts[-2]:.6f}")
+                    lines.append(f"{metric}_count{self._format_labels(labels)} {counts[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+METRICS = MetricsRegistry()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+_server: Optional[ThreadingHTTPServer] = None
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Sirve /metrics en un hilo de fondo (una vez por proceso). port=0 lo desactiva."""
+    global _server
+    if not port or _server is not None:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logging.getLogger(__name__).error(f"No se pudo iniciar el endpoint de métricas en el puerto {port}: {e}")
+        return None
+    threading.Thread(target=_server.serve_forever, name="agenda-metrics", daemon=True).start()
+    return _server
+
+def configure_json_log(path: str):
+    """Escribe los registros de agenda.telemetry (una línea JSON por turno) en path."""
+    if any(getattr(h, "baseFilename", None) == path for h in json_logger.handlers):
+        return
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    json_logger.addHandler(handler)
+    json_logger.setLevel(logging.INFO)
+    # El detalle va al JSON; app.log conserva su formato de texto
+    json_logger.propagate = False
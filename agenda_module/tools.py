@@ -1,19 +1,51 @@
 from langchain.tools import StructuredTool
 from .application.service import AgendaService
-from .domain.entities import Event
+from .application.formatting import format_digest, format_events, format_free_slots, format_name_matches
+from .domain.entities import DEFAULT_DURATION_MINUTES, Event
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class AddEventInput(BaseModel):
     event: str = Field(description="Nombre o descripción del evento")
     date: str = Field(description="Fecha en formato YYYY-MM-DD")
     time: str = Field(description="Hora en formato HH:MM")
+    duration: int = Field(DEFAULT_DURATION_MINUTES, description="Duración en minutos")
+    allow_overlap: bool = Field(False, description="True solo si el usuario confirmó que acepta cruzarse con otro evento")
+
+class RecurringEventInput(BaseModel):
+    event: str = Field(description="Nombre o descripción del evento")
+    start_date: str = Field(description="Fecha de la primera ocurrencia en formato YYYY-MM-DD")
+    time: str = Field(description="Hora en formato HH:MM")
+    frequency: str = Field("WEEKLY", description="Frecuencia de la serie: DAILY, WEEKLY o MONTHLY")
+    interval: int = Field(1, ge=1, description="Cada cuántos días/semanas/meses se repite (1 = todos)")
+    weekdays: Optional[List[str]] = Field(None, description="Solo para WEEKLY: días de la semana (LU, MA, MI, JU, VI, SA, DO)")
+    until: Optional[str] = Field(None, description="Última fecha posible de la serie en formato YYYY-MM-DD")
+    count: Optional[int] = Field(None, ge=1, description="Número total de repeticiones (alternativa a until)")
+    duration: int = Field(DEFAULT_DURATION_MINUTES, description="Duración de cada ocurrencia en minutos")
 
 class SearchEventInput(BaseModel):
     date: Optional[str] = Field(None, description="Fecha en formato YYYY-MM-DD para filtrar eventos")
+    start_date: Optional[str] = Field(None, description="Inicio del rango (YYYY-MM-DD, inclusivo) para consultar varios días")
+    end_date: Optional[str] = Field(None, description="Fin del rango (YYYY-MM-DD, inclusivo) para consultar varios días")
+
+class SummaryInput(BaseModel):
+    pass
+
+class NameSearchInput(BaseModel):
+    query: str = Field(description="Nombre o parte del nombre del evento, tal como lo dice el usuario")
+    start_date: Optional[str] = Field(None, description="Inicio del rango (YYYY-MM-DD, inclusivo) para acotar la búsqueda")
+    end_date: Optional[str] = Field(None, description="Fin del rango (YYYY-MM-DD, inclusivo) para acotar la búsqueda")
+    limit: int = Field(10, description="Número máximo de resultados")
+
+class FreeSlotsInput(BaseModel):
+    start_date: str = Field(description="Primer día del rango (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="Último día del rango (YYYY-MM-DD, inclusivo); por defecto solo start_date")
+    duration: int = Field(DEFAULT_DURATION_MINUTES, description="Duración mínima del hueco en minutos")
+    day_start: str = Field("08:00", description="Inicio del horario hábil (HH:MM)")
+    day_end: str = Field("18:00", description="Fin del horario hábil (HH:MM)")
 
 class DeleteEventInput(BaseModel):
-    event: str = Field(description="Nombre del evento a eliminar")
+    event: str = Field(description="Nombre del evento a eliminar (basta con un nombre aproximado)")
     date: Optional[str] = Field(None, description="Fecha en formato YYYY-MM-DD para ser más específico")
 
 def create_agenda_tools(service: AgendaService):
@@ -21,44 +53,171 @@ def create_agenda_tools(service: AgendaService):
     Creates the LangChain tools for the agenda manager using StructuredTool.
     """
     
-    def add_event_wrapper(event: str, date: str, time: str) -> str:
-        return service.add_new_event(event, date, time)
+    def add_event_wrapper(
+        event: str, date: str, time: str, duration: int = DEFAULT_DURATION_MINUTES, allow_overlap: bool = False
+    ) -> str:
+        return service.add_new_event(event, date, time, duration, allow_overlap)
     
-    def list_events_wrapper(date: Optional[str] = None) -> str:
-        # Si no se provee fecha, listamos todo
-        if not date:
-            events = service.list_all_events()
-        else:
+    def add_recurring_wrapper(
+        event: str,
+        start_date: str,
+        time: str,
+        frequency: str = "WEEKLY",
+        interval: int = 1,
+        weekdays: Optional[List[str]] = None,
+        until: Optional[str] = None,
+        count: Optional[int] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+    ) -> str:
+        return service.add_recurring_events(
+            event, start_date, time, frequency, interval, weekdays, until, count, duration
+        )
+
+    def list_events_wrapper(
+        date: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> str:
+        # Prioridad: fecha exacta, luego rango y, si no hay filtros, listamos todo
+        if date:
             events = service.list_events_by_date(date)
-        
-        if not events:
-            return "No hay eventos para mostrar."
-        
-        res = "Eventos encontrados:\n"
-        for e in events:
-            res += f"- {e.name} el {e.date} a las {e.time}\n"
-        return res
+        elif start_date or end_date:
+            events = service.list_events_between(start_date, end_date)
+        else:
+            events = service.list_all_events()
+        return format_events(events)
+
+    def summary_wrapper() -> str:
+        return format_digest(service.agenda_summary())
+
+    def search_events_wrapper(
+        query: str, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 10
+    ) -> str:
+        return format_name_matches(query, service.search_events_by_name(query, start_date, end_date, limit))
+
+    def free_slots_wrapper(
+        start_date: str,
+        end_date: Optional[str] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+        day_start: str = "08:00",
+        day_end: str = "18:00",
+    ) -> str:
+        try:
+            slots = service.find_free_slots(start_date, end_date, duration, day_start, day_end)
+        except ValueError as e:
+            return str(e)
+        return format_free_slots(slots, duration)
 
     def delete_event_wrapper(event: str, date: Optional[str] = None) -> str:
         return service.remove_event(event, date)
+
+    # Variantes asíncronas: las usa el executor cuando se invoca con ainvoke
+    async def aadd_event_wrapper(
+        event: str, date: str, time: str, duration: int = DEFAULT_DURATION_MINUTES, allow_overlap: bool = False
+    ) -> str:
+        return await service.aadd_new_event(event, date, time, duration, allow_overlap)
+
+    async def aadd_recurring_wrapper(
+        event: str,
+        start_date: str,
+        time: str,
+        frequency: str = "WEEKLY",
+        interval: int = 1,
+        weekdays: Optional[List[str]] = None,
+        until: Optional[str] = None,
+        count: Optional[int] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+    ) -> str:
+        return await service.aadd_recurring_events(
+            event, start_date, time, frequency, interval, weekdays, until, count, duration
+        )
+
+    async def alist_events_wrapper(
+        date: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> str:
+        if date:
+            events = await service.alist_events_by_date(date)
+        elif start_date or end_date:
+            events = await service.alist_events_between(start_date, end_date)
+        else:
+            events = await service.alist_all_events()
+        return format_events(events)
+
+    async def asummary_wrapper() -> str:
+        return format_digest(await service.aagenda_summary())
+
+    async def asearch_events_wrapper(
+        query: str, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 10
+    ) -> str:
+        matches = await service.asearch_events_by_name(query, start_date, end_date, limit)
+        return format_name_matches(query, matches)
+
+    async def afree_slots_wrapper(
+        start_date: str,
+        end_date: Optional[str] = None,
+        duration: int = DEFAULT_DURATION_MINUTES,
+        day_start: str = "08:00",
+        day_end: str = "18:00",
+    ) -> str:
+        try:
+            slots = await service.afind_free_slots(start_date, end_date, duration, day_start, day_end)
+        except ValueError as e:
+            return str(e)
+        return format_free_slots(slots, duration)
+
+    async def adelete_event_wrapper(event: str, date: Optional[str] = None) -> str:
+        return await service.aremove_event(event, date)
     
     return [
         StructuredTool.from_function(
             func=add_event_wrapper,
+            coroutine=aadd_event_wrapper,
             name="AddAgendaEvent",
-            description="Agrega un nuevo evento a la agenda con nombre, fecha y hora. Para eventos recurrentes o series, llama a esta herramienta varias veces (una por cada fecha).",
+            description="Agrega un nuevo evento a la agenda con nombre, fecha, hora y duración. Si el horario se cruza con otro evento no se guarda y devuelve los conflictos; repite con allow_overlap=true solo si el usuario lo confirma. Para eventos recurrentes o series usa 'AddRecurringEvents'.",
             args_schema=AddEventInput
         ),
+        StructuredTool.from_function(
+            func=add_recurring_wrapper,
+            coroutine=aadd_recurring_wrapper,
+            name="AddRecurringEvents",
+            description="Agenda una serie recurrente en una sola llamada (ej: 'todos los lunes del mes', 'cada 2 semanas hasta diciembre'). Indica frecuencia, intervalo, días de la semana y 'until' o 'count'; las fechas se calculan localmente.",
+            args_schema=RecurringEventInput
+        ),
         StructuredTool.from_function(
             func=list_events_wrapper,
+            coroutine=alist_events_wrapper,
             name="ListAgendaEvents",
-            description="Consulta los eventos de la agenda. Puede filtrar por fecha.",
+            description="Consulta los eventos de la agenda. Puede filtrar por una fecha exacta o por un rango (start_date/end_date), por ejemplo 'esta semana' o 'este mes'.",
             args_schema=SearchEventInput
         ),
+        StructuredTool.from_function(
+            func=summary_wrapper,
+            coroutine=asummary_wrapper,
+            name="GetAgendaSummary",
+            description="Resumen de hoy y los próximos 7 días: cuántos eventos hay cada día y cuáles son. Úsala para preguntas como '¿qué tengo hoy?' o '¿qué tengo esta semana?' en lugar de ListAgendaEvents.",
+            args_schema=SummaryInput
+        ),
+        StructuredTool.from_function(
+            func=search_events_wrapper,
+            coroutine=asearch_events_wrapper,
+            name="SearchAgendaEvents",
+            description="Busca eventos por nombre aproximado (sin importar tildes, mayúsculas ni pequeñas erratas), opcionalmente entre start_date y end_date. Úsala para encontrar un evento concreto en lugar de listar toda la agenda.",
+            args_schema=NameSearchInput
+        ),
+        StructuredTool.from_function(
+            func=free_slots_wrapper,
+            coroutine=afree_slots_wrapper,
+            name="FindFreeSlots",
+            description="Busca huecos libres de una duración dada entre start_date y end_date dentro del horario hábil. Úsala para proponer horarios o cuando AddAgendaEvent reporte un conflicto, en lugar de listar la agenda.",
+            args_schema=FreeSlotsInput
+        ),
         StructuredTool.from_function(
             func=delete_event_wrapper,
+            coroutine=adelete_event_wrapper,
             name="DeleteAgendaEvent",
-            description="Elimina un evento de la agenda por su nombre y opcionalmente por fecha.",
+            description="Elimina un evento de la agenda por su nombre y opcionalmente por fecha. Acepta el nombre aproximado que diga el usuario: elimina si el nombre coincide salvo tildes y mayúsculas o, con fecha, si todos sus términos encajan con un único evento; si no, no borra nada y devuelve los candidatos.",
             args_schema=DeleteEventInput
         )
     ]
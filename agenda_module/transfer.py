@@ -0,0 +1,66 @@
+"""Importación y exportación masiva de la agenda por línea de comandos.
+
+Los archivos se leen y escriben por lotes, así que la memoria no crece con
+su tamaño. Formatos: .xlsx, .csv (columnas Evento, Fecha, Hora y Duración
+opcional) e iCalendar (.ics).
+
+    python -m agenda_module.transfer import calendario_finanzas.xlsx
+    python -m agenda_module.transfer export agenda.ics --start 2026-01-01
+"""
+import argparse
+import sys
+import time
+
+from agenda_module.application.service import AgendaService
+from agenda_module.infrastructure.adapters.event_files import CHUNK_SIZE, read_events, write_events
+from agenda_module.infrastructure.repository_factory import create_repository
+
+def _repository(args):
+    repository = create_repository(args.backend)
+    if args.tenant:
+        if not hasattr(repository, "for_tenant"):
+            raise SystemExit("--tenant requiere AGENDA_SHARDING=1")
+        repository = repository.for_tenant(args.tenant)
+    return repository
+
+def run_import(args) -> int:
+    service = AgendaService(_repository(args))
+    started = time.perf_counter()
+    report = service.import_events(read_events(args.file, args.chunk_size))
+    print(report.summary())
+    print(f"Tiempo: {time.perf_counter() - started:.1f} s")
+    return 0
+
+def run_export(args) -> int:
+    service = AgendaService(_repository(args))
+    started = time.perf_counter()
+    count = write_events(args.file, service.list_events_between(args.start, args.end))
+    print(f"Exportados: {count} evento(s) a {args.file} en {time.perf_counter() - started:.1f} s")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", help="Backend de la agenda (por defecto, AGENDA_BACKEND)")
+    parser.add_argument("--tenant", help="Área o usuario cuando la agenda está particionada")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Agrega los eventos de un archivo a la agenda")
+    importer.add_argument("file")
+    importer.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    importer.set_defaults(func=run_import)
+
+    exporter = commands.add_parser("export", help="Vuelca la agenda (o un rango de fechas) a un archivo")
+    exporter.add_argument("file")
+    exporter.add_argument("--start", help="Primera fecha (YYYY-MM-DD)")
+    exporter.add_argument("--end", help="Última fecha (YYYY-MM-DD)")
+    exporter.set_defaults(func=run_export)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from agenda_module import telemetry
+
+def render_debug_panel(trace: Optional[telemetry.TurnTrace]):
+    """Panel opcional de la barra lateral con el desglose del último turno."""
+    if not st.toggle("Panel de depuración", key="debug_panel"):
+        return
+    if trace is None:
+        st.caption("Aún no hay turnos medidos en esta sesión.")
+    else:
+        tokens = f"{trace.prompt_tokens} + {trace.completion_tokens}"
+        if trace.tokens_estimated:
+            tokens += " (estimado)"
+        col1, col2 = st.columns(2)
+        col1.metric("Último turno", f"{trace.duration_ms:.0f} ms")
+        col2.metric("Resuelto por", trace.path)
+        st.caption(f"Tokens prompt + respuesta: {tokens} · caché: {trace.cache_hit}")
+        if trace.model:
+            route = f"Modelo: {trace.model} ({trace.route_reason})"
+            if trace.escalated:
+                route += " · escalado desde el modelo rápido"
+            st.caption(route)
+        if trace.spans:
+            spans = pd.DataFrame(
+                [{"Tipo": s.kind, "Nombre": s.name, "Inicio (ms)": s.start_ms, "Duración (ms)": s.duration_ms}
+                 for s in trace.spans]
+            )
+            st.dataframe(spans, use_container_width=True, hide_index=True)
+        if trace.error:
+            st.error(trace.error)
+    with st.expander("Métricas del proceso (Prometheus)"):
+        st.code(telemetry.METRICS.render_prometheus(), language="text")
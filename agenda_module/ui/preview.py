@@ -0,0 +1,58 @@
+import math
+from datetime import date, timedelta
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from agenda_module.domain.event_batch import EventBatch
+from agenda_module.domain.ports.repository import AgendaRepository
+
+PAGE_SIZE = 10
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _query_preview(
+    source: str, version: int, start: Optional[str], end: Optional[str], _repository: AgendaRepository
+) -> pd.DataFrame:
+    # La clave incluye la versión de la agenda: un rerun sin cambios no toca el repositorio
+    events = EventBatch.from_events(_repository.find_between(start, end))
+    return pd.DataFrame(
+        {"Evento": events.names, "Fecha": events.dates, "Hora": events.times, "Duración (min)": events.durations}
+    )
+
+def render_agenda_preview(repository: AgendaRepository):
+    """Vista previa paginada de la agenda (por defecto, los próximos eventos)."""
+    today = date.today()
+    mode = st.radio("Mostrar", ["Próximos", "Rango de fechas", "Todos"], horizontal=True, key="preview_mode")
+
+    start, end = None, None
+    if mode == "Próximos":
+        start = today.isoformat()
+    elif mode == "Rango de fechas":
+        selected = st.date_input(
+            "Fechas", value=(today, today + timedelta(days=30)), key="preview_range"
+        )
+        if isinstance(selected, (tuple, list)):
+            start = selected[0].isoformat() if len(selected) > 0 else None
+            end = selected[1].isoformat() if len(selected) > 1 else start
+        else:
+            start = end = selected.isoformat()
+
+    try:
+        source = getattr(repository, "file_path", type(repository).__name__)
+        df = _query_preview(source, repository.version(), start, end, repository)
+    except Exception as e:
+        st.error(f"Error al leer la agenda: {e}")
+        return
+
+    if df.empty:
+        st.info("No hay eventos en el periodo seleccionado.")
+        return
+
+    pages = max(1, math.ceil(len(df) / PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = int(st.number_input("Página", min_value=1, max_value=pages, value=1, key="preview_page"))
+    offset = (page - 1) * PAGE_SIZE
+    st.dataframe(df.iloc[offset:offset + PAGE_SIZE], use_container_width=True, hide_index=True)
+    st.caption(f"{len(df)} evento(s) · página {page} de {pages}")
@@ -1,118 +1,249 @@
 import streamlit as st
-import pandas as pd
-import os
 import logging
-from datetime import datetime
+import uuid
+from typing import Optional
 
-from agenda_module.infrastructure.adapters.excel_repo import ExcelRepositoryAdapter
-from agenda_module.infrastructure.adapters.ai_agent_adapter import LangChainAgentAdapter
+from agenda_module.infrastructure.repository_factory import create_repository
+from agenda_module.infrastructure.adapters.cached_agent_adapter import CachedAgentAdapter, ResponseCache
+from agenda_module.infrastructure.session_cache import AgentSessionCache
+from agenda_module.infrastructure.digest_refresher import DigestRefresher, digest_targets
 from agenda_module.application.service import AgendaService
-from agenda_module.tools import create_agenda_tools
-from agenda_module.config import AGENDA_FILENAME, LOG_FILENAME, MODEL_OPTIONS
-
-# Configuración de Logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILENAME),
-        logging.StreamHandler()
-    ],
-    force=True
+from agenda_module.application.intent_router import IntentRouter
+from agenda_module.ui.preview import render_agenda_preview
+from agenda_module.ui.debug_panel import render_debug_panel
+from agenda_module.ui.tenant import render_tenant_selector
+from agenda_module import telemetry
+from agenda_module.config import (
+    DIGEST_REFRESH_ENABLED,
+    FAST_PATH_ROUTER_ENABLED,
+    LOG_FILENAME,
+    METRICS_PORT,
+    MODEL_OPTIONS,
+    RESPONSE_CACHE_ENABLED,
+    TELEMETRY_LOG_FILENAME,
 )
+
 logger = logging.getLogger(__name__)
 
-st.set_page_config(page_title="Agenda Audifarma", page_icon="📅")
-
-st.title("📅 Agenda Audifarma")
-st.markdown("""
-Bienvenido al gestor de agenda exclusivo para **Audifarma**.
-Este asistente inteligente te permite gestionar tus eventos mediante lenguaje natural.
-""")
-
-# Sidebar
-with st.sidebar:
-    st.header("Configuración")
-    openai_api_key = st.text_input("OpenAI API Key", type="password")
-    
-    if st.button("Limpiar historial de chat"):
-        st.session_state.agenda_messages = []
-        st.rerun()
-
-    st.divider()
-    st.subheader("Modelo de IA")
-    selected_model_display = st.selectbox(
-        "Elige un modelo:",
-        options=list(MODEL_OPTIONS.keys()),
-        index=len(MODEL_OPTIONS) - 1
+RULES_REMINDER = "\n\n*Recuerda que agendamos con formato **AAAA-MM-DD o lenguaje natural**, soportamos **eventos recurrentes** y máximo **1 año** al futuro.*"
+
+# --- Recursos compartidos entre reruns ---
+@st.cache_resource
+def get_repository():
+    return create_repository()
+
+def create_memory(model_name: str, api_key: str):
+    # El stack de LangChain se importa solo cuando una sesión necesita al agente
+    from agenda_module.infrastructure.adapters.ai_agent_adapter import LangChainAgentAdapter
+    return LangChainAgentAdapter.create_memory(model_name, api_key)
+
+@st.cache_resource
+def get_agent_cache():
+    return AgentSessionCache(memory_factory=create_memory)
+
+@st.cache_resource
+def get_response_cache(tenant: str = None):
+    # Una caché por inquilino: la misma pregunta tiene respuestas distintas en cada agenda
+    return ResponseCache()
+
+@st.cache_resource
+def start_telemetry():
+    # Log JSON por turno y, si AGENDA_METRICS_PORT está definido, endpoint /metrics
+    telemetry.configure_json_log(TELEMETRY_LOG_FILENAME)
+    return telemetry.start_metrics_server(METRICS_PORT)
+
+@st.cache_resource
+def start_digest_refresher():
+    # Reconstruye al empezar el día la vista de hoy y los próximos 7 días de cada agenda
+    repository = get_repository()
+    return DigestRefresher(lambda: digest_targets(repository)).start()
+
+def configure_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(LOG_FILENAME),
+            logging.StreamHandler()
+        ],
+        force=True
     )
-    selected_model_id = MODEL_OPTIONS[selected_model_display]
-
-    st.divider()
-    st.subheader("Vista previa de la Agenda")
-    
-    # Inyección de dependencia manual para la vista previa
-    repo_view = ExcelRepositoryAdapter()
-    if os.path.exists(repo_view.file_path):
-        try:
-            df = pd.read_excel(repo_view.file_path)
-            st.dataframe(df, use_container_width=True)
-        except Exception as e:
-            st.error(f"Error al leer la agenda: {e}")
-    else:
-        st.info("Aún no hay eventos programados.")
-
-# --- Inicialización del Servicio (Core del Sistema) ---
-# Usamos un adaptador para el repositorio
-repository = ExcelRepositoryAdapter()
-agent_adapter = None
-
-if openai_api_key:
-    # Creamos las herramientas pasándole el repo (puerto)
-    tools = create_agenda_tools(repository)
-    # Adaptador para el motor de IA
-    agent_adapter = LangChainAgentAdapter(openai_api_key, tools, model_name=selected_model_id)
-
-# El servicio de aplicación coordina todo
-agenda_service = AgendaService(repository, agent=agent_adapter)
-
-# --- Manejo del Chat ---
-if "agenda_messages" not in st.session_state:
-    st.session_state.agenda_messages = []
-    
-    # Mensaje de bienvenida inteligente
+
+def read_secret_api_key() -> Optional[str]:
+    # Intento obtener la API Key de los secretos locales (secrets.toml)
     try:
-        events = agenda_service.list_all_events()
-        if events:
-            welcome = "¡Hola! Soy tu asistente de **Agenda Audifarma**. He verificado tu agenda y tienes eventos programados. ¿Qué te gustaría consultar?"
-        else:
-            welcome = "¡Hola! Soy tu asistente de **Agenda Audifarma**. Tu agenda está lista pero vacía. ¿Te gustaría programar tu primer evento?"
+        openai_api_key = st.secrets["secrets"]["OPENAI_API_KEY"]
+        if openai_api_key == "TU_API_KEY_AQUI":
+            st.warning("⚠️ Debes configurar tu OpenAI API Key en `.streamlit/secrets.toml`")
+            return None
+        return openai_api_key
     except Exception:
-        welcome = "¡Hola! Soy el asistente de Audifarma. ¿En qué puedo ayudarte hoy?"
-    
-    st.session_state.agenda_messages.append({"role": "assistant", "content": welcome})
+        st.error("⚠️ No se encontró la configuración de secretos en `.streamlit/secrets.toml`")
+        return None
 
-for message in st.session_state.agenda_messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+def welcome_message(agenda_service: AgendaService) -> str:
+    try:
+        # La vista de próximos días ya está calculada: no hace falta leer toda la agenda
+        digest = agenda_service.agenda_summary()
+        if digest.total():
+            return f"¡Hola! Soy tu asistente de **Agenda Audifarma**. Tienes **{len(digest.today())}** evento(s) hoy y **{digest.total()}** en los próximos 7 días. ¿Qué te gustaría consultar?" + RULES_REMINDER
+        return "¡Hola! Soy tu asistente de **Agenda Audifarma**. No tienes eventos en los próximos 7 días. ¿Te gustaría programar uno?" + RULES_REMINDER
+    except Exception:
+        return "¡Hola! Soy el asistente de Audifarma. ¿En qué puedo ayudarte hoy?" + RULES_REMINDER
 
-if prompt := st.chat_input("¿Qué quieres hacer hoy con tu agenda?"):
-    st.session_state.agenda_messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
+def main(api_key_from_secrets: bool = False):
+    """Pinta la app (se ejecuta en cada rerun de Streamlit).
 
-    if not openai_api_key:
-        st.info("Por favor, introduce tu OpenAI API Key en la barra lateral.")
-        st.stop()
+    Con api_key_from_secrets la API key sale de .streamlit/secrets.toml; si no,
+    se pide en la barra lateral.
+    """
+    configure_logging()
+    st.set_page_config(page_title="Agenda Audifarma", page_icon="📅")
+    start_telemetry()
+    if DIGEST_REFRESH_ENABLED:
+        start_digest_refresher()
 
-    try:
-        with st.chat_message("assistant"):
-            # Delegamos la respuesta a la IA a través del servicio de aplicación
-            response = agenda_service.ask_ai(prompt)
-            st.markdown(response)
-            st.session_state.agenda_messages.append({"role": "assistant", "content": response})
-            st.rerun() 
-            
-    except Exception as e:
-        logger.error(f"Error: {str(e)}", exc_info=True)
-        st.error("⚠️ **Lo siento, ha ocurrido un problema técnico.** Revisa los logs para más detalle.")
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    agent_cache = get_agent_cache()
+
+    def reset_chat():
+        # Al cambiar de área la conversación y la bienvenida empiezan de cero
+        st.session_state.pop("agenda_messages", None)
+        agent_cache.clear_session(st.session_state.session_id)
+
+    st.image("agenda_module/assets/logo.svg", width=200)
+    st.title("📅 Agenda Audifarma")
+    st.markdown("""
+    Bienvenido al gestor de agenda exclusivo para **Audifarma**.
+    Este asistente inteligente te permite gestionar tus eventos mediante lenguaje natural.
+    """)
+
+    # Sidebar
+    with st.sidebar:
+        st.header("Configuración")
+        if api_key_from_secrets:
+            openai_api_key = read_secret_api_key()
+        else:
+            openai_api_key = st.text_input("OpenAI API Key", type="password")
+
+        if st.button("Limpiar historial de chat"):
+            st.session_state.agenda_messages = []
+            agent_cache.clear_session(st.session_state.session_id)
+            st.rerun()
+
+        st.divider()
+        st.subheader("Modelo de IA")
+        selected_model_display = st.selectbox(
+            "Elige un modelo:",
+            options=list(MODEL_OPTIONS.keys()),
+            index=len(MODEL_OPTIONS) - 1
+        )
+        selected_model_id = MODEL_OPTIONS[selected_model_display]
+
+        st.divider()
+        st.subheader("Vista previa de la Agenda")
+
+        # Con sharding cada área o usuario lee y escribe solo su propio archivo
+        repository, tenant = render_tenant_selector(get_repository(), on_change=reset_chat)
+        # Consulta paginada y cacheada por versión de la agenda (backend según config.py)
+        render_agenda_preview(repository)
+
+        st.divider()
+        st.subheader("Reglas de Agenda")
+        st.info("""
+        - **Límite**: Máximo 1 año a futuro.
+        - **Formato**: AAAA-MM-DD o lenguaje natural.
+        - **Recurrencia**: El asistente puede agendar series (ej: cada lunes).
+        - **Uso**: El asistente interpreta fechas naturales.
+        """)
+
+    # --- Inicialización del Sistema (Inyección de Dependencias) ---
+    # Repositorio y agentes viven en caché de proceso: un rerun no reconstruye nada
+
+    def build_agenda_service(memory) -> AgendaService:
+        # Importaciones diferidas: LangChain/OpenAI solo se cargan al enviar el primer mensaje
+        from agenda_module.infrastructure.adapters.ai_agent_adapter import LangChainAgentAdapter
+        from agenda_module.tools import create_agenda_tools
+
+        # El servicio de aplicación coordina todo
+        service = AgendaService(repository, agent=None)
+        if FAST_PATH_ROUTER_ENABLED:
+            service.router = IntentRouter(service)
+        # Creamos las herramientas pasándole el servicio (Orquestador con lógica de negocio)
+        tools = create_agenda_tools(service)
+        # Adaptador para el motor de IA, con la memoria de la sesión
+        agent = LangChainAgentAdapter(openai_api_key, tools, model_name=selected_model_id, memory=memory)
+        if RESPONSE_CACHE_ENABLED:
+            # Las preguntas de consulta repetidas se responden sin llamar al modelo
+            agent = CachedAgentAdapter(agent, get_response_cache(tenant), selected_model_id, repository.version)
+        service.agent = agent
+        return service
+
+    # Sin mensaje del usuario basta el servicio sin agente (bienvenida, listados)
+    agenda_service = AgendaService(repository, agent=None)
+    session_service = None
+    if openai_api_key:
+        session_service = agent_cache.peek(st.session_state.session_id, selected_model_id, openai_api_key)
+
+    with st.sidebar:
+        st.divider()
+        render_debug_panel(session_service.last_trace if session_service else None)
+
+    # --- Manejo del Chat ---
+    if "agenda_messages" not in st.session_state:
+        # Mensaje de bienvenida inteligente
+        st.session_state.agenda_messages = [{"role": "assistant", "content": welcome_message(agenda_service)}]
+
+    for message in st.session_state.agenda_messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    if prompt := st.chat_input("¿Qué quieres hacer hoy con tu agenda?"):
+        st.session_state.agenda_messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        if not openai_api_key:
+            if api_key_from_secrets:
+                st.info("Por favor, configura tu OpenAI API Key en el archivo de propiedades `.streamlit/secrets.toml`.")
+            else:
+                st.info("Por favor, introduce tu OpenAI API Key en la barra lateral.")
+            st.stop()
+
+        try:
+            with st.chat_message("assistant"):
+                # Delegamos la respuesta a la IA y la pintamos a medida que llegan los tokens
+                status = st.empty()
+                placeholder = st.empty()
+                partial = ""
+                response = ""
+                agenda_service = agent_cache.get_or_create(
+                    st.session_state.session_id, selected_model_id, openai_api_key, build_agenda_service
+                )
+                for chunk in agenda_service.stream_ai(prompt):
+                    if chunk.kind == "token":
+                        partial += chunk.content
+                        placeholder.markdown(partial + "▌")
+                    elif chunk.kind == "tool_start":
+                        # El texto previo a una herramienta no forma parte de la respuesta final
+                        partial = ""
+                        status.caption(f"🔧 Ejecutando {chunk.content}…")
+                    elif chunk.kind == "escalate":
+                        # El modelo rápido no pudo con el turno: se repite con el modelo elegido
+                        partial = ""
+                        placeholder.empty()
+                        status.caption(f"🔁 Reintentando con {chunk.content}…")
+                    elif chunk.kind == "final":
+                        response = chunk.content
+                status.empty()
+                placeholder.markdown(response)
+                st.session_state.agenda_messages.append({"role": "assistant", "content": response})
+                st.rerun()
+
+        except Exception as e:
+            logger.error(f"Error: {str(e)}", exc_info=True)
+            st.error("⚠️ **Lo siento, ha ocurrido un problema técnico.** Revisa los logs para más detalle.")
+
+if __name__ == "__main__":
+    main()
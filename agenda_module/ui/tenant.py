@@ -0,0 +1,30 @@
+from typing import Callable, Optional, Tuple
+
+import streamlit as st
+
+from agenda_module.config import AGENDA_DEFAULT_TENANT
+from agenda_module.domain.ports.repository import AgendaRepository
+
+def render_tenant_selector(
+    repository: AgendaRepository, on_change: Callable[[], None]
+) -> Tuple[AgendaRepository, Optional[str]]:
+    """Con sharding, pide el área/usuario y devuelve (repositorio del inquilino, clave).
+
+    Sin sharding devuelve el repositorio tal cual. Al cambiar de inquilino se
+    llama a on_change para que el chat no mezcle agendas de áreas distintas.
+    """
+    if not hasattr(repository, "for_tenant"):
+        return repository, None
+
+    from agenda_module.infrastructure.adapters.sharded_repo import tenant_key
+
+    raw = st.text_input("Área o usuario", value=AGENDA_DEFAULT_TENANT, key="tenant_input")
+    known = repository.tenants()
+    if known:
+        st.caption("Agendas existentes: " + ", ".join(known))
+    tenant = tenant_key(raw)
+    previous = st.session_state.get("active_tenant")
+    if previous is not None and previous != tenant:
+        on_change()
+    st.session_state.active_tenant = tenant
+    return repository.for_tenant(tenant), tenant
@@ -0,0 +1,58 @@
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+class ScriptedChatModel(BaseChatModel):
+    """Modelo de chat determinista que sustituye a OpenAI en los benchmarks.
+
+    script asocia cada mensaje del usuario con la herramienta a llamar y sus
+    argumentos. En la primera vuelta del agente se emite esa llamada (con el
+    mismo formato que las tool calls de OpenAI) y, cuando vuelve el resultado
+    de la herramienta, se responde con su primera línea. Los mensajes que no
+    están en el script se contestan directamente sin herramientas.
+    latency simula el tiempo de respuesta del proveedor, en segundos.
+    """
+
+    script: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            first_line = str(last.content).splitlines()[0] if last.content else ""
+            return AIMessage(content=f"Hecho. {first_line}")
+
+        user_input = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), ""
+        )
+        step = self.script.get(user_input)
+        if step is None:
+            return AIMessage(content="Puedo ayudarte a gestionar tu agenda.")
+        tool_name, args = step
+        tool_call = {
+            "id": f"call_{self.calls}",
+            "type": "function",
+            "function": {"name": tool_name, "arguments": json.dumps(args)},
+        }
+        return AIMessage(content="", additional_kwargs={"tool_calls": [tool_call]})
@@ -0,0 +1,83 @@
+"""Comprobación del presupuesto de importación del arranque de la app.
+
+Toma las importaciones de nivel de módulo de agenda_module/app.py, las
+importa en un intérprete limpio (con streamlit ya cargado, que es un coste
+fijo) y falla si tardan más que --budget-ms o si arrastran dependencias
+pesadas que deben cargarse solo bajo demanda (LangChain, OpenAI, openpyxl...).
+
+    python -m benchmarks.import_budget --budget-ms 400
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import List
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agenda_module", "app.py")
+
+# No deben cargarse hasta que haya API key y un mensaje, o un backend .xlsx
+DEFERRED_MODULES = [
+    "langchain", "langchain_core", "langchain_openai", "langchain_community",
+    "openai", "tiktoken", "openpyxl", "torch", "sentence_transformers", "hnswlib",
+]
+
+_PROBE = """
+import json, sys, time
+import streamlit
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = (time.perf_counter() - start) * 1000
+heavy = sorted(m for m in {deferred!r} if m in sys.modules)
+print(json.dumps({{"elapsed_ms": elapsed, "heavy": heavy}}))
+"""
+
+def startup_modules(app_path: str = APP_PATH) -> List[str]:
+    """Módulos de agenda_module importados a nivel de módulo en app.py."""
+    with open(app_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("agenda_module"):
+            modules.append(node.module)
+            modules.extend(f"{node.module}.{a.name}" for a in node.names if node.module == "agenda_module")
+        elif isinstance(node, ast.Import):
+            modules.extend(a.name for a in node.names if a.name.startswith("agenda_module"))
+    return modules
+
+def measure(modules: List[str], runs: int) -> dict:
+    probe = _PROBE.format(modules=modules, deferred=DEFERRED_MODULES)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", probe], cwd=root, text=True)
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "elapsed_ms": min(r["elapsed_ms"] for r in results),
+        "heavy": sorted(set().union(*(r["heavy"] for r in results))),
+    }
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Presupuesto de importación del arranque")
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--runs", type=int, default=3, help="Se toma el mejor de N intérpretes")
+    args = parser.parse_args(argv)
+
+    modules = startup_modules()
+    result = measure(modules, args.runs)
+    print(f"Módulos de arranque: {', '.join(modules)}")
+    print(f"Importación: {result['elapsed_ms']:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+
+    ok = True
+    if result["heavy"]:
+        print(f"ERROR: el arranque importa dependencias diferidas: {', '.join(result['heavy'])}")
+        ok = False
+    if result["elapsed_ms"] > args.budget_ms:
+        print("ERROR: se superó el presupuesto de importación")
+        ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Benchmarks de los adaptadores de repositorio, el servicio y las herramientas.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.run --sizes 100,1000,10000 --backends excel,journal,sqlite
+    python -m benchmarks.run --output nuevo.json --compare benchmarks/results/base.json
+
+Cada operación se mide en una pasada sin trazas (latencia) y en otra con
+tracemalloc (pico de memoria). El resultado se guarda en JSON y, con
+--compare, se marcan las operaciones cuya mediana empeora más que --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from agenda_module.application.service import AgendaService
+from agenda_module.domain.entities import Event
+from agenda_module.domain.ports.repository import AgendaRepository
+from agenda_module.tools import create_agenda_tools
+from .synthetic import generate_events
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_BACKENDS = ["excel", "journal", "sqlite"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def open_repository(backend: str, directory: str) -> AgendaRepository:
+    if backend == "excel":
+        from agenda_module.infrastructure.adapters.excel_repo import ExcelRepositoryAdapter
+        return ExcelRepositoryAdapter(os.path.join(directory, "agenda.xlsx"))
+    if backend == "journal":
+        from agenda_module.infrastructure.adapters.journal_repo import JournalRepositoryAdapter
+        return JournalRepositoryAdapter(os.path.join(directory, "agenda.journal"))
+    if backend == "sqlite":
+        from agenda_module.infrastructure.adapters.sqlite_repo import SqliteRepositoryAdapter
+        return SqliteRepositoryAdapter(os.path.join(directory, "agenda.db"))
+    raise ValueError(f"Backend desconocido: {backend}")
+
+def measure(operation: Callable[[int], Any], repeat: int) -> Dict[str, float]:
+    """Ejecuta operation(i) repeat veces y devuelve latencias (ms) y pico de memoria (KiB)."""
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        operation(i)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    operation(repeat)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "n": repeat,
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def bench_backend(backend: str, size: int, repeat: int, agent_latency: float) -> List[Dict[str, Any]]:
+    directory = tempfile.mkdtemp(prefix=f"bench-{backend}-")
+    try:
+        events = generate_events(size)
+        repository = open_repository(backend, directory)
+        repository.save_many(events)
+        service = AgendaService(repository)
+        tools = {tool.name: tool for tool in create_agenda_tools(service)}
+        rng = random.Random(size)
+        dates = [e.date for e in events]
+        extra = [
+            Event(name=f"Benchmark {i}", date=rng.choice(dates), time="09:00")
+            for i in range(repeat + 1)
+        ]
+
+        operations = {
+            "save": lambda i: repository.save(extra[i]),
+            "find_all": lambda i: repository.find_all(),
+            # Instancia nueva: mide la carga desde disco, sin la caché en memoria
+            "find_all_cold": lambda i: open_repository(backend, directory).find_all(),
+            "find_by_date": lambda i: repository.find_by_date(rng.choice(dates)),
+            "list_events_wrapper": lambda i: tools["ListAgendaEvents"].invoke({"date": rng.choice(dates)}),
+            "list_events_wrapper_all": lambda i: tools["ListAgendaEvents"].invoke({}),
+            "delete": lambda i: repository.delete(extra[i].name, extra[i].date),
+        }
+        results = []
+        for name, operation in operations.items():
+            results.append({"backend": backend, "size": size, "operation": name, **measure(operation, repeat)})
+
+        results.append({
+            "backend": backend, "size": size, "operation": "ask_ai",
+            **bench_ask_ai(repository, dates, repeat, agent_latency),
+        })
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def bench_ask_ai(repository: AgendaRepository, dates: List[str], repeat: int, latency: float) -> Dict[str, Any]:
+    """Recorre el bucle completo agente → herramienta → respuesta con el modelo falso."""
+    from agenda_module.infrastructure.adapters.ai_agent_adapter import LangChainAgentAdapter
+    from agenda_module.infrastructure.adapters.chat_memory import BudgetedChatMemory
+    from .fake_llm import ScriptedChatModel
+
+    service = AgendaService(repository)
+    tools = create_agenda_tools(service)
+    day = dates[0]
+    script = {
+        "¿Qué tengo ese día?": ("ListAgendaEvents", {"date": day}),
+        "Agenda la reunión de benchmark": ("AddAgendaEvent", {"event": "Reunión benchmark", "date": day, "time": "08:00"}),
+        "Borra la reunión de benchmark": ("DeleteAgendaEvent", {"event": "Reunión benchmark", "date": day}),
+        "Hola": None,
+    }
+    llm = ScriptedChatModel(script={k: v for k, v in script.items() if v}, latency=latency)
+    memory = BudgetedChatMemory(memory_key="chat_history", return_messages=True)
+    service.agent = LangChainAgentAdapter(
+        openai_api_key="sk-benchmark", tools=tools, model_name="gpt-5-mini", memory=memory, llm=llm
+    )
+    prompts = list(script)
+
+    def ask(i: int):
+        # El AgentExecutor es verbose: se descarta su salida por consola
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.ask_ai(prompts[i % len(prompts)])
+
+    result = measure(ask, max(repeat, len(prompts)))
+    result["llm_calls"] = llm.calls
+    result["simulated_llm_latency_ms"] = latency * 1000
+    return result
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def compare(current: Dict[str, Any], baseline_path: str, threshold: float) -> List[str]:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    key = lambda r: (r["backend"], r["size"], r["operation"])
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if not old or not old["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        if ratio > threshold:
+            regressions.append(
+                f"{result['backend']}/{result['size']}/{result['operation']}: "
+                f"{old['median_ms']} ms → {result['median_ms']} ms (x{ratio:.2f})"
+            )
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de la agenda")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Tamaños de agenda separados por comas (hasta 100000)")
+    parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por operación")
+    parser.add_argument("--agent-latency", type=float, default=0.0,
+                        help="Latencia simulada del modelo falso, en segundos")
+    parser.add_argument("--output", help="Ruta del JSON de resultados (por defecto benchmarks/results/)")
+    parser.add_argument("--compare", help="JSON previo contra el que buscar regresiones")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Razón de mediana a partir de la cual se reporta una regresión")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    for backend in backends:
+        for size in sizes:
+            print(f"→ {backend} con {size} eventos...", flush=True)
+            for result in bench_backend(backend, size, args.repeat, args.agent_latency):
+                report["results"].append(result)
+                print(f"   {result['operation']:<24} mediana {result['median_ms']:>10.3f} ms"
+                      f"   p95 {result['p95_ms']:>10.3f} ms   pico {result['peak_kib']:>9.1f} KiB")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESIÓN {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
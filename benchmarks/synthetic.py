@@ -0,0 +1,24 @@
+import random
+from datetime import date, timedelta
+from typing import List
+
+from agenda_module.domain.entities import Event
+
+_NAMES = [
+    "Reunión de equipo", "Comité de calidad", "Auditoría interna", "Capacitación",
+    "Revisión de inventario", "Llamada con proveedor", "Visita a farmacia", "Entrega de informe",
+]
+
+def generate_events(n: int, seed: int = 42, start: date = None, days: int = 365) -> List[Event]:
+    """Agenda sintética reproducible: n eventos repartidos en los próximos `days` días."""
+    rng = random.Random(seed)
+    start = start or date.today()
+    events = []
+    for i in range(n):
+        day = start + timedelta(days=rng.randrange(days))
+        events.append(Event(
+            name=f"{rng.choice(_NAMES)} #{i}",
+            date=day.isoformat(),
+            time=f"{rng.randrange(7, 19):02d}:{rng.choice((0, 15, 30, 45)):02d}",
+        ))
+    return events
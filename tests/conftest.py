@@ -0,0 +1,21 @@
+from datetime import date, timedelta
+
+import pytest
+
+from agenda_module.application.service import AgendaService
+from agenda_module.infrastructure.adapters.sqlite_repo import SqliteRepositoryAdapter
+
+
+def in_days(days: int) -> str:
+    """Fecha ISO a days días de hoy (el servicio rechaza fechas a más de un año)."""
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return SqliteRepositoryAdapter(str(tmp_path / "agenda.db"))
+
+
+@pytest.fixture
+def service(repository):
+    return AgendaService(repository, agent=None)
@@ -0,0 +1,64 @@
+import pytest
+
+from agenda_module.application.intent_router import IntentRouter
+from agenda_module.domain.entities import Event
+
+from conftest import in_days
+
+
+@pytest.fixture
+def router(service):
+    return IntentRouter(service)
+
+
+def test_add_with_explicit_date_and_time(router, service):
+    answer = router.route("Agrega reunión con Ana mañana a las 10:00")
+    assert answer.startswith("¡Listo!")
+    assert [(e.name, e.date, e.time) for e in service.list_all_events()] == [
+        ("reunión con Ana", in_days(1), "10:00")
+    ]
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "agrega dentista mañana a las 3",  # hora sin am/pm ni franja
+        "agrega dentista el martes 10 a las 15:00",  # día de la semana con número de día
+        "agrega dentista mañana y pasado mañana a las 10:00",  # varias fechas
+        "agrega dentista mañana a las 10:00 y borra la reunión",  # varios verbos
+        "agrega dentista cada lunes a las 09:00",  # serie
+        "agrega dentista a las 10:00",  # sin fecha
+        "¿cuánto dura la reunión?",  # no es un comando
+    ],
+)
+def test_ambiguous_messages_fall_back_to_the_agent(router, service, message):
+    assert router.route(message) is None
+    assert len(service.list_all_events()) == 0
+
+
+def test_list_date_reads_that_day(router, repository):
+    repository.save(Event("Demo", in_days(1), "09:00"))
+    repository.save(Event("Cierre", in_days(2), "09:00"))
+    answer = router.route("¿Qué tengo mañana?")
+    assert "Demo" in answer and "Cierre" not in answer
+
+
+def test_list_with_extra_text_falls_back(router):
+    assert router.route("muestra los eventos importantes del cliente") is None
+
+
+def test_delete_requires_exact_name(router, repository, service):
+    repository.save(Event("Reunión con Ana", in_days(1), "10:00"))
+    # "reunión" solo coincide en parte: lo confirma el agente
+    assert router.route("elimina reunión mañana") is None
+    assert len(service.list_all_events()) == 1
+    assert "eliminado" in router.route("elimina reunion con ana mañana")
+    assert len(service.list_all_events()) == 0
+
+
+def test_router_errors_fall_back_to_the_agent():
+    class Failing:
+        def add_new_event(self, *args):
+            raise RuntimeError("sin conexión")
+
+    assert IntentRouter(Failing()).route("Agrega demo mañana a las 10:00") is None
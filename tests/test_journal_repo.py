@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from agenda_module.domain.entities import Event
+from agenda_module.infrastructure.adapters.journal_repo import JournalRepositoryAdapter
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "agenda.journal")
+
+
+def rows(repository):
+    return sorted((e.name, e.date, e.time) for e in repository.find_all())
+
+
+def journal_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_compaction_keeps_state_and_resets_journal(path):
+    repository = JournalRepositoryAdapter(path)
+    repository.save(Event("A", "2025-01-06", "09:00"))
+    repository.save_many([Event("B", "2025-01-07", "09:00"), Event("C", "2025-01-08", "09:00")])
+    repository.delete("B")
+    assert repository.compact() == 2
+    assert journal_lines(path) == [{"generation": 1}]
+    assert rows(JournalRepositoryAdapter(path)) == [
+        ("A", "2025-01-06", "09:00"),
+        ("C", "2025-01-08", "09:00"),
+    ]
+
+
+def test_compacts_automatically_every_n_records(path):
+    repository = JournalRepositoryAdapter(path, compact_every=3)
+    for day in range(1, 5):
+        repository.save(Event(f"E{day}", f"2025-01-0{day}", "09:00"))
+    assert journal_lines(path)[0] == {"generation": 1}
+    assert len(journal_lines(path)) == 2
+    assert len(JournalRepositoryAdapter(path).find_all()) == 4
+
+
+def test_other_instance_reads_new_tail_and_compaction(path):
+    writer, reader = JournalRepositoryAdapter(path), JournalRepositoryAdapter(path)
+    writer.save(Event("A", "2025-01-06", "09:00"))
+    assert rows(reader) == [("A", "2025-01-06", "09:00")]
+    writer.compact()
+    writer.save(Event("B", "2025-01-07", "09:00"))
+    assert rows(reader) == [("A", "2025-01-06", "09:00"), ("B", "2025-01-07", "09:00")]
+
+
+def test_truncated_last_line_is_ignored(path):
+    repository = JournalRepositoryAdapter(path)
+    repository.save(Event("A", "2025-01-06", "09:00"))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "event": {"name": "B"')
+    assert rows(JournalRepositoryAdapter(path)) == [("A", "2025-01-06", "09:00")]
+    repository.save(Event("C", "2025-01-08", "09:00"))
+    assert rows(JournalRepositoryAdapter(path)) == [
+        ("A", "2025-01-06", "09:00"),
+        ("C", "2025-01-08", "09:00"),
+    ]
+
+
+def test_interrupted_compaction_is_finished_before_next_write(path):
+    repository = JournalRepositoryAdapter(path)
+    repository.save_many([Event("A", "2025-01-06", "09:00"), Event("B", "2025-01-07", "09:00")])
+    with open(path, encoding="utf-8") as f:
+        old_journal = f.read()
+    repository.compact()
+    # Caída simulada: el snapshot nuevo quedó escrito pero el journal no se reinició
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(old_journal)
+
+    reopened = JournalRepositoryAdapter(path)
+    assert len(reopened.find_all()) == 2  # los registros ya compactados no se aplican dos veces
+    reopened.save(Event("C", "2025-01-08", "09:00"))
+    assert journal_lines(path)[0] == {"generation": 1}
+    assert rows(JournalRepositoryAdapter(path)) == [
+        ("A", "2025-01-06", "09:00"),
+        ("B", "2025-01-07", "09:00"),
+        ("C", "2025-01-08", "09:00"),
+    ]
+
+
+def test_delete_events_removes_exact_rows_across_reload(path):
+    repository = JournalRepositoryAdapter(path)
+    repository.save_many(
+        [
+            Event("A", "2025-01-06", "09:00"),
+            Event("A", "2025-01-06", "09:00"),
+            Event("A", "2025-01-06", "10:00"),
+        ]
+    )
+    repository.delete_events([Event("A", "2025-01-06", "09:00")])
+    expected = [("A", "2025-01-06", "09:00"), ("A", "2025-01-06", "10:00")]
+    assert rows(repository) == expected
+    assert rows(JournalRepositoryAdapter(path)) == expected
+    repository.compact()
+    assert rows(JournalRepositoryAdapter(path)) == expected
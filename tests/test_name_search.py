@@ -0,0 +1,67 @@
+from agenda_module.domain.entities import Event
+from agenda_module.domain.name_search import NameIndex, NameMatch, unique_best_name
+
+from conftest import in_days
+
+
+def match(name: str, score: float) -> NameMatch:
+    return NameMatch(Event(name, "2025-01-06", "09:00"), score)
+
+
+def test_unique_best_name_without_rivals():
+    assert (
+        unique_best_name([match("Comité", 1.0), match("Comité", 1.0), match("Cena", 0.6)])
+        == "Comité"
+    )
+
+
+def test_unique_best_name_with_close_rival():
+    assert unique_best_name([match("Cita con Ana", 0.95), match("Cita con Luis", 0.9)]) is None
+
+
+def test_unique_best_name_empty():
+    assert unique_best_name([]) is None
+
+
+def test_search_tolerates_accents_variants_and_stopwords():
+    index = NameIndex(
+        [Event("Reunión de comité", "2025-01-06", "09:00"), Event("Cena", "2025-01-07", "20:00")]
+    )
+    assert [m.event.name for m in index.search("reunion comite")] == ["Reunión de comité"]
+    assert [m.event.name for m in index.search("reuniones comit")] == ["Reunión de comité"]
+    assert index.search("dentista") == []
+
+
+def test_search_filters_by_date_range():
+    index = NameIndex([Event("Demo", "2025-01-06", "09:00"), Event("Demo", "2025-02-06", "09:00")])
+    assert [m.event.date for m in index.search("demo", "2025-02-01", "2025-02-28")] == [
+        "2025-02-06"
+    ]
+
+
+def test_remove_event_matches_exact_name_ignoring_accents(repository, service):
+    repository.save(Event("Reunión de comité", in_days(1), "09:00"))
+    assert "eliminado" in service.remove_event("reunion de COMITE")
+    assert len(service.list_all_events()) == 0
+
+
+def test_remove_event_partial_match_lists_candidates(repository, service):
+    repository.save(Event("Cita con Ana", in_days(1), "09:00"))
+    repository.save(Event("Cita con Luis", in_days(1), "11:00"))
+    answer = service.remove_event("cita", in_days(1))
+    assert answer.startswith("⚠️ Varios eventos")
+    assert len(service.list_all_events()) == 2
+
+
+def test_remove_event_single_typo_candidate_is_not_deleted_without_date(repository, service):
+    repository.save(Event("Dentista", in_days(1), "09:00"))
+    answer = service.remove_event("dentsta")
+    assert "No hay ningún evento llamado 'dentsta'" in answer
+    assert len(service.list_all_events()) == 1
+
+
+def test_remove_event_all_terms_with_date_deletes_unique_name(repository, service):
+    repository.save(Event("Revisión de presupuesto anual", in_days(1), "09:00"))
+    repository.save(Event("Cena", in_days(1), "20:00"))
+    assert "eliminado" in service.remove_event("revision presupuesto", in_days(1))
+    assert [e.name for e in service.list_all_events()] == ["Cena"]
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+import pytest
+
+from agenda_module.application.service import AgendaService
+from agenda_module.domain.recurrence import RecurrenceRule, expand
+
+from conftest import in_days
+
+START = date(2025, 1, 6)  # lunes
+
+
+@pytest.mark.parametrize("count", [0, -3])
+def test_expand_rejects_count_below_one(count):
+    with pytest.raises(ValueError, match="count"):
+        expand(RecurrenceRule("DAILY", START, count=count))
+
+
+def test_expand_rejects_interval_below_one():
+    with pytest.raises(ValueError, match="intervalo"):
+        expand(RecurrenceRule("DAILY", START, interval=0, count=3))
+
+
+def test_expand_requires_until_or_count():
+    with pytest.raises(ValueError):
+        expand(RecurrenceRule("WEEKLY", START))
+
+
+def test_expand_stops_at_first_bound():
+    by_count = expand(RecurrenceRule("DAILY", START, until=START + timedelta(days=30), count=3))
+    by_until = expand(RecurrenceRule("DAILY", START, until=START + timedelta(days=2), count=30))
+    assert by_count == by_until == [START, START + timedelta(days=1), START + timedelta(days=2)]
+
+
+def test_expand_weekly_weekdays_from_start():
+    # Empieza un miércoles: el lunes de esa semana queda fuera
+    dates = expand(RecurrenceRule("WEEKLY", date(2025, 1, 8), weekdays=[0, 2], count=3))
+    assert dates == [date(2025, 1, 8), date(2025, 1, 13), date(2025, 1, 15)]
+
+
+def test_expand_monthly_skips_short_months():
+    dates = expand(RecurrenceRule("MONTHLY", date(2025, 1, 31), until=date(2025, 5, 31)))
+    assert dates == [date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31)]
+
+
+def test_recurring_series_with_invalid_count_saves_nothing(service):
+    result = service.add_recurring_events("Standup", in_days(1), "09:00", "DAILY", count=0)
+    assert result.startswith("⚠️")
+    assert len(service.list_all_events()) == 0
+
+
+def test_cut_by_limit_only_reports_dates_dropped_by_the_limit():
+    limit = START + timedelta(days=10)
+    capped = RecurrenceRule("DAILY", START, until=limit, count=None)
+    assert AgendaService._cut_by_limit(capped, expand(capped), None)
+    # Un until del usuario anterior al límite no cuenta como recorte
+    user_until = START + timedelta(days=5)
+    bounded = RecurrenceRule("DAILY", START, until=user_until)
+    assert not AgendaService._cut_by_limit(bounded, expand(bounded), user_until)
+    counted = RecurrenceRule("DAILY", START, until=limit, count=4)
+    assert not AgendaService._cut_by_limit(counted, expand(counted), None)
@@ -0,0 +1,79 @@
+import pytest
+
+from agenda_module.domain.ports.agent_port import AIAgentPort
+from agenda_module.domain.text import normalize
+from agenda_module.infrastructure.adapters.cached_agent_adapter import (
+    CachedAgentAdapter,
+    ResponseCache,
+    is_read_only_question,
+)
+
+
+class CountingAgent(AIAgentPort):
+    def __init__(self):
+        self.calls = 0
+        self.remembered = []
+
+    def get_response(self, user_input, chat_history=None):
+        self.calls += 1
+        return f"respuesta {self.calls}"
+
+    def remember_turn(self, user_input, output):
+        self.remembered.append((user_input, output))
+
+
+@pytest.mark.parametrize(
+    "question", ["¿Qué tengo mañana?", "Muéstrame la agenda de hoy", "¿Cuáles son mis eventos?"]
+)
+def test_read_only_questions_are_cacheable(question):
+    assert is_read_only_question(normalize(question))
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Agenda una reunión mañana a las 10",
+        "Elimina la cita de hoy",
+        "¿Qué tengo ese día?",
+        "¿Y el otro?",
+        "hola",
+    ],
+)
+def test_writes_and_context_questions_are_not_cacheable(question):
+    assert not is_read_only_question(normalize(question))
+
+
+def test_repeated_question_skips_the_model_and_is_remembered():
+    agent = CountingAgent()
+    cached = CachedAgentAdapter(agent, ResponseCache(semantic=False), "modelo", lambda: 1)
+    first = cached.get_response("¿Qué tengo mañana?")
+    assert cached.get_response("que tengo MAÑANA") == first
+    assert agent.calls == 1
+    assert agent.remembered == [("que tengo MAÑANA", first)]
+
+
+def test_version_change_invalidates_cache():
+    agent = CountingAgent()
+    version = [1]
+    cached = CachedAgentAdapter(agent, ResponseCache(semantic=False), "modelo", lambda: version[0])
+    cached.get_response("¿Qué tengo mañana?")
+    version[0] = 2
+    assert cached.get_response("¿Qué tengo mañana?") == "respuesta 2"
+    assert agent.calls == 2
+
+
+def test_cache_is_scoped_by_model():
+    cache = ResponseCache(semantic=False)
+    cache.put("rapido", "que tengo hoy", 1, "A")
+    assert cache.get("rapido", "que tengo hoy", 1) == "A"
+    assert cache.get("preciso", "que tengo hoy", 1) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, semantic=False)
+    cache.put("m", "uno", 1, "1")
+    cache.put("m", "dos", 1, "2")
+    cache.get("m", "uno", 1)
+    cache.put("m", "tres", 1, "3")
+    assert cache.get("m", "dos", 1) is None
+    assert cache.get("m", "uno", 1) == "1"
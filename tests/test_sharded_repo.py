@@ -0,0 +1,94 @@
+import pytest
+
+from agenda_module.domain.entities import Event
+from agenda_module.infrastructure.adapters.journal_repo import JournalRepositoryAdapter
+from agenda_module.infrastructure.adapters.sharded_repo import ShardedRepositoryAdapter, tenant_key
+from agenda_module.infrastructure.adapters.sqlite_repo import SqliteRepositoryAdapter
+
+BACKENDS = {
+    "sqlite": (SqliteRepositoryAdapter, ".db"),
+    "journal": (JournalRepositoryAdapter, ".journal"),
+}
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def sharded(request, tmp_path):
+    factory, extension = BACKENDS[request.param]
+    return ShardedRepositoryAdapter(
+        str(tmp_path / "shards"), factory, extension, default_tenant="general"
+    )
+
+
+def rows(repository):
+    return sorted((e.name, e.date, e.time) for e in repository.find_all())
+
+
+def area(event: Event) -> str:
+    return event.name.split(":")[0]
+
+
+def test_tenant_key_folds_names():
+    assert tenant_key(" Área de Ventas ") == "area-de-ventas"
+    assert tenant_key("") == "general"
+
+
+def test_tenants_are_isolated_and_merged_in_company_view(sharded):
+    sharded.for_tenant("Ventas").save(Event("ventas: demo", "2025-01-06", "09:00"))
+    sharded.for_tenant("Soporte").save(Event("soporte: turno", "2025-01-06", "10:00"))
+    assert rows(sharded.for_tenant("ventas")) == [("ventas: demo", "2025-01-06", "09:00")]
+    assert sharded.tenants() == ["soporte", "ventas"]
+    assert [e.name for e in sharded.find_by_date("2025-01-06")] == [
+        "ventas: demo",
+        "soporte: turno",
+    ]
+    assert len(sharded.find_between("2025-01-07", "2025-01-31")) == 0
+
+
+def test_rebalance_moves_only_leaving_events(sharded):
+    general = sharded.for_tenant("general")
+    general.save_many(
+        [
+            Event("general: comité", "2025-01-06", "09:00"),
+            Event("ventas: demo", "2025-01-06", "09:00"),
+            Event("ventas: demo", "2025-01-06", "09:00"),
+            Event("soporte: turno", "2025-01-07", "10:00"),
+        ]
+    )
+    assert sharded.rebalance(area) == 3
+    assert rows(general) == [("general: comité", "2025-01-06", "09:00")]
+    assert rows(sharded.for_tenant("ventas")) == [("ventas: demo", "2025-01-06", "09:00")] * 2
+    assert rows(sharded.for_tenant("soporte")) == [("soporte: turno", "2025-01-07", "10:00")]
+    assert sharded.rebalance(area) == 0
+
+
+def test_rebalance_crash_before_delete_duplicates_but_loses_nothing(sharded, monkeypatch):
+    general = sharded.for_tenant("general")
+    general.save_many(
+        [
+            Event("general: comité", "2025-01-06", "09:00"),
+            Event("ventas: demo", "2025-01-06", "09:00"),
+        ]
+    )
+
+    def crash(events):
+        raise RuntimeError("caída simulada")
+
+    monkeypatch.setattr(general, "delete_events", crash)
+    with pytest.raises(RuntimeError):
+        sharded.rebalance(area)
+    monkeypatch.undo()
+
+    assert rows(general) == [
+        ("general: comité", "2025-01-06", "09:00"),
+        ("ventas: demo", "2025-01-06", "09:00"),
+    ]
+    assert rows(sharded.for_tenant("ventas")) == [("ventas: demo", "2025-01-06", "09:00")]
+
+
+def test_rebalance_keeps_events_whose_copy_failed(sharded, monkeypatch):
+    sharded.for_tenant("general").save(Event("ventas: demo", "2025-01-06", "09:00"))
+    monkeypatch.setattr(
+        sharded.for_tenant("ventas"), "save_many", lambda events: "Error al guardar: disco lleno"
+    )
+    assert sharded.rebalance(area) == 0
+    assert rows(sharded.for_tenant("general")) == [("ventas: demo", "2025-01-06", "09:00")]